@@ -1,7 +1,79 @@
+from CryptoModule.hash_util import Hasher
+
+
 class ChainValidator:
     """
     Zincir doğrulama işlemlerini yürüten statik sınıf.
     """
+
+    # Kayan özetin (rolling digest) başlangıç değeri
+    GENESIS_DIGEST = "0" * 64
+
+    # Özete giren alanlar (user_key anahtar tablosuna taşınabildiği için dahil değil)
+    DIGEST_FIELDS = ("id", "file_name", "file_hash", "prev_hash", "timestamp", "merkle_root")
+
+    @staticmethod
+    def record_digest(record) -> str:
+        """Tek bir kaydın alanlarından deterministik SHA-256 özeti üretir."""
+        values = []
+        for field in ChainValidator.DIGEST_FIELDS:
+            value = record[field]
+            values.append("" if value is None else str(value))
+        return Hasher.get_hash("|".join(values))
+
+    @staticmethod
+    def roll_digest(digest: str, record) -> str:
+        """Doğrulanmış öneğin özetine bir kayıt daha ekler: H(önceki_özet + kayıt_özeti)."""
+        return Hasher.get_hash(digest + ChainValidator.record_digest(record))
+
+    @staticmethod
+    def audit(records, previous_record=None, digest=GENESIS_DIGEST, expected_digests=None):
+        """
+        Kayıtları tek geçişte doğrular ve doğrulanan önek üzerinde kayan özeti hesaplar.
+        Checkpoint'ten devam etmek için son denetlenen kayıt ve onun özeti verilir.
+        expected_digests ({kayıt_id: özet}) verilirse, eski checkpoint'lerdeki özetler de
+        kontrol edilir: uyuşmazlık, o noktaya kadarki içeriğin değiştirildiğini gösterir.
+        """
+        broken_indices = []
+        last_record = previous_record
+        count = 0
+
+        for record, linked in ChainValidator.iter_links(records, previous_record):
+            digest = ChainValidator.roll_digest(digest, record)
+
+            digest_changed = (
+                expected_digests is not None
+                and record["id"] in expected_digests
+                and expected_digests[record["id"]] != digest
+            )
+            if not linked or digest_changed:
+                broken_indices.append(record["id"])
+
+            last_record = record
+            count += 1
+
+        return {
+            "is_valid": len(broken_indices) == 0,
+            "broken_indices": broken_indices,
+            "digest": digest,
+            "last_record": last_record,
+            "count": count
+        }
+
+    @staticmethod
+    def iter_links(records, previous_record=None):
+        """
+        Kayıtları (herhangi bir iterable, örn. veritabanı cursor'ı) tek tek gezer ve
+        (kayıt, bağlı_mı) çiftleri üretir. Listeyi bellekte tutmaz.
+        previous_record verilirse ilk kaydın bağlantısı da ona göre kontrol edilir;
+        verilmezse ilk kayıt (Genesis) kontrol dışıdır.
+        """
+        expected_prev_hash = previous_record["file_hash"] if previous_record is not None else None
+
+        for record in records:
+            linked = expected_prev_hash is None or record["prev_hash"] == expected_prev_hash
+            yield record, linked
+            expected_prev_hash = record["file_hash"]
     
     @staticmethod
     def validate_chain(records):
@@ -0,0 +1,282 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from CryptoModule.security_engine import SecurityVaultManager
+
+# Fixed chunk size, and the average chunk size of content-defined chunking
+DEFAULT_CHUNK_SIZE = int(os.getenv("VAULT_CHUNK_SIZE", str(4 * 1024 * 1024)))
+
+MODES = ("fixed", "cdc")
+
+_MASK64 = (1 << 64) - 1
+# Gear table of the rolling hash: fixed, so boundaries are the same on every machine
+_GEAR = tuple(int.from_bytes(hashlib.sha256(b"dsv-gear-%d" % i).digest()[:8], "little") for i in range(256))
+
+
+class Chunk(NamedTuple):
+    offset: int
+    length: int
+    hash: str
+
+
+class ChunkCheck(NamedTuple):
+    """Result of re-hashing (some) chunks of a file against its manifest."""
+    bad_chunks: List[int]      # indices of chunks whose bytes no longer match
+    checked: int               # chunks re-hashed
+    size_ok: bool              # the file still has the manifest's size
+
+    @property
+    def ok(self) -> bool:
+        return not self.bad_chunks and self.size_ok
+
+
+def cdc_limits(chunk_size: int) -> Tuple[int, int, int]:
+    """(min, max, boundary mask) of content-defined chunks averaging about `chunk_size` bytes."""
+    bits = max(chunk_size.bit_length() - 1, 1)
+    # The top bits of the gear hash depend on the last 64 bytes (the rolling window)
+    mask = ((1 << bits) - 1) << (64 - bits)
+    return max(chunk_size // 4, 64), chunk_size * 4, mask
+
+
+def _cdc_cut(data, min_size: int, max_size: int, mask: int, final: bool, state=None):
+    """
+    Length of the next content-defined chunk at the start of `data`, or None
+    if more data is needed to find it. Gear rolling hash (as in FastCDC):
+    a boundary follows the first byte after `min_size` where the masked hash
+    is zero, so an insertion only moves the boundaries next to it.
+    `state` ([position, hash], updated in place) resumes a scan that needed
+    more data, so streamed bytes are scanned only once.
+    """
+    n = len(data)
+    if n <= min_size:
+        return n if final and n else None
+    limit = min(n, max_size)
+    if state is None:
+        state = [min_size, 0]
+    position, h = state
+    gear = _GEAR
+    for i in range(max(position, min_size), limit):
+        h = ((h << 1) + gear[data[i]]) & _MASK64
+        if not h & mask:
+            return i + 1
+    if limit == max_size or final:
+        return limit
+    state[0], state[1] = limit, h
+    return None
+
+
+class ChunkManifest(NamedTuple):
+    """
+    Per-file Merkle tree of chunk hashes. `root` is the Merkle root (same
+    pairing as the vault tree) over the SHA-256 of each chunk, so a single
+    chunk can be verified with an O(log n) proof and corruption can be
+    localised to the chunks whose hashes changed.
+    """
+    size: int
+    mode: str
+    chunk_size: int
+    root: str
+    chunks: Tuple[Chunk, ...]
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Chunk], mode: str = "fixed", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        chunks = tuple(chunks)
+        root = SecurityVaultManager.build_merkle_root([c.hash for c in chunks])
+        return cls(sum(c.length for c in chunks), mode, chunk_size, root, chunks)
+
+    def chunks_in_range(self, start: int, end: int) -> range:
+        """Indices of the chunks overlapping bytes [start, end)."""
+        if start >= end or not self.chunks:
+            return range(0)
+        offsets = [c.offset for c in self.chunks]
+        first = max(bisect_right(offsets, start) - 1, 0)
+        last = bisect_right(offsets, end - 1)
+        return range(first, last)
+
+    def proof(self, index: int) -> List[Dict]:
+        """Inclusion proof of chunk `index` under `root` (format of get_merkle_proof)."""
+        frontier, nodes = {}, {}
+        for size, chunk in enumerate(self.chunks):
+            for level, idx, node in SecurityVaultManager.merkle_append(frontier, size, chunk.hash):
+                nodes[(level, idx)] = node
+        return SecurityVaultManager.merkle_proof_path(
+            index, len(self.chunks), frontier, lambda level, idx: nodes[(level, idx)]
+        )
+
+    def pack(self) -> Tuple[bytes, bytes]:
+        """Compact storage form: raw chunk hashes and chunk lengths (little-endian uint64)."""
+        hashes = b"".join(bytes.fromhex(c.hash) for c in self.chunks)
+        lengths = array("Q", (c.length for c in self.chunks))
+        if lengths.itemsize != 8:   # pragma: no cover - exotic platforms
+            return hashes, struct.pack(f"<{len(self.chunks)}Q", *lengths)
+        return hashes, lengths.tobytes()
+
+    @classmethod
+    def unpack(cls, mode: str, chunk_size: int, root: str, hashes: bytes, lengths: bytes):
+        count = len(hashes) // 32
+        offset = 0
+        chunks = []
+        for i, length in enumerate(struct.unpack(f"<{count}Q", lengths)):
+            chunks.append(Chunk(offset, length, hashes[i * 32:(i + 1) * 32].hex()))
+            offset += length
+        return cls(offset, mode, chunk_size, root, tuple(chunks))
+
+
+class ChunkStream:
+    """
+    Builds a manifest from data arriving in pieces (e.g. a streamed upload).
+    Fixed chunks are hashed as the data arrives; content-defined chunking
+    buffers at most one maximum-size chunk until its boundary is found.
+    """
+
+    def __init__(self, mode: str = "fixed", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown chunking mode: {mode}")
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.chunks = []
+        self._offset = 0
+        self._hash = hashlib.sha256()
+        self._filled = 0                 # bytes of the current fixed chunk
+        self._pending = bytearray()      # unchunked bytes (cdc)
+        self._scan = [0, 0]              # boundary scan state of the pending chunk (cdc)
+
+    def update(self, data) -> None:
+        if self.mode == "cdc":
+            self._pending += data
+            self._cut(final=False)
+            return
+
+        with memoryview(data) as view:
+            while view:
+                take = min(self.chunk_size - self._filled, len(view))
+                self._hash.update(view[:take])
+                self._filled += take
+                view = view[take:]
+                if self._filled == self.chunk_size:
+                    self._emit(self._filled, self._hash.hexdigest())
+
+    def _emit(self, length: int, digest: str):
+        self.chunks.append(Chunk(self._offset, length, digest))
+        self._offset += length
+        self._hash = hashlib.sha256()
+        self._filled = 0
+
+    def _cut(self, final: bool):
+        min_size, max_size, mask = cdc_limits(self.chunk_size)
+        start = 0
+        with memoryview(self._pending) as view:
+            while True:
+                cut = _cdc_cut(view[start:], min_size, max_size, mask, final, self._scan)
+                if not cut:
+                    break
+                self._emit(cut, hashlib.sha256(view[start:start + cut]).hexdigest())
+                self._scan = [0, 0]
+                start += cut
+        del self._pending[:start]
+
+    def finish(self) -> ChunkManifest:
+        if self.mode == "cdc":
+            self._cut(final=True)
+        elif self._filled:
+            self._emit(self._filled, self._hash.hexdigest())
+        return ChunkManifest.from_chunks(self.chunks, self.mode, self.chunk_size)
+
+
+def _boundaries(data, mode: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """(offset, length) of every chunk of `data` (a bytes-like object or mapping)."""
+    size = len(data)
+    if mode == "fixed":
+        return [(offset, min(chunk_size, size - offset)) for offset in range(0, size, chunk_size)]
+    if mode != "cdc":
+        raise ValueError(f"Unknown chunking mode: {mode}")
+
+    min_size, max_size, mask = cdc_limits(chunk_size)
+    bounds = []
+    offset = 0
+    with memoryview(data) as view:
+        while offset < size:
+            # A window of max_size bytes always contains the next boundary
+            length = _cdc_cut(view[offset:offset + max_size], min_size, max_size, mask, final=True)
+            bounds.append((offset, length))
+            offset += length
+    return bounds
+
+
+def _hash_chunks(data, bounds, max_workers: Optional[int]) -> List[str]:
+    """SHA-256 of each (offset, length) slice; hashlib releases the GIL, so threads scale with cores."""
+    with memoryview(data) as view:
+        def digest(bound):
+            offset, length = bound
+            return hashlib.sha256(view[offset:offset + length]).hexdigest()
+
+        if max_workers == 0 or len(bounds) <= 1:
+            return [digest(b) for b in bounds]
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                                thread_name_prefix="vault-chunk") as pool:
+            return list(pool.map(digest, bounds))
+
+
+def _open_mapping(f):
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def build_manifest(file_path: str, mode: str = "fixed", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   max_workers: Optional[int] = None) -> ChunkManifest:
+    """
+    Splits a file into fixed-size or content-defined chunks and returns its
+    manifest. The file is read through a mapping; chunk hashes are computed
+    on `max_workers` threads (0 = in the calling thread). Content-defined
+    boundaries come from a byte-wise rolling hash in Python, so `cdc` is much
+    slower than `fixed` (a few MB/s per file); it keeps chunks stable when
+    bytes are inserted or removed.
+    """
+    with open(file_path, "rb") as f:
+        data = _open_mapping(f)
+        try:
+            bounds = _boundaries(data, mode, chunk_size)
+            hashes = _hash_chunks(data, bounds, max_workers)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    chunks = [Chunk(offset, length, h) for (offset, length), h in zip(bounds, hashes)]
+    return ChunkManifest.from_chunks(chunks, mode, chunk_size)
+
+
+def verify_chunks(file_path: str, manifest: ChunkManifest, start: int = 0, end: Optional[int] = None,
+                  max_workers: Optional[int] = None) -> ChunkCheck:
+    """
+    Re-hashes only the chunks overlapping bytes [start, end) (default: the
+    whole file) at the manifest's boundaries and reports the ones that no
+    longer match, i.e. where the file was corrupted. Bytes missing from a
+    truncated file make their chunks bad.
+    """
+    end = manifest.size if end is None else min(end, manifest.size)
+    indices = manifest.chunks_in_range(start, end)
+    with open(file_path, "rb") as f:
+        data = _open_mapping(f)
+        try:
+            size = len(data)
+            present = [i for i in indices if manifest.chunks[i].offset + manifest.chunks[i].length <= size]
+            hashes = _hash_chunks(data, [manifest.chunks[i][:2] for i in present], max_workers)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    matching = {i for i, h in zip(present, hashes) if h == manifest.chunks[i].hash}
+    bad = [i for i in indices if i not in matching]
+    return ChunkCheck(bad, len(indices), size == manifest.size)
+
+
+def verify_chunk_data(data, proof: List[Dict], root: str) -> bool:
+    """Partial verification: checks one chunk's bytes against a manifest root with its proof."""
+    return SecurityVaultManager.verify_merkle_proof(hashlib.sha256(data).hexdigest(), proof, root)
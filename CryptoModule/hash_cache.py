@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "VAULT_HASH_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "dsv", "hash_cache.db")
+)
+DEFAULT_MAX_ENTRIES = int(os.getenv("VAULT_HASH_CACHE_MAX_ENTRIES", "1000000"))
+
+# Files modified this recently may still change within the same mtime tick,
+# so their digests are not cached (same idea as git's "racy" index entries)
+RACY_WINDOW_NS = 2_000_000_000
+# Pending writes are flushed in batches of this size
+FLUSH_EVERY = 512
+
+
+class HashCache:
+    """
+    Persistent SHA-256 cache keyed by file metadata (device, inode, size, mtime_ns).
+
+    A file whose metadata is unchanged since it was hashed is not read again.
+    Entries are stored in a small SQLite database; the least recently used
+    ones are evicted once `max_entries` is exceeded. Safe to share between
+    the threads of Hasher.hash_many.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                dev INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                path TEXT,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (dev, inode, size, mtime_ns)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_file_hashes_last_used ON file_hashes (last_used)")
+        self._conn.commit()
+
+        self._count = self._conn.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0]
+        self._pending = {}   # key -> (dev, inode, size, mtime_ns, digest, path, last_used)
+        self._touched = []   # (last_used, dev, inode, size, mtime_ns)
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "skipped": 0, "evictions": 0}
+
+    @staticmethod
+    def key(st: os.stat_result) -> Tuple[int, int, int, int]:
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def lookup(self, st: os.stat_result) -> Optional[str]:
+        """Returns the cached digest for a file's stat result, or None."""
+        key = self.key(st)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.stats["hits"] += 1
+                return pending[4]
+            row = self._conn.execute(
+                "SELECT digest FROM file_hashes WHERE dev = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+                key
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self._touched.append((int(time.time()), *key))
+            self._maybe_flush()
+            return row[0]
+
+    def store(self, path: str, st: os.stat_result, digest: str):
+        """Remembers the digest of a file hashed while it had metadata `st`."""
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            with self._lock:
+                self.stats["skipped"] += 1
+            return
+
+        with self._lock:
+            key = self.key(st)
+            self._pending[key] = (*key, digest, os.fspath(path), int(time.time()))
+            self.stats["stores"] += 1
+            self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._pending) + len(self._touched) >= FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self):
+        pending, self._pending = list(self._pending.values()), {}
+        touched, self._touched = self._touched, []
+        if not pending and not touched:
+            return
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_hashes (dev, inode, size, mtime_ns, digest, path, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                pending
+            )
+            self._conn.executemany(
+                "UPDATE file_hashes SET last_used = ? WHERE dev = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+                touched
+            )
+
+        # Upper bound (replaced rows are counted twice); recounted before evicting
+        self._count += len(pending)
+        if self._count > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        self._count = self._conn.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        # Evict a little more than needed so this does not run on every flush
+        excess += self.max_entries // 10
+        with self._conn:
+            cur = self._conn.execute(
+                """
+                DELETE FROM file_hashes WHERE (dev, inode, size, mtime_ns) IN (
+                    SELECT dev, inode, size, mtime_ns FROM file_hashes ORDER BY last_used LIMIT ?
+                )
+                """,
+                (excess,)
+            )
+        self._count -= cur.rowcount
+        self.stats["evictions"] += cur.rowcount
+
+    def evict_older_than(self, seconds: float) -> int:
+        """Drops entries not used for `seconds`; returns how many were removed."""
+        with self._lock:
+            self._flush()
+            with self._conn:
+                cur = self._conn.execute(
+                    "DELETE FROM file_hashes WHERE last_used < ?",
+                    (int(time.time() - seconds),)
+                )
+            self._count -= cur.rowcount
+            self.stats["evictions"] += cur.rowcount
+            return cur.rowcount
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def clear(self):
+        with self._lock:
+            self._pending, self._touched = {}, []
+            with self._conn:
+                self._conn.execute("DELETE FROM file_hashes")
+            self._count = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush()
+            return self._conn.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
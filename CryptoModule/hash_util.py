@@ -1,35 +1,196 @@
 import hashlib
+import mmap
 import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+# Read buffer reused by every file hashed on the same thread
+CHUNK_SIZE = 1024 * 1024
+# Files at least this large are hashed straight from a read-only mapping
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+_buffers = threading.local()
+
+
+class FileHash(NamedTuple):
+    """Result of hashing one file; `error` is set (and `digest` None) when it failed."""
+    path: str
+    digest: Optional[str]
+    error: Optional[OSError] = None
+
+
+class StreamHash:
+    """
+    Incremental SHA-256 over data that arrives in pieces (e.g. a request body):
+    only the running hash state is kept, never the data itself.
+    """
+
+    __slots__ = ("_hash", "size")
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def update(self, chunk) -> None:
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _thread_buffer() -> bytearray:
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None or len(buffer) != CHUNK_SIZE:
+        buffer = _buffers.buffer = bytearray(CHUNK_SIZE)
+    return buffer
+
+
+def _hash_file(file_path: str, cache=None, paranoid: bool = False) -> str:
+    if cache is not None and not paranoid:
+        digest = cache.lookup(os.stat(file_path))
+        if digest is not None:
+            return digest
+
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb", buffering=0) as f:
+        before = os.fstat(f.fileno())
+        size = before.st_size
+        if size >= MMAP_THRESHOLD:
+            # One update over the whole mapping: no copies, and hashlib
+            # releases the GIL while it digests
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sha256_hash.update(mapped)
+        else:
+            buffer = _thread_buffer()
+            view = memoryview(buffer)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                sha256_hash.update(view[:n])
+        digest = sha256_hash.hexdigest()
+
+        # Only cache the digest if the file did not change while it was read
+        if cache is not None and cache.key(os.fstat(f.fileno())) == cache.key(before):
+            cache.store(file_path, before, digest)
+    return digest
+
+
+def _hash_result(file_path: str, cache=None, paranoid: bool = False) -> FileHash:
+    try:
+        return FileHash(file_path, _hash_file(file_path, cache, paranoid))
+    except OSError as e:
+        return FileHash(file_path, None, e)
+
 
 class Hasher:
     """
     Class performing deterministic SHA-256 hashing operations.
     Cornerstone of the 'Security Vault' structure within the project scope.
     """
-    
+
     @staticmethod
     def get_hash(data: str) -> str:
         """Returns the SHA-256 digest of text data."""
         if not isinstance(data, str):
             raise TypeError("Data must be in string format.")
-        
+
         # Encode and hash data
         encoded_data = data.encode('utf-8')
         return hashlib.sha256(encoded_data).hexdigest()
 
     @staticmethod
-    def get_file_hash(file_path: str) -> str:
-        """Returns the SHA-256 digest of the specified file."""
-        sha256_hash = hashlib.sha256()
-        
-        if not os.path.exists(file_path):
-            return "File Not Found"
+    def get_file_hash(file_path: str, cache=None, paranoid: bool = False) -> str:
+        """
+        Returns the SHA-256 digest of the specified file.
+        Raises OSError (e.g. FileNotFoundError) if the file cannot be read.
+        With a HashCache, unchanged files are answered from the cache;
+        `paranoid` re-reads every file (and refreshes the cache).
+        """
+        return _hash_file(file_path, cache, paranoid)
+
+    @staticmethod
+    def hash_stream(chunks: Iterable[bytes]) -> StreamHash:
+        """Hashes an iterable of byte chunks incrementally; the result carries digest and size."""
+        stream = StreamHash()
+        for chunk in chunks:
+            stream.update(chunk)
+        return stream
+
+    @staticmethod
+    def hash_many(paths: Iterable[str], max_workers: Optional[int] = None, ordered: bool = False,
+                  cache=None, paranoid: bool = False) -> Iterator[FileHash]:
+        """
+        Hashes many files concurrently on a thread pool and yields a FileHash
+        per path as soon as it is ready (in input order if `ordered`).
+        A failing file is reported in its result and does not stop the scan.
+        Only a bounded window of paths is in flight, so `paths` may be a lazy
+        iterator over millions of files. `cache`/`paranoid` as in get_file_hash.
+        """
+        workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        window = workers * 4
+        path_iter = iter(paths)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vault-hash")
+
+        def submit_next(pending) -> bool:
+            for path in path_iter:
+                pending.append(pool.submit(_hash_result, os.fspath(path), cache, paranoid))
+                return True
+            return False
 
         try:
-            with open(file_path, "rb") as f:
-                # Read file in chunks (memory friendly for large files)
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
-        except Exception as e:
-            return f"Error: {str(e)}"
\ No newline at end of file
+            if ordered:
+                pending = deque()
+                while len(pending) < window and submit_next(pending):
+                    pass
+                while pending:
+                    result = pending.popleft().result()
+                    submit_next(pending)
+                    yield result
+            else:
+                pending = []
+                while len(pending) < window and submit_next(pending):
+                    pass
+                while pending:
+                    done, rest = wait(pending, return_when=FIRST_COMPLETED)
+                    pending = list(rest)
+                    while len(pending) < window and submit_next(pending):
+                        pass
+                    for future in done:
+                        yield future.result()
+        finally:
+            # Also runs when the caller stops iterating early
+            pool.shutdown(wait=True, cancel_futures=True)
+            if cache is not None:
+                cache.flush()
+
+    @staticmethod
+    def iter_files(root: str, follow_symlinks: bool = False) -> Iterator[str]:
+        """Yields the paths of all regular files under `root` (depth-first, sorted per directory)."""
+        stack = [os.fspath(root)]
+        while stack:
+            directory = stack.pop()
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subdirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=follow_symlinks):
+                    yield entry.path
+            stack.extend(reversed(subdirs))
+
+    @staticmethod
+    def hash_tree(root: str, max_workers: Optional[int] = None, ordered: bool = False,
+                  follow_symlinks: bool = False, cache=None, paranoid: bool = False) -> Iterator[FileHash]:
+        """Hashes every regular file under a directory tree (see hash_many)."""
+        return Hasher.hash_many(
+            Hasher.iter_files(root, follow_symlinks=follow_symlinks),
+            max_workers=max_workers,
+            ordered=ordered,
+            cache=cache,
+            paranoid=paranoid
+        )
@@ -1,28 +1,291 @@
+import binascii
 import hashlib
 import os
 import json
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import List, Optional, Dict  # Dict eklendi
+from typing import Callable, List, Optional, Dict, Tuple  # Dict eklendi
 from CryptoModule.hash_util import Hasher
 
+DIGEST_SIZE = 32
+# Pairs hashed per block; bounds the temporary hex copy of a level (1 MiB)
+BLOCK_PAIRS = 8192
+# Levels with fewer pairs than this are never split across an executor
+MIN_PARALLEL_PAIRS = 65536
+
+
+def _hash_pairs(level: bytes, count: int) -> bytes:
+    """
+    Hashes `count` raw digests laid out back to back into the next level.
+    hexlify(level[i*32:(i+2)*32]) is exactly hex(left) + hex(right), so every
+    parent is SHA-256 of the same 128 hex characters as the string scheme.
+    Module level so it can also run in a process pool.
+    """
+    hexed = binascii.hexlify(level[:count * DIGEST_SIZE])
+    sha256 = hashlib.sha256
+    width = 4 * DIGEST_SIZE
+    full = (count // 2) * width
+    parents = [sha256(hexed[i:i + width]).digest() for i in range(0, full, width)]
+    if count & 1:  # last odd node is paired with itself
+        last = hexed[full:]
+        parents.append(sha256(last + last).digest())
+    return b"".join(parents)
+
+
 class SecurityVaultManager:
     def __init__(self):
         self.chain = []
 
-    # --- EXISTING FUNCTIONS (UNCHANGED) ---
+    # --- MERKLE ROOT ---
     @staticmethod
-    def build_merkle_root(hash_list: List[str]) -> str:
+    def build_merkle_root(
+        hash_list: List[str],
+        executor: Optional[Executor] = None,
+        min_parallel_pairs: int = MIN_PARALLEL_PAIRS,
+        workers: Optional[int] = None
+    ) -> str:
+        """
+        Returns the Merkle root of the leaves (odd nodes are paired with themselves;
+        parent = SHA-256 of left_hex + right_hex).
+
+        Iterative: every level is one contiguous buffer of raw 32-byte digests,
+        overwritten in place block by block, instead of a new list of hex strings
+        per recursion. Leaves that are not lowercase 64-char hex are combined with
+        the string scheme for the first level only, so roots are identical for any input.
+
+        With an `executor`, levels of at least `min_parallel_pairs` pairs are split
+        into one chunk per worker (`workers`, the pool size the executor was
+        built with; defaults to the CPU count). SHA-256 of a 128-byte input does not release
+        the GIL (hashlib only does so above 2047 bytes), so pass a process pool;
+        threads only help on free-threaded builds.
+        """
         if not hash_list: return ""
         if len(hash_list) == 1: return hash_list[0]
-        
-        new_hashes = []
-        for i in range(0, len(hash_list), 2):
-            left = hash_list[i]
-            right = hash_list[i+1] if i+1 < len(hash_list) else left
-            combined = hashlib.sha256((left + right).encode()).hexdigest()
-            new_hashes.append(combined)
-        
-        return SecurityVaultManager.build_merkle_root(new_hashes)
+
+        count = len(hash_list)
+        buffer = bytearray()
+        for start in range(0, count, BLOCK_PAIRS):
+            block = "".join(hash_list[start:start + BLOCK_PAIRS])
+            try:
+                raw = bytes.fromhex(block)
+            except ValueError:
+                raw = None
+            # fromhex also accepts upper case and whitespace: require an exact round trip
+            if raw is None or len(raw) != DIGEST_SIZE * min(BLOCK_PAIRS, count - start) or raw.hex() != block:
+                buffer = None
+                break
+            buffer += raw
+
+        if buffer is None:
+            # First level from the original strings; every level above is hex digests
+            buffer = bytearray()
+            for i in range(0, count, 2):
+                left = hash_list[i]
+                right = hash_list[i+1] if i+1 < count else left
+                buffer += hashlib.sha256((left + right).encode()).digest()
+            count = (count + 1) // 2
+
+        while count > 1:
+            pairs = (count + 1) // 2
+            if executor is not None and pairs >= min_parallel_pairs:
+                chunks = workers or os.cpu_count() or 1
+                step = 2 * max(BLOCK_PAIRS, -(-pairs // chunks))   # nodes per chunk (even)
+                starts = range(0, count, step)
+                parents = b"".join(executor.map(
+                    _hash_pairs,
+                    [bytes(buffer[s * DIGEST_SIZE:min(s + step, count) * DIGEST_SIZE]) for s in starts],
+                    [min(step, count - s) for s in starts]
+                ))
+                buffer[:len(parents)] = parents
+            else:
+                # Parents of block b land on slots the earlier blocks have already read
+                step = 2 * BLOCK_PAIRS
+                for s in range(0, count, step):
+                    parents = _hash_pairs(buffer[s * DIGEST_SIZE:min(s + step, count) * DIGEST_SIZE], min(step, count - s))
+                    buffer[(s // 2) * DIGEST_SIZE:(s // 2) * DIGEST_SIZE + len(parents)] = parents
+            count = pairs
+
+        return buffer[:DIGEST_SIZE].hex()
+
+    # --- APPEND-ONLY MERKLE ACCUMULATOR ---
+    # The frontier maps level -> root of the perfect subtree on the right edge
+    # of the tree. A level is present exactly when that bit of `size` is set,
+    # so appends and root computations both touch at most log2(n) nodes.
+
+    @staticmethod
+    def merkle_append(frontier: Dict[int, str], size: int, leaf_hash: str) -> List[Tuple[int, int, str]]:
+        """
+        Appends a leaf to a tree of `size` leaves by updating `frontier` in place.
+        Returns the (level, index, hash) nodes completed by this append, leaf first.
+        """
+        node = leaf_hash
+        level = 0
+        created = [(0, size, node)]
+        while (size >> level) & 1:
+            node = Hasher.get_hash(frontier.pop(level) + node)
+            level += 1
+            created.append((level, size >> level, node))
+        frontier[level] = node
+        return created
+
+    @staticmethod
+    def merkle_right_edge(frontier: Dict[int, str], size: int) -> Dict[int, str]:
+        """
+        Returns level -> hash of the incomplete node at index size >> level,
+        i.e. the right-edge nodes that are never stored because later appends change them.
+        The top level holds the root (complete or not).
+        """
+        edge = {}
+        if size == 0:
+            return edge
+
+        carry = None  # partial node on the right edge of the current level
+        level = 0
+        while (size + (1 << level) - 1) >> level > 1:
+            if carry is not None:
+                edge[level] = carry
+            if (size >> level) & 1:
+                left = frontier[level]
+                carry = Hasher.get_hash(left + (carry if carry is not None else left))
+            elif carry is not None:
+                carry = Hasher.get_hash(carry + carry)
+            level += 1
+
+        edge[level] = carry if carry is not None else frontier[level]
+        return edge
+
+    @staticmethod
+    def merkle_root_from_frontier(frontier: Dict[int, str], size: int) -> str:
+        """
+        Returns the root of a tree of `size` leaves from its frontier.
+        Matches build_merkle_root (odd nodes are paired with themselves).
+        """
+        if size == 0:
+            return ""
+        edge = SecurityVaultManager.merkle_right_edge(frontier, size)
+        return edge[max(edge)]
+
+    @staticmethod
+    def merkle_proof_path(
+        leaf_index: int,
+        size: int,
+        frontier: Dict[int, str],
+        get_node: Callable[[int, int], str],
+        edge: Optional[Dict[int, str]] = None
+    ) -> List[Dict]:
+        """
+        Builds the proof for a leaf from stored nodes in O(log n).
+        `get_node(level, index)` must return a complete (stored) node;
+        incomplete right-edge nodes are derived from the frontier (or taken
+        from `edge` when many proofs are built for the same tree).
+        Output format is the same as get_merkle_proof.
+        """
+        if not 0 <= leaf_index < size:
+            return []
+
+        if edge is None:
+            edge = SecurityVaultManager.merkle_right_edge(frontier, size)
+
+        def node_at(level: int, index: int) -> str:
+            if (index + 1) << level <= size:
+                return get_node(level, index)
+            return edge[level]
+
+        proof = []
+        level = 0
+        idx = leaf_index
+        while (size + (1 << level) - 1) >> level > 1:
+            count = (size + (1 << level) - 1) >> level
+            sibling = idx ^ 1
+            if sibling >= count:  # last odd node is paired with itself
+                sibling = idx
+            position = "right" if idx % 2 == 0 else "left"
+            proof.append({"position": position, "hash": node_at(level, sibling)})
+            idx //= 2
+            level += 1
+
+        return proof
+
+    @staticmethod
+    def merkle_consistency_proof(
+        old_size: int,
+        size: int,
+        frontier: Dict[int, str],
+        get_node: Callable[[int, int], str],
+        edge: Optional[Dict[int, str]] = None
+    ) -> List[str]:
+        """
+        Proves that the tree with `old_size` leaves is a prefix of the tree with
+        `size` leaves, in O(log n) hashes (same idea as RFC 6962, adapted to
+        duplicate-last pairing). The old tree's frontier nodes are exactly the
+        left siblings on the path from its lowest frontier node to the new root,
+        so the proof is that node (omitted when old_size is a power of two: it is
+        the old root) followed by the path's siblings, bottom up. Siblings that
+        are the node itself (odd last node) are left out. `frontier`, `get_node`
+        and `edge` describe the new tree as in merkle_proof_path.
+        """
+        if not 0 < old_size < size:
+            return []
+
+        if edge is None:
+            edge = SecurityVaultManager.merkle_right_edge(frontier, size)
+
+        def node_at(level: int, index: int) -> str:
+            if (index + 1) << level <= size:
+                return get_node(level, index)
+            return edge[level]
+
+        level = (old_size & -old_size).bit_length() - 1
+        idx = (old_size >> level) - 1
+        proof = [] if old_size == 1 << level else [node_at(level, idx)]
+        while (size + (1 << level) - 1) >> level > 1:
+            count = (size + (1 << level) - 1) >> level
+            if idx ^ 1 < count:
+                proof.append(node_at(level, idx ^ 1))
+            idx //= 2
+            level += 1
+        return proof
+
+    @staticmethod
+    def verify_consistency(old_size: int, old_root: str, size: int, root: str, proof: List[str]) -> bool:
+        """
+        Checks a merkle_consistency_proof: rebuilds both the old root (from the
+        old frontier nodes found along the path) and the new root.
+        """
+        if not 0 < old_size <= size:
+            return False
+        if old_size == size:
+            return not proof and old_root == root
+
+        proof = list(proof)
+        level = (old_size & -old_size).bit_length() - 1
+        idx = (old_size >> level) - 1
+        if old_size == 1 << level:
+            node = old_root
+        elif proof:
+            node = proof.pop(0)
+        else:
+            return False
+
+        old_frontier = {level: node}
+        while (size + (1 << level) - 1) >> level > 1:
+            count = (size + (1 << level) - 1) >> level
+            if idx ^ 1 >= count:
+                node = Hasher.get_hash(node + node)
+            elif not proof:
+                return False
+            elif idx & 1:
+                # Left sibling of the path: a complete node of the old tree
+                old_frontier[level] = proof.pop(0)
+                node = Hasher.get_hash(old_frontier[level] + node)
+            else:
+                node = Hasher.get_hash(node + proof.pop(0))
+            idx //= 2
+            level += 1
+
+        if proof:
+            return False
+        return node == root and SecurityVaultManager.merkle_root_from_frontier(old_frontier, old_size) == old_root
 
     def add_to_chain(self, data: str):
         prev_hash = self.chain[-1] if self.chain else "0" * 64
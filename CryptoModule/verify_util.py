@@ -1,9 +1,19 @@
 import hashlib
 import base64
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from typing import Iterable, Tuple
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.exceptions import InvalidSignature
+from CryptoModule.hash_util import Hasher
+from CryptoModule.security_engine import SecurityVaultManager
+
+logger = logging.getLogger("vault_logger.crypto")
 
 def create_canonical_message(
     file_name: str,
@@ -18,11 +28,111 @@ def create_canonical_message(
     """
     return f"{file_name}|{file_hash}|{timestamp}"
 
+def compute_batch_root(items: Iterable[Tuple[str, str]], timestamp: str) -> str:
+    """
+    Merkle root of a registration batch.
+    Each leaf is the hash of the item's single-file canonical message, so the
+    root commits to every file name and hash and to their order.
+    """
+    leaves = [
+        Hasher.get_hash(create_canonical_message(file_name, file_hash, timestamp))
+        for file_name, file_hash in items
+    ]
+    return SecurityVaultManager.build_merkle_root(leaves)
+
+
+def create_batch_canonical_message(batch_root: str, count: int, timestamp: str) -> str:
+    """
+    The canonical message signed for a batch registration.
+    Format: batch_root|count|timestamp|BATCH
+
+    The count pins the number of leaves (odd levels duplicate their last node),
+    and the trailing tag is never a valid timestamp, so a batch signature can
+    not be replayed as a single-file registration.
+    """
+    return f"{batch_root}|{count}|{timestamp}|BATCH"
+
+
+def create_tree_head_message(tree_size: int, merkle_root: str, timestamp: str) -> str:
+    """
+    The canonical message the SERVER signs for a tree head.
+    Format: tree_size|merkle_root|timestamp|STH
+    Verify it with verify_signature and the key from GET /signing-key.
+    """
+    return f"{tree_size}|{merkle_root}|{timestamp}|STH"
+
+
+def public_key_fingerprint(public_key_pem: str) -> str:
+    """SHA-256 of the PEM text (surrounding whitespace ignored); identifies a client key."""
+    return hashlib.sha256(public_key_pem.strip().encode('utf-8')).hexdigest()
+
+
+class PublicKeyCache:
+    """
+    Bounded LRU cache of parsed public keys, keyed by PEM fingerprint.
+    Entries expire after `ttl` seconds; hit/miss counters feed the metrics.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()   # fingerprint -> (expires_at, key)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, public_key_pem: str):
+        fingerprint = public_key_fingerprint(public_key_pem)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(fingerprint)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Parse outside the lock; invalid PEM raises ValueError and is not cached
+        key = serialization.load_pem_public_key(public_key_pem.encode('utf-8'))
+
+        with self._lock:
+            self._entries[fingerprint] = (now + self.ttl, key)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return key
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+_key_cache = PublicKeyCache(
+    max_size=int(os.getenv("VAULT_KEY_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("VAULT_KEY_CACHE_TTL", "3600"))
+)
+
+
+def get_key_cache_stats() -> dict:
+    return _key_cache.stats()
+
+
 def verify_signature(public_key_pem: str, message: str, signature_b64: str) -> bool:
     try:
-        public_key = serialization.load_pem_public_key(
-            public_key_pem.encode('utf-8')
-        )
+        public_key = _key_cache.get(public_key_pem)
         signature = base64.b64decode(signature_b64)
         
         public_key.verify(
@@ -36,9 +146,19 @@ def verify_signature(public_key_pem: str, message: str, signature_b64: str) -> b
         )
         return True
     except (InvalidSignature, ValueError, Exception) as e:
-        print(f"Verification Error: {e}")
+        logger.warning("Signature verification failed: %s", e, extra={"error_type": type(e).__name__})
         return False
 
+def verify_batch_signature(items, timestamp: str, public_key_pem: str, signature_b64: str) -> Tuple[str, bool]:
+    """
+    Recomputes the batch root and verifies the client's signature over it.
+    Returns (batch_root, is_valid); runs as one task in a worker process.
+    """
+    items = list(items)
+    batch_root = compute_batch_root(items, timestamp)
+    message = create_batch_canonical_message(batch_root, len(items), timestamp)
+    return batch_root, verify_signature(public_key_pem, message, signature_b64)
+
 def check_replay_protection(timestamp: str, window_minutes: int = 5) -> bool:
     try:
         if timestamp.endswith('Z'):
@@ -55,5 +175,5 @@ def check_replay_protection(timestamp: str, window_minutes: int = 5) -> bool:
 
         return -1 <= diff_minutes < window_minutes
     except Exception as e:
-        print(f"Replay Check Error: {e}")
+        logger.warning("Replay check failed: %s", e, extra={"error_type": type(e).__name__})
         return False
\ No newline at end of file
@@ -0,0 +1,183 @@
+import hashlib
+import math
+import threading
+import time
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over byte strings.
+
+    Sized for `capacity` items at false-positive rate `fp_rate`. Bit positions
+    come from one 128-bit BLAKE2b digest by double hashing (Kirsch-Mitzenmacher).
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1.")
+        self.capacity = max(int(capacity), 1)
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, math.ceil(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0   # distinct items (adds that set at least one new bit)
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: bytes):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key: bytes) -> bool:
+        """Adds a key; returns False if it was (probably) present already."""
+        bits = self._bits
+        new = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def estimated_fp_rate(self) -> float:
+        """Expected false-positive rate at the current fill: (1 - e^(-kn/m))^k."""
+        k, m = self.num_hashes, self.num_bits
+        return (1.0 - math.exp(-k * self.count / m)) ** k
+
+
+class RecordFilter:
+    """
+    Bloom filter over records.file_hash, kept in sync with the database.
+
+    A miss means the hash is definitely not in the vault, so /verify can answer
+    without a query. Inserts of this process are added by the chain writer;
+    commits by other processes are detected through PRAGMA data_version on a
+    dedicated connection and folded in by id. When the number of items
+    outgrows the capacity, the filter is rebuilt twice as large.
+
+    Hits neither lock nor query. Only a miss, which is about to be answered
+    without the database, checks data_version first (at most once per
+    `sync_interval` seconds, if set); misses waiting for the lock meanwhile
+    share the check that ran while they waited.
+    """
+
+    def __init__(self, connect, capacity: int, fp_rate: float, sync_interval: float = 0.0):
+        self._connect = connect
+        self._capacity = capacity
+        self._fp_rate = fp_rate
+        self._sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._bloom = None
+        self._version = None
+        self._synced_at = float("-inf")
+        self._last_id = 0
+        self.counters = {"negatives": 0, "positives": 0, "false_positives": 0, "rebuilds": 0}
+
+    @staticmethod
+    def _key(file_hash: str) -> bytes:
+        return file_hash.encode("utf-8")
+
+    def rebuild(self):
+        """(Re)loads every file_hash, e.g. at startup or after the database file was replaced."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = self._connect()
+            self._load(self._capacity)
+
+    def _load(self, capacity: int):
+        self._synced_at = time.monotonic()
+        self._version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        count = self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        # Leave room to grow before the next rebuild
+        self._capacity = max(capacity, count * 2)
+        self._bloom = BloomFilter(self._capacity, self._fp_rate)
+        self._last_id = 0
+        self._catch_up()
+        self.counters["rebuilds"] += 1
+
+    def _catch_up(self):
+        cur = self._conn.execute(
+            "SELECT id, file_hash FROM records WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        )
+        for record_id, file_hash in cur:
+            if file_hash is not None:
+                self._bloom.add(self._key(file_hash))
+            self._last_id = record_id
+
+    def _sync(self):
+        if self._bloom is None:
+            return
+        self._synced_at = time.monotonic()
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._version = version
+            self._catch_up()
+        if self._bloom.count > self._capacity:
+            self._load(self._capacity * 2)
+
+    def add(self, file_hashes):
+        """Adds hashes committed by this process (read-your-writes without a resync)."""
+        with self._lock:
+            if self._bloom is not None:
+                for file_hash in file_hashes:
+                    self._bloom.add(self._key(file_hash))
+
+    def might_contain(self, file_hash: str) -> bool:
+        """False means definitely absent; True means 'ask the database'."""
+        bloom = self._bloom
+        key = self._key(file_hash)
+        if bloom is None or key in bloom or self._present_after_sync(key):
+            self.counters["positives"] += 1
+            return True
+        self.counters["negatives"] += 1
+        return False
+
+    def _present_after_sync(self, key: bytes) -> bool:
+        """Folds in commits of other processes (if due) before a miss is trusted."""
+        missed_at = time.monotonic()
+        if missed_at - self._synced_at < self._sync_interval:
+            return False
+        with self._lock:
+            if self._bloom is None:
+                return True
+            # A check started after this miss (by a miss that held the lock) covers it as well
+            if self._synced_at < missed_at and time.monotonic() - self._synced_at >= self._sync_interval:
+                self._sync()
+            return key in self._bloom
+
+    def record_false_positive(self, count: int = 1):
+        """Reports positives the database did not confirm (for the observed FP rate)."""
+        with self._lock:
+            self.counters["false_positives"] += count
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._bloom = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            bloom = self._bloom
+            positives = self.counters["positives"]
+            return {
+                "capacity": self._capacity,
+                "items": bloom.count if bloom else 0,
+                "bits": bloom.num_bits if bloom else 0,
+                "hashes": bloom.num_hashes if bloom else 0,
+                "target_fp_rate": self._fp_rate,
+                "estimated_fp_rate": bloom.estimated_fp_rate() if bloom else 0.0,
+                "observed_fp_rate": self.counters["false_positives"] / positives if positives else 0.0,
+                **self.counters
+            }
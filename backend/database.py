@@ -1,20 +1,168 @@
+import atexit
+import logging
+import os
 import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Dict, NamedTuple
+
+from backend.pool import ConnectionPool
+from backend.bloom import RecordFilter
+from backend.deep_audit import SEGMENT_SIZE, Segment, deep_audit
+from backend.head_cache import ChainHead, ChainHeadCache
+from backend.ledger import Ledger
+from backend.records import RECORD_COLUMNS, record_cursor
+from backend.metrics import STAGE_LATENCY
+from backend.writer import ChainWriter
+from CryptoModule.verify_util import public_key_fingerprint
+from CryptoModule.chain_validator import ChainValidator
+from CryptoModule.chunking import ChunkManifest
+from CryptoModule.security_engine import SecurityVaultManager
 
 # Database file path (vault.db will be created inside the backend folder)
-DB_PATH = Path(__file__).resolve().parent / "vault.db"
+DB_PATH = Path(os.getenv("VAULT_DB_PATH", Path(__file__).resolve().parent / "vault.db"))
+
+# Connection settings (overridable via environment)
+POOL_SIZE = int(os.getenv("VAULT_DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.getenv("VAULT_DB_POOL_TIMEOUT", "30"))
+BUSY_TIMEOUT = float(os.getenv("VAULT_DB_BUSY_TIMEOUT", "5"))
+JOURNAL_MODE = os.getenv("VAULT_DB_JOURNAL_MODE", "WAL")
+SYNCHRONOUS = os.getenv("VAULT_DB_SYNCHRONOUS", "NORMAL")
+CACHE_SIZE = int(os.getenv("VAULT_DB_CACHE_SIZE", "-16384"))            # negative = KiB
+MMAP_SIZE = int(os.getenv("VAULT_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+STATEMENT_CACHE = int(os.getenv("VAULT_DB_STATEMENT_CACHE", "256"))
+
+# Chain writer: registrations committed per transaction, seconds a caller waits
+WRITER_MAX_GROUP = int(os.getenv("VAULT_WRITER_MAX_GROUP", "256"))
+WRITER_TIMEOUT = float(os.getenv("VAULT_WRITER_TIMEOUT", "60"))
+WRITER_MAX_PENDING = int(os.getenv("VAULT_WRITER_MAX_PENDING", "4096"))
+
+# Membership filter for negative lookups (set VAULT_BLOOM_ENABLED=0 to disable)
+BLOOM_ENABLED = os.getenv("VAULT_BLOOM_ENABLED", "1") != "0"
+BLOOM_CAPACITY = int(os.getenv("VAULT_BLOOM_CAPACITY", "1000000"))
+BLOOM_FP_RATE = float(os.getenv("VAULT_BLOOM_FP_RATE", "0.01"))
+BLOOM_SYNC_INTERVAL = float(os.getenv("VAULT_BLOOM_SYNC_INTERVAL", "0"))
+
+# Chain storage: "sqlite" (records table, default) or "ledger" (append-only binary
+# files read via mmap; keys and audit checkpoints stay in SQLite)
+STORAGE = os.getenv("VAULT_STORAGE", "sqlite")
+LEDGER_PATH = os.getenv("VAULT_LEDGER_PATH")                            # default: <DB_PATH>.ledger
+LEDGER_SYNC = os.getenv("VAULT_LEDGER_SYNC", "1") != "0"
+
+# Bound parameters per IN (...) list (SQLite's historical limit is 999)
+IN_CHUNK = 500
+
+logger = logging.getLogger("vault_logger.db")
+
+
+class TreeStateError(RuntimeError):
+    """Raised when a Merkle node the stored tree state needs is missing (see /audit?deep=true)."""
 
 
 def get_connection():
-    """Connects to the SQLite database and returns the connection object."""
-    conn = sqlite3.connect(DB_PATH)
+    """Opens a new, tuned connection to the SQLite database (use the pool instead)."""
+    # Pooled connections move between worker threads, one thread at a time
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=BUSY_TIMEOUT,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size = {CACHE_SIZE}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
     return conn
 
 
+_pool = ConnectionPool(get_connection, max_size=POOL_SIZE, timeout=POOL_TIMEOUT)
+atexit.register(_pool.reset)
+
+
+def hash_key(file_hash: str) -> bytes:
+    """
+    Compact lookup key for a file hash: the raw 32 bytes of a SHA-256 hex
+    digest (half the size of the hex text), or the UTF-8 text for anything else.
+    """
+    if file_hash is None:
+        return None
+    if len(file_hash) == 64:
+        try:
+            return bytes.fromhex(file_hash)
+        except ValueError:
+            pass
+    return file_hash.encode("utf-8")
+
+
+def get_pool_stats() -> dict:
+    """Returns counters of the connection pool."""
+    return _pool.snapshot()
+
+
+_record_filter = (
+    RecordFilter(get_connection, BLOOM_CAPACITY, BLOOM_FP_RATE, BLOOM_SYNC_INTERVAL) if BLOOM_ENABLED else None
+)
+if _record_filter is not None:
+    atexit.register(_record_filter.close)
+
+
+def get_bloom_stats() -> dict:
+    """Returns size, fill and false-positive figures of the membership filter."""
+    return _record_filter.stats() if _record_filter is not None else {}
+
+
+# Chain head (last record, frontier, root) of the SQLite storage, see _chain_head
+_head_cache = ChainHeadCache()
+
+
+def get_head_cache_stats() -> dict:
+    """Returns hit/miss counters of the chain head cache."""
+    return _head_cache.snapshot()
+
+
+def get_storage_stats() -> dict:
+    """Returns the sizes of the binary ledger (empty for the SQLite storage)."""
+    return _storage.stats() if _storage is not None else {}
+
+
 def init_db():
-    """Creates the records table if it does not exist."""
-    conn = get_connection()
+    """Creates the records and Merkle accumulator tables if they do not exist."""
+    global _storage
+
+    # The database file may have been replaced (e.g. tests): drop old connections and cached state first
+    _pool.reset()
+    _head_cache.invalidate()
+
+    with _pool.connection() as conn:
+        _create_schema(conn)
+
+    if _storage is not None:
+        _storage.close()
+    _storage = None
+
+    if STORAGE == "ledger":
+        storage = LedgerStorage(Ledger(LEDGER_PATH or Path(DB_PATH).with_suffix(".ledger"), sync=LEDGER_SYNC))
+    elif STORAGE == "sqlite":
+        storage = SQLiteStorage()
+    else:
+        raise ValueError(f"Unknown VAULT_STORAGE: {STORAGE}")
+    storage.open()
+    _storage = storage
+
+
+def _close_storage():
+    if _storage is not None:
+        _storage.close()
+
+
+atexit.register(_close_storage)
+
+
+def _create_schema(conn):
     cur = conn.cursor()
 
     cur.execute(
@@ -26,94 +174,1093 @@ def init_db():
             prev_hash TEXT,
             timestamp TEXT,
             user_key TEXT,
-            merkle_root TEXT
+            merkle_root TEXT,
+            leaf_index INTEGER,
+            file_hash_bin BLOB,
+            key_id INTEGER REFERENCES keys (id)
+        )
+        """
+    )
+    _add_column_if_missing(cur, "records", "leaf_index", "INTEGER")
+
+    # Binary hash key + index for /verify (vaults created before it are backfilled once)
+    if _add_column_if_missing(cur, "records", "file_hash_bin", "BLOB"):
+        conn.create_function("vault_hash_key", 1, hash_key, deterministic=True)
+        cur.execute("UPDATE records SET file_hash_bin = vault_hash_key(file_hash)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_records_file_hash_bin ON records (file_hash_bin)")
+
+    # Client public keys are stored once and referenced by id from records
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS keys (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fingerprint TEXT NOT NULL UNIQUE,
+            pem TEXT NOT NULL
+        )
+        """
+    )
+    if _add_column_if_missing(cur, "records", "key_id", "INTEGER REFERENCES keys (id)"):
+        _move_keys_to_table(conn)
+
+    # Right-edge frontier of the vault-wide Merkle tree (one row per level)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS merkle_frontier (
+            level INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL
+        )
+        """
+    )
+
+    # Complete (never changing) nodes of the tree, level 0 = leaves
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS merkle_nodes (
+            level INTEGER NOT NULL,
+            idx INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (level, idx)
+        ) WITHOUT ROWID
+        """
+    )
+
+    # Number of leaves folded into the frontier (single row, id = 1)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS merkle_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            size INTEGER NOT NULL,
+            generation INTEGER NOT NULL DEFAULT 0,
+            legacy_leaves INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    # Bumped by every append (any process): validates in-process copies of the head
+    _add_column_if_missing(cur, "merkle_state", "generation", "INTEGER NOT NULL DEFAULT 0")
+    # Leading records whose merkle_root predates the vault-wide tree (see _count_legacy_leaves)
+    legacy_added = _add_column_if_missing(cur, "merkle_state", "legacy_leaves", "INTEGER NOT NULL DEFAULT 0")
+
+    # Results of successful chain audits; the next audit resumes after last_id
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS audit_checkpoints (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            last_id INTEGER NOT NULL,
+            last_file_hash TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            record_count INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+
+    # Published, server-signed (size, root, timestamp) heads of the vault tree
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tree_heads (
+            tree_size INTEGER PRIMARY KEY,
+            merkle_root TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            signature TEXT NOT NULL
+        )
+        """
+    )
+
+    # Per-file Merkle trees of chunk hashes (raw 32-byte hashes and uint64 lengths, in order)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chunk_manifests (
+            file_hash TEXT PRIMARY KEY,
+            file_size INTEGER NOT NULL,
+            mode TEXT NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            chunk_root TEXT NOT NULL,
+            chunk_hashes BLOB NOT NULL,
+            chunk_lengths BLOB NOT NULL
         )
         """
     )
 
+    # Existing vaults: build the accumulator and node table once from the stored hashes
+    state = cur.execute("SELECT size FROM merkle_state WHERE id = 1").fetchone()
+    leaves = cur.execute("SELECT MAX(idx) AS last FROM merkle_nodes WHERE level = 0").fetchone()
+    stored_leaves = leaves["last"] + 1 if leaves["last"] is not None else 0
+    if state is None or state["size"] != stored_leaves:
+        _rebuild_merkle_tree(cur)
+    if state is None or legacy_added:
+        cur.execute("UPDATE merkle_state SET legacy_leaves = ? WHERE id = 1", (_count_legacy_leaves(cur),))
+
     conn.commit()
-    conn.close()
+
+
+def _add_column_if_missing(cur, table: str, column: str, declaration: str) -> bool:
+    """
+    Schema migration helper for vault.db files created by older versions.
+    Returns True if the column had to be added.
+    """
+    columns = [row["name"] for row in cur.execute(f"PRAGMA table_info({table})")]
+    if column in columns:
+        return False
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    return True
+
+
+def _move_keys_to_table(conn):
+    """Migration: replaces the PEM text repeated in records.user_key with a key_id."""
+    cur = conn.cursor()
+    conn.create_function("vault_key_fingerprint", 1, public_key_fingerprint, deterministic=True)
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO keys (fingerprint, pem)
+        SELECT vault_key_fingerprint(user_key), user_key FROM records
+        WHERE user_key IS NOT NULL ORDER BY id
+        """
+    )
+    cur.execute(
+        """
+        UPDATE records
+        SET key_id = (SELECT id FROM keys WHERE fingerprint = vault_key_fingerprint(records.user_key)),
+            user_key = NULL
+        WHERE user_key IS NOT NULL
+        """
+    )
+
+
+def _get_or_create_key(cur, public_key_pem: str) -> int:
+    """Returns the id of a public key, storing it on first use."""
+    fingerprint = public_key_fingerprint(public_key_pem)
+    row = cur.execute("SELECT id FROM keys WHERE fingerprint = ?", (fingerprint,)).fetchone()
+    if row is not None:
+        return row["id"]
+    cur.execute(
+        "INSERT INTO keys (fingerprint, pem) VALUES (?, ?)",
+        (fingerprint, public_key_pem)
+    )
+    return cur.lastrowid
+
+
+def get_public_key(key_id: int):
+    """Returns the PEM of a stored public key (or None)."""
+    with _pool.connection() as conn:
+        row = conn.execute("SELECT pem FROM keys WHERE id = ?", (key_id,)).fetchone()
+    return row["pem"] if row else None
+
+
+def _import_records_into_ledger(conn, ledger: Ledger, batch_size: int = 10000):
+    """Migration: copies the records table into an empty ledger (first start with VAULT_STORAGE=ledger)."""
+    if len(ledger):
+        return
+    frontier = {}
+    size = 0
+    cur = record_cursor(conn).execute(f"SELECT {RECORD_COLUMNS} FROM records ORDER BY id ASC")
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        nodes = []
+        for r in rows:
+            nodes.extend(SecurityVaultManager.merkle_append(frontier, size, r["file_hash"]))
+            size += 1
+        ledger.append(
+            [(r["file_name"], r["file_hash"], r["prev_hash"], r["timestamp"], r["key_id"], r["merkle_root"])
+             for r in rows],
+            nodes
+        )
+
+
+def _rebuild_merkle_tree(cur):
+    """Recomputes the frontier and node table from every record (one-time migration)."""
+    frontier = {}
+    size = 0
+    cur.execute("DELETE FROM merkle_nodes")
+    for row in cur.execute("SELECT id, file_hash FROM records ORDER BY id ASC").fetchall():
+        cur.executemany(
+            "INSERT INTO merkle_nodes (level, idx, hash) VALUES (?, ?, ?)",
+            SecurityVaultManager.merkle_append(frontier, size, row["file_hash"])
+        )
+        cur.execute("UPDATE records SET leaf_index = ? WHERE id = ?", (size, row["id"]))
+        size += 1
+
+    _save_merkle_frontier(cur, frontier, size)
+
+
+def _count_legacy_leaves(cur) -> int:
+    """
+    Leaves written before the vault-wide tree existed. Older versions stored
+    the root of [file_hash, prev_hash] per record as merkle_root; those roots
+    are covered by the checkpoint digests, so they are kept and audited with
+    the old formula. Returns the leaf count up to the last such record.
+    """
+    legacy = 0
+    for row in cur.execute("SELECT file_hash, prev_hash, merkle_root, leaf_index FROM records ORDER BY id"):
+        if row["merkle_root"] == SecurityVaultManager.build_merkle_root([row["file_hash"], row["prev_hash"]]):
+            legacy = row["leaf_index"] + 1
+    return legacy
+
+
+def _legacy_leaves() -> int:
+    with _pool.connection() as conn:
+        row = conn.execute("SELECT legacy_leaves FROM merkle_state WHERE id = 1").fetchone()
+    return row["legacy_leaves"] if row else 0
+
+
+def _load_merkle_frontier(cur):
+    """Returns (frontier, size) of the vault-wide Merkle tree."""
+    row = cur.execute("SELECT size FROM merkle_state WHERE id = 1").fetchone()
+    size = row["size"] if row else 0
+    frontier = {
+        r["level"]: r["hash"]
+        for r in cur.execute("SELECT level, hash FROM merkle_frontier")
+    }
+    return frontier, size
+
+
+def _save_merkle_frontier(cur, frontier, size: int):
+    """Replaces the stored frontier (at most log2(n) rows) and leaf count, and bumps the generation."""
+    cur.execute("DELETE FROM merkle_frontier")
+    cur.executemany(
+        "INSERT INTO merkle_frontier (level, hash) VALUES (?, ?)",
+        frontier.items()
+    )
+    cur.execute(
+        """
+        INSERT INTO merkle_state (id, size) VALUES (1, ?)
+        ON CONFLICT (id) DO UPDATE SET size = excluded.size, generation = generation + 1
+        """,
+        (size,)
+    )
+
+
+def _chain_head(cur) -> ChainHead:
+    """
+    The current chain head: from the in-process cache when the stored
+    generation still matches (one single-row read), else read through from
+    the records and frontier tables. Call inside a transaction, so the
+    generation and the head come from the same snapshot.
+    """
+    state = cur.execute("SELECT size, generation FROM merkle_state WHERE id = 1").fetchone()
+    generation = state["generation"] if state else 0
+    head = _head_cache.get(generation)
+    if head is None:
+        last = record_cursor(cur.connection).execute(
+            f"SELECT {RECORD_COLUMNS} FROM records ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        frontier, size = _load_merkle_frontier(cur)
+        head = ChainHead(generation, size, frontier,
+                         SecurityVaultManager.merkle_root_from_frontier(frontier, size), last)
+        _head_cache.set(head)
+    return head
+
+
+def _frontier_at(cur, size: int, strict: bool = True):
+    """
+    Frontier of the tree as it was when it had `size` leaves. Its nodes are
+    complete subtrees, so they are all in merkle_nodes; a missing one raises
+    TreeStateError, or is None with strict=False (left to the deep audit).
+    """
+    frontier = {}
+    for level in range(size.bit_length()):
+        if (size >> level) & 1:
+            row = cur.execute(
+                "SELECT hash FROM merkle_nodes WHERE level = ? AND idx = ?",
+                (level, (size >> level) - 1)
+            ).fetchone()
+            if row is None and strict:
+                raise TreeStateError(f"Merkle node ({level}, {(size >> level) - 1}) is missing")
+            frontier[level] = row["hash"] if row else None
+    return frontier
+
+
+def _node_lookup(cur, cached=None):
+    """get_node callback for merkle_proof_path: in-memory nodes first, then the node table."""
+    def get_node(level: int, index: int) -> str:
+        if cached is not None and (level, index) in cached:
+            return cached[(level, index)]
+        row = cur.execute(
+            "SELECT hash FROM merkle_nodes WHERE level = ? AND idx = ?",
+            (level, index)
+        ).fetchone()
+        if row is None:
+            raise TreeStateError(f"Merkle node ({level}, {index}) is missing")
+        return row["hash"]
+    return get_node
+
+
+def _after_commit(head: ChainHead, frontier, size: int, job_records):
+    """In-process state after a committed group: the new chain head and the membership filter."""
+    # This commit bumped the generation by one; the next group builds on it without a read
+    last = next((records[-1] for records in reversed(job_records) if records), head.last_record)
+    root = last["merkle_root"] if last is not head.last_record else head.root
+    _head_cache.set(ChainHead(head.generation + 1, size, dict(frontier), root, last))
+
+    if _record_filter is not None:
+        _record_filter.add(r["file_hash"] for records in job_records for r in records)
+
+
+def _group_proofs(jobs, first_leaf: int, frontier, size: int, get_node):
+    """
+    (root, proofs per job) of a group whose leaves start at `first_leaf`:
+    inclusion proofs for the jobs that asked for them, None for the others.
+    """
+    edge = SecurityVaultManager.merkle_right_edge(frontier, size)
+    proofs = []
+    for job in jobs:
+        if job.with_proofs:
+            proofs.append([
+                SecurityVaultManager.merkle_proof_path(leaf, size, frontier, get_node, edge)
+                for leaf in range(first_leaf, first_leaf + len(job.entries))
+            ])
+        else:
+            proofs.append(None)
+        first_leaf += len(job.entries)
+    return edge[max(edge)], proofs
+
+
+def _group_results(job_records, size: int, root: str, proofs):
+    """One writer result per job: the inserted records and, if asked for, their proofs."""
+    return [
+        {"tree_size": size, "merkle_root": root, "records": records, "proofs": job_proofs}
+        for records, job_proofs in zip(job_records, proofs)
+    ]
+
+
+class TreeView(NamedTuple):
+    """One consistent state of the vault tree (see ChainStorage.tree)."""
+    size: int
+    frontier: Dict[int, str]
+    frontier_at: Callable[[int], Dict[int, str]]   # frontier of the tree with fewer leaves
+    node: Callable[[int, int], str]               # complete node, the get_node of merkle_proof_path
+
+
+class ChainStorage(ABC):
+    """
+    Where the chain lives: the records, the Merkle nodes and the chain head.
+    init_db selects one implementation (VAULT_STORAGE) and the public
+    functions of this module only talk to it, so callers never branch on the
+    storage. Keys, checkpoints, tree heads and manifests stay in SQLite.
+    A backend missing one of the abstract methods cannot be instantiated.
+    """
+
+    def open(self):
+        """Prepares the storage once the schema exists."""
+
+    def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+    @abstractmethod
+    def commit_group(self, jobs):
+        """The chain writer's commit_group: appends the jobs, returns one result per job."""
+
+    @abstractmethod
+    def tree(self):
+        """Context manager yielding a TreeView; reads inside it see one snapshot."""
+
+    def root(self):
+        """(size, root) of the vault tree."""
+        with self.tree() as tree:
+            return tree.size, SecurityVaultManager.merkle_root_from_frontier(tree.frontier, tree.size)
+
+    @abstractmethod
+    def last_record(self):
+        """The newest record, or None."""
+
+    @abstractmethod
+    def iter_records(self, after_id: int = 0, batch_size: int = 500):
+        """Yields the records with id > after_id in order."""
+
+    @abstractmethod
+    def records_page(self, after_id: int, limit: int):
+        """Up to `limit` records with id > after_id, in order."""
+
+    @abstractmethod
+    def record_before(self, record_id: int):
+        """The record preceding `record_id`, or None."""
+
+    @abstractmethod
+    def record_by_id(self, record_id: int):
+        """The record with this id, or None."""
+
+    @abstractmethod
+    def record_by_hash(self, file_hash: str):
+        """The first record with this file hash, or None."""
+
+    @abstractmethod
+    def records_by_hashes(self, file_hashes) -> dict:
+        """{file_hash: first record} for the hashes that are stored."""
+
+    @abstractmethod
+    def segments(self):
+        """(source, deep-audit segments, stored frontier of the whole tree), see deep_audit."""
+
+
+class SQLiteStorage(ChainStorage):
+    """The records and merkle_* tables of vault.db (VAULT_STORAGE=sqlite, the default)."""
+
+    def open(self):
+        if _record_filter is not None:
+            _record_filter.rebuild()
+
+    def commit_group(self, jobs):
+        """
+        Applies a group of queued WriteJobs in ONE BEGIN IMMEDIATE transaction
+        (called by the chain writer thread only). The head is read inside the
+        transaction, all rows go in with one executemany and are read back by
+        id (nobody else can append while the lock is held), so every caller
+        gets exactly the records it inserted. A row appended without bumping
+        the generation shows up as a count mismatch: the group is rolled back
+        and retried once on the head read from the tables. Returns one result
+        dict per job.
+        """
+        with _pool.connection() as conn:
+            cur = conn.cursor()
+
+            clock = time.perf_counter
+            # A second pass re-reads the head from the tables (see the count check below)
+            for attempt in range(2):
+                started = clock()
+                # IMMEDIATE: other processes cannot move the head between read and write
+                cur.execute("BEGIN IMMEDIATE")
+                try:
+                    # Usually a cache hit: only the generation is read
+                    head = _chain_head(cur)
+                    prev_hash = head.last_record["file_hash"] if head.last_record else "GENESIS"
+                    frontier, size = dict(head.frontier), head.size
+                    key_ids = [_get_or_create_key(cur, job.user_key) for job in jobs]
+                    head_done = clock()
+
+                    nodes = []
+                    rows = []
+                    for job, key_id in zip(jobs, key_ids):
+                        for file_name, file_hash in job.entries:
+                            nodes.extend(SecurityVaultManager.merkle_append(frontier, size, file_hash))
+                            merkle_root = SecurityVaultManager.merkle_root_from_frontier(frontier, size + 1)
+                            rows.append((file_name, file_hash, prev_hash, job.timestamp, key_id,
+                                         merkle_root, size, hash_key(file_hash)))
+                            prev_hash = file_hash
+                            size += 1
+                    merkle_time = clock() - head_done
+
+                    # One statement for the whole group; the lock keeps every id above the old head ours
+                    cur.executemany(
+                        """
+                        INSERT INTO records (file_name, file_hash, prev_hash, timestamp, key_id, merkle_root, leaf_index, file_hash_bin)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        rows
+                    )
+                    inserted_rows = record_cursor(conn).execute(
+                        f"SELECT {RECORD_COLUMNS} FROM records WHERE id > ? ORDER BY id",
+                        (head.last_record["id"] if head.last_record else 0,)
+                    ).fetchall()
+                    if len(inserted_rows) != len(rows):
+                        conn.rollback()
+                        _head_cache.invalidate()
+                        if attempt:
+                            raise RuntimeError("Records were appended outside the chain writer's transaction.")
+                        # A row appended without bumping the generation left the cached head stale
+                        logger.warning("Records were appended outside the chain writer; re-reading the chain head")
+                        continue
+                    job_records = []
+                    for job in jobs:
+                        job_records.append(inserted_rows[:len(job.entries)])
+                        inserted_rows = inserted_rows[len(job.entries):]
+
+                    cur.executemany(
+                        "INSERT INTO merkle_nodes (level, idx, hash) VALUES (?, ?, ?)",
+                        nodes
+                    )
+                    _save_merkle_frontier(cur, frontier, size)
+                    inserted = clock()
+
+                    # Results (and proofs) are built before the commit: once it succeeds,
+                    # nothing may fail the group, or the writer would append it again.
+                    # Nodes of this group are still in memory; only older ones hit the index.
+                    get_node = _node_lookup(cur, {(level, idx): h for level, idx, h in nodes})
+                    root, proofs = _group_proofs(jobs, head.size, frontier, size, get_node)
+                    results = _group_results(job_records, size, root, proofs)
+
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    _head_cache.invalidate()
+                    raise
+                break
+
+            committed = clock()
+            try:
+                _after_commit(head, frontier, size, job_records)
+                STAGE_LATENCY.observe(head_done - started, stage="head_lookup")
+                STAGE_LATENCY.observe(merkle_time, stage="merkle_build")
+                STAGE_LATENCY.observe(inserted - head_done - merkle_time, stage="db_insert")
+                STAGE_LATENCY.observe(committed - inserted, stage="db_commit")
+            except Exception:
+                # The rows are durable: drop the cached head (the next group reads it back) and
+                # leave the membership filter to its data_version resync
+                _head_cache.invalidate()
+                logger.exception("Bookkeeping after a chain commit failed")
+            return results
+
+    @contextmanager
+    def tree(self):
+        with _pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                frontier, size = _load_merkle_frontier(cur)
+                yield TreeView(size, frontier, lambda n: _frontier_at(cur, n), _node_lookup(cur))
+            finally:
+                conn.rollback()
+
+    def root(self):
+        head = _read_chain_head()
+        return head.size, head.root
+
+    def last_record(self):
+        return _read_chain_head().last_record
+
+    def iter_records(self, after_id: int = 0, batch_size: int = 500):
+        with _pool.connection() as conn:
+            cur = record_cursor(conn)
+            cur.execute(f"SELECT {RECORD_COLUMNS} FROM records WHERE id > ? ORDER BY id ASC", (after_id,))
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def records_page(self, after_id: int, limit: int):
+        with _pool.connection() as conn:
+            return record_cursor(conn).execute(
+                f"SELECT {RECORD_COLUMNS} FROM records WHERE id > ? ORDER BY id ASC LIMIT ?",
+                (after_id, limit)
+            ).fetchall()
+
+    def record_before(self, record_id: int):
+        with _pool.connection() as conn:
+            return record_cursor(conn).execute(
+                f"SELECT {RECORD_COLUMNS} FROM records WHERE id < ? ORDER BY id DESC LIMIT 1",
+                (record_id,)
+            ).fetchone()
+
+    def record_by_id(self, record_id: int):
+        with _pool.connection() as conn:
+            return record_cursor(conn).execute(
+                f"SELECT {RECORD_COLUMNS} FROM records WHERE id = ?", (record_id,)
+            ).fetchone()
+
+    def record_by_hash(self, file_hash: str):
+        # Seeks the file_hash_bin index; the text comparison keeps the match exact.
+        # Hashes the membership filter rules out are answered without a query.
+        if _record_filter is not None and not _record_filter.might_contain(file_hash):
+            return None
+
+        with _pool.connection() as conn:
+            row = record_cursor(conn).execute(
+                f"SELECT {RECORD_COLUMNS} FROM records WHERE file_hash_bin = ? AND file_hash = ? ORDER BY id LIMIT 1",
+                (hash_key(file_hash), file_hash)
+            ).fetchone()
+
+        if row is None and _record_filter is not None:
+            _record_filter.record_false_positive()
+        return row
+
+    def records_by_hashes(self, file_hashes) -> dict:
+        wanted = list(dict.fromkeys(file_hashes))
+        if _record_filter is not None:
+            wanted = [h for h in wanted if _record_filter.might_contain(h)]
+        found = {}
+
+        with _pool.connection() as conn:
+            cur = record_cursor(conn)
+
+            for start in range(0, len(wanted), IN_CHUNK):
+                chunk = wanted[start:start + IN_CHUNK]
+                exact = set(chunk)
+                keys = list({hash_key(h) for h in chunk})
+                cur.execute(
+                    f"SELECT {RECORD_COLUMNS} FROM records WHERE file_hash_bin IN ({','.join('?' * len(keys))}) ORDER BY id",
+                    keys
+                )
+                for row in cur:
+                    # Keys are case-insensitive for hex; the text match keeps it exact
+                    if row.file_hash in exact and row.file_hash not in found:
+                        found[row.file_hash] = row
+
+        if _record_filter is not None and len(found) < len(wanted):
+            _record_filter.record_false_positive(len(wanted) - len(found))
+        return found
+
+    def segments(self):
+        with _pool.connection() as conn:
+            cur = conn.cursor()
+
+            # One snapshot for the boundaries and the stored frontiers
+            cur.execute("BEGIN")
+            try:
+                final_frontier, _ = _load_merkle_frontier(cur)
+                row = cur.execute("SELECT COUNT(*) AS count, MAX(id) AS last FROM records").fetchone()
+                total, max_id = row["count"], row["last"]
+
+                segments = []
+                start = after_id = 0
+                while start < total:
+                    boundary = cur.execute(
+                        "SELECT id FROM records WHERE id > ? ORDER BY id LIMIT 1 OFFSET ?",
+                        (after_id, SEGMENT_SIZE - 1)
+                    ).fetchone()
+                    last_id = boundary["id"] if boundary else max_id
+                    count = min(SEGMENT_SIZE, total - start)
+                    segments.append(Segment(start, after_id, last_id, count,
+                                            _frontier_at(cur, start, strict=False)))
+                    start += count
+                    after_id = last_id
+            finally:
+                conn.rollback()
+
+        return ("sqlite", str(DB_PATH)), segments, final_frontier
+
+
+class LedgerStorage(ChainStorage):
+    """
+    The append-only binary ledger (VAULT_STORAGE=ledger). Record ids are
+    ledger positions + 1; lookups by hash use the ledger's own index.
+    """
+
+    def __init__(self, ledger: Ledger):
+        self.ledger = ledger
+
+    def open(self):
+        with _pool.connection() as conn:
+            _import_records_into_ledger(conn, self.ledger)
+        # Lookups are answered by the ledger's own index
+        if _record_filter is not None:
+            _record_filter.close()
+
+    def close(self):
+        self.ledger.close()
+
+    def stats(self) -> dict:
+        return self.ledger.stats()
+
+    def commit_group(self, jobs):
+        """One append (and fsync) per group; keys stay in SQLite."""
+        with _pool.connection() as conn:
+            key_ids = [_get_or_create_key(conn.cursor(), job.user_key) for job in jobs]
+            conn.commit()
+
+        clock = time.perf_counter
+        started = clock()
+        size = len(self.ledger)
+        frontier = self.ledger.frontier(size)
+        last = self.ledger.record(size - 1)
+        prev_hash = last["file_hash"] if last else "GENESIS"
+
+        nodes = []
+        rows = []
+        for job, key_id in zip(jobs, key_ids):
+            for file_name, file_hash in job.entries:
+                nodes.extend(SecurityVaultManager.merkle_append(frontier, size, file_hash))
+                merkle_root = SecurityVaultManager.merkle_root_from_frontier(frontier, size + 1)
+                rows.append((file_name, file_hash, prev_hash, job.timestamp, key_id, merkle_root))
+                prev_hash = file_hash
+                size += 1
+        # Proofs are built before the append commits (see SQLiteStorage.commit_group)
+        cached = {(level, idx): h for level, idx, h in nodes}
+        root, proofs = _group_proofs(jobs, len(self.ledger), frontier, size,
+                                     lambda level, idx: cached.get((level, idx)) or self.ledger.node(level, idx))
+        built = clock()
+
+        records = self.ledger.append(rows, nodes)
+        appended = clock()
+        STAGE_LATENCY.observe(built - started, stage="merkle_build")
+        STAGE_LATENCY.observe(appended - built, stage="ledger_append")
+
+        job_records = []
+        for job in jobs:
+            job_records.append(records[:len(job.entries)])
+            records = records[len(job.entries):]
+        return _group_results(job_records, size, root, proofs)
+
+    @contextmanager
+    def tree(self):
+        # Appends never change complete nodes, so pinning the size is a snapshot
+        size = len(self.ledger)
+        yield TreeView(size, self.ledger.frontier(size), self.ledger.frontier, self.ledger.node)
+
+    def last_record(self):
+        return self.ledger.record(len(self.ledger) - 1)
+
+    def iter_records(self, after_id: int = 0, batch_size: int = 500):
+        # A sequential scan of the mapping (id = position + 1)
+        return self.ledger.records(after_id)
+
+    def records_page(self, after_id: int, limit: int):
+        return list(self.ledger.records(after_id, after_id + limit))
+
+    def record_before(self, record_id: int):
+        return self.ledger.record(min(record_id - 1, len(self.ledger)) - 1)
+
+    def record_by_id(self, record_id: int):
+        return self.ledger.record(record_id - 1)
+
+    def record_by_hash(self, file_hash: str):
+        position = self.ledger.find(file_hash)
+        return self.ledger.record(position) if position is not None else None
+
+    def records_by_hashes(self, file_hashes) -> dict:
+        positions = {h: self.ledger.find(h) for h in dict.fromkeys(file_hashes)}
+        return {h: self.ledger.record(p) for h, p in positions.items() if p is not None}
+
+    def segments(self):
+        size = len(self.ledger)
+        segments = [
+            Segment(start, start, min(start + SEGMENT_SIZE, size), min(SEGMENT_SIZE, size - start),
+                    self.ledger.frontier(start))
+            for start in range(0, size, SEGMENT_SIZE)
+        ]
+        return ("ledger", str(self.ledger.path)), segments, self.ledger.frontier(size)
+
+
+# Chain storage; init_db replaces it with the one VAULT_STORAGE selects
+_storage = SQLiteStorage()
+
+
+def _commit_group(jobs):
+    """Chain writer callback (writer thread only)."""
+    return _storage.commit_group(jobs)
+
+
+_writer = ChainWriter(_commit_group, max_group=WRITER_MAX_GROUP, max_pending=WRITER_MAX_PENDING)
+atexit.register(_writer.stop)
+
+
+def get_writer_stats() -> dict:
+    """Returns counters of the chain writer (queued jobs, group commits)."""
+    return {"pending": _writer.pending(), **_writer.stats}
+
+
+def submit_records(entries, user_key: str, timestamp: str, with_proofs: bool = False):
+    """
+    Queues (file_name, file_hash) pairs for the chain writer and returns a
+    concurrent.futures.Future resolving to the job result (see SQLiteStorage.commit_group).
+    """
+    return _writer.submit(entries, user_key, timestamp, with_proofs)
 
 
 def insert_record(
     file_name: str,
     file_hash: str,
-    prev_hash: str,
     user_key: str,
-    merkle_root: str,
     timestamp: str
 ):
-    """Inserts a new record (timestamp comes from OUTSIDE)."""
-    conn = get_connection()
-    cur = conn.cursor()
+    """
+    Appends a new record (timestamp comes from OUTSIDE) to the chain and the
+    vault-wide Merkle tree through the single writer.
+    Returns the stored row, including id, prev_hash and the new global root.
+    """
+    future = submit_records([(file_name, file_hash)], user_key, timestamp)
+    return future.result(WRITER_TIMEOUT)["records"][0]
 
-    cur.execute(
-        """
-        INSERT INTO records (file_name, file_hash, prev_hash, timestamp, user_key, merkle_root)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (file_name, file_hash, prev_hash, timestamp, user_key, merkle_root)
-    )
 
-    conn.commit()
-    conn.close()
+def insert_records_batch(entries, user_key: str, timestamp: str) -> dict:
+    """
+    Registers many (file_name, file_hash) pairs in ONE transaction.
+    The batch is chained contiguously after the current head. Returns the
+    inserted records with their inclusion proofs against the vault root
+    after the commit.
+    """
+    future = submit_records(entries, user_key, timestamp, with_proofs=True)
+    return future.result(WRITER_TIMEOUT)
+
+
+def get_merkle_proof(leaf_index: int):
+    """
+    Returns (size, root, proof) for a leaf using indexed node lookups only.
+    All reads happen in one snapshot so the proof matches the returned root.
+    """
+    with _storage.tree() as tree:
+        proof = SecurityVaultManager.merkle_proof_path(leaf_index, tree.size, tree.frontier, tree.node)
+        return tree.size, SecurityVaultManager.merkle_root_from_frontier(tree.frontier, tree.size), proof
+
+
+def get_merkle_proofs(leaf_indices, tree_size: int = None):
+    """
+    Returns (size, root, {leaf_index: proof}) for many leaves against ONE tree.
+    Upper tree levels are shared by most proofs, so nodes are looked up once.
+    `tree_size` pins an earlier (smaller) tree, e.g. to keep several calls on
+    the same root; leaves outside the tree get no proof.
+    """
+    with _storage.tree() as tree:
+        frontier, size = tree.frontier, tree.size
+        if tree_size is not None and tree_size < size:
+            frontier, size = tree.frontier_at(tree_size), tree_size
+
+        edge = SecurityVaultManager.merkle_right_edge(frontier, size)
+        seen = {}
+
+        def get_node(level: int, index: int) -> str:
+            if (level, index) not in seen:
+                seen[(level, index)] = tree.node(level, index)
+            return seen[(level, index)]
+
+        proofs = {
+            leaf: SecurityVaultManager.merkle_proof_path(leaf, size, frontier, get_node, edge)
+            for leaf in leaf_indices
+            if 0 <= leaf < size
+        }
+
+    return size, (edge[max(edge)] if edge else ""), proofs
+
+
+def get_merkle_root():
+    """Returns (size, root) of the vault-wide Merkle tree."""
+    return _storage.root()
+
+
+def get_consistency_proof(old_size: int, size: int = None):
+    """
+    Returns (old_root, size, root, proof) showing that the tree with
+    `old_size` leaves is a prefix of the tree with `size` leaves (default:
+    the current tree). Raises ValueError unless 0 < old_size <= size <= vault size.
+    """
+    with _storage.tree() as tree:
+        size = tree.size if size is None else size
+        if not 0 < old_size <= size <= tree.size:
+            raise ValueError(f"Need 0 < from <= to <= {tree.size}.")
+
+        frontier = tree.frontier_at(size)
+        old_root = SecurityVaultManager.merkle_root_from_frontier(tree.frontier_at(old_size), old_size)
+        root = SecurityVaultManager.merkle_root_from_frontier(frontier, size)
+        proof = SecurityVaultManager.merkle_consistency_proof(old_size, size, frontier, tree.node)
+
+    return old_root, size, root, proof
+
+
+def save_tree_head(tree_size: int, merkle_root: str, timestamp: str, signature: str):
+    """Stores a signed tree head (one per tree size)."""
+    with _pool.connection() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO tree_heads (tree_size, merkle_root, timestamp, signature) VALUES (?, ?, ?, ?)",
+            (tree_size, merkle_root, timestamp, signature)
+        )
+        conn.commit()
+
+
+def get_tree_head(tree_size: int = None):
+    """Returns the signed tree head for a size, or the latest one (or None)."""
+    with _pool.connection() as conn:
+        if tree_size is None:
+            row = conn.execute("SELECT * FROM tree_heads ORDER BY tree_size DESC LIMIT 1").fetchone()
+        else:
+            row = conn.execute("SELECT * FROM tree_heads WHERE tree_size = ?", (tree_size,)).fetchone()
+    return row
+
+
+def save_chunk_manifest(file_hash: str, manifest: ChunkManifest):
+    """Stores the chunk manifest of a registered file (the first one stored is kept)."""
+    hashes, lengths = manifest.pack()
+    with _pool.connection() as conn:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO chunk_manifests
+                (file_hash, file_size, mode, chunk_size, chunk_root, chunk_hashes, chunk_lengths)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (file_hash, manifest.size, manifest.mode, manifest.chunk_size, manifest.root, hashes, lengths)
+        )
+        conn.commit()
+
+
+def get_chunk_manifest(file_hash: str):
+    """Returns the ChunkManifest stored for a file hash, or None."""
+    with _pool.connection() as conn:
+        row = conn.execute("SELECT * FROM chunk_manifests WHERE file_hash = ?", (file_hash,)).fetchone()
+    if row is None:
+        return None
+    return ChunkManifest.unpack(row["mode"], row["chunk_size"], row["chunk_root"],
+                                row["chunk_hashes"], row["chunk_lengths"])
 
 
 def get_last_record():
     """Returns the last added record."""
-    conn = get_connection()
-    cur = conn.cursor()
+    return _storage.last_record()
 
-    cur.execute("SELECT * FROM records ORDER BY id DESC LIMIT 1")
-    row = cur.fetchone()
 
-    conn.close()
-    return row
+def _read_chain_head() -> ChainHead:
+    with _pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            return _chain_head(cur)
+        finally:
+            conn.rollback()
 
 
 def get_records():
     """Returns all records."""
-    conn = get_connection()
-    cur = conn.cursor()
+    return list(_storage.iter_records())
+
+
+def iter_records(after_id: int = 0, batch_size: int = 500):
+    """
+    Yields records with id > after_id in id order from a single cursor.
+    Rows are fetched in batches, so memory stays constant for any vault size.
+    The pooled connection is held until the generator is exhausted or closed.
+    With the ledger storage this is a sequential scan of the mapping (id = position + 1).
+    """
+    yield from _storage.iter_records(after_id, batch_size)
+
+
+def get_records_page(after_id: int = 0, limit: int = 100):
+    """Keyset pagination: returns up to `limit` records with id > after_id."""
+    return _storage.records_page(after_id, limit)
+
+
+def get_record_before(record_id: int):
+    """Returns the record immediately preceding record_id in the chain."""
+    return _storage.record_before(record_id)
+
+
+def get_record_by_id(record_id: int):
+    """Returns the record with the specified id."""
+    return _storage.record_by_id(record_id)
+
+
+def get_latest_checkpoint():
+    """Returns the most recent audit checkpoint (or None)."""
+    with _pool.connection() as conn:
+        cur = conn.cursor()
+
+        cur.execute("SELECT * FROM audit_checkpoints ORDER BY id DESC LIMIT 1")
+        row = cur.fetchone()
+    return row
+
 
-    cur.execute("SELECT * FROM records ORDER BY id ASC")
-    rows = cur.fetchall()
+def _get_checkpoint_digests():
+    """Returns {last_id: digest} for every stored checkpoint."""
+    with _pool.connection() as conn:
+        digests = {
+            row["last_id"]: row["digest"]
+            for row in conn.execute("SELECT last_id, digest FROM audit_checkpoints")
+        }
+    return digests
 
-    conn.close()
-    return rows
+
+def _save_checkpoint(last_record, digest: str, record_count: int):
+    with _pool.connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO audit_checkpoints (last_id, last_file_hash, digest, record_count, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                last_record["id"],
+                last_record["file_hash"],
+                digest,
+                record_count,
+                datetime.now(timezone.utc).isoformat()
+            )
+        )
+        conn.commit()
 
 
-def verify_chain():
+def audit_chain(full: bool = False, deep: bool = False) -> dict:
     """
-    Checks the consistency of the hash chain.
+    Incremental chain audit.
+    Only records appended after the latest checkpoint are validated, continuing
+    the rolling digest stored with it. full=True re-verifies from the genesis and
+    also compares the recomputed digest with every stored checkpoint, which
+    catches rewrites behind a checkpoint that keep the links intact.
+    deep=True is a full audit that also recomputes every stored merkle_root
+    and the stored tree state, in parallel segments (see _deep_audit).
+    A new checkpoint is stored only when the audited range is valid.
     """
-    records = get_records()
+    if deep:
+        return _deep_audit()
 
-    if not records or len(records) == 1:
-        return True, []
+    checkpoint = None if full else get_latest_checkpoint()
+    anchor = None
 
-    broken_records = []
+    if checkpoint is not None:
+        anchor = get_record_by_id(checkpoint["last_id"])
+        if anchor is None or anchor["file_hash"] != checkpoint["last_file_hash"]:
+            # The audited prefix was rewritten: resuming from it is meaningless
+            full = True
+            checkpoint = None
+            anchor = None
 
-    for i in range(1, len(records)):
-        prev_record = records[i - 1]
-        current_record = records[i]
+    if checkpoint is not None:
+        after_id = checkpoint["last_id"]
+        digest = checkpoint["digest"]
+        audited_before = checkpoint["record_count"]
+        expected_digests = None
+    else:
+        after_id = 0
+        digest = ChainValidator.GENESIS_DIGEST
+        audited_before = 0
+        expected_digests = _get_checkpoint_digests()
 
-        if current_record["prev_hash"] != prev_record["file_hash"]:
-            broken_records.append(current_record["id"])
+    result = ChainValidator.audit(
+        iter_records(after_id),
+        previous_record=anchor,
+        digest=digest,
+        expected_digests=expected_digests
+    )
 
-    return len(broken_records) == 0, broken_records
+    if result["is_valid"] and result["count"] > 0:
+        _save_checkpoint(result["last_record"], result["digest"], audited_before + result["count"])
 
+    return {
+        "chain_valid": result["is_valid"],
+        "broken_record_ids": result["broken_indices"],
+        "audited_records": result["count"],
+        "full": full
+    }
 
-def get_record_by_hash(file_hash: str):
+
+def _deep_audit() -> dict:
+    """Full audit that recomputes the chain digest and every Merkle root (see deep_audit)."""
+    source, segments, final_frontier = _storage.segments()
+    result = deep_audit(source, segments, final_frontier, _get_checkpoint_digests(), legacy_leaves=_legacy_leaves())
+
+    if result["is_valid"] and result["count"] > 0:
+        _save_checkpoint(result["last_record"], result["digest"], result["count"])
+
+    return {
+        "chain_valid": result["is_valid"],
+        "broken_record_ids": result["broken_indices"],
+        "audited_records": result["count"],
+        "full": True,
+        "deep": True,
+        "merkle_valid": result["merkle_valid"],
+        "broken_count": result["broken_count"]
+    }
+
+
+def verify_chain(full: bool = False, deep: bool = False):
     """
-    Returns the record with the specified file_hash.
+    Checks the consistency of the hash chain.
+    Incremental from the latest checkpoint unless full=True (see audit_chain).
     """
-    conn = get_connection()
-    cur = conn.cursor()
+    result = audit_chain(full, deep)
+    return result["chain_valid"], result["broken_record_ids"]
 
-    cur.execute("SELECT * FROM records WHERE file_hash = ?", (file_hash,))
-    row = cur.fetchone()
 
-    conn.close()
-    return row
+def get_record_by_hash(file_hash: str):
+    """
+    Returns the (first) record with the specified file_hash.
+    Seeks the file_hash_bin index; the text comparison keeps the match exact.
+    Hashes the membership filter rules out are answered without a query.
+    """
+    return _storage.record_by_hash(file_hash)
+
 
+def get_records_by_hashes(file_hashes) -> dict:
+    """
+    Set-based version of get_record_by_hash: returns {file_hash: first record}
+    for the hashes present in the vault, with one indexed IN query per IN_CHUNK hashes.
+    """
+    return _storage.records_by_hashes(file_hashes)
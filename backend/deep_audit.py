@@ -0,0 +1,290 @@
+import multiprocessing
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple
+
+from backend.ledger import Ledger
+from backend.records import RECORD_COLUMNS, record_factory
+from CryptoModule.chain_validator import ChainValidator
+from CryptoModule.hash_util import Hasher
+from CryptoModule.security_engine import SecurityVaultManager
+
+# Records per segment handed to one worker
+SEGMENT_SIZE = int(os.getenv("VAULT_AUDIT_SEGMENT_SIZE", "50000"))
+# Worker processes for deep audits (0 = audit in the calling thread)
+AUDIT_WORKERS = int(os.getenv("VAULT_AUDIT_WORKERS", str(os.cpu_count() or 1)))
+# Record ids reported per audit (a rewritten leaf invalidates every later root of its segment)
+MAX_REPORTED = 1000
+
+_DIGEST_LEN = 64
+
+
+class Segment(NamedTuple):
+    """Records with after_id < id <= last_id, starting at leaf `start` of the vault tree."""
+    start: int
+    after_id: int
+    last_id: int
+    count: int
+    frontier: Dict[int, str]   # stored frontier of the tree with `start` leaves (to be confirmed; None = missing)
+
+
+def _read_segment(source, segment: Segment):
+    kind, path = source
+    if kind == "ledger":
+        ledger = Ledger(path, readonly=True)
+        try:
+            yield from ledger.records(segment.start, segment.start + segment.count)
+        finally:
+            ledger.close()
+        return
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = record_factory
+    try:
+        yield from conn.execute(
+            f"SELECT {RECORD_COLUMNS} FROM records WHERE id > ? AND id <= ? ORDER BY id",
+            (segment.after_id, segment.last_id)
+        )
+    finally:
+        conn.close()
+
+
+def _stored_nodes(source, nodes):
+    """Stored hashes (None if missing) of the (level, idx, hash) nodes, as {(level, idx): hash}."""
+    kind, path = source
+    if kind == "ledger":
+        ledger = Ledger(path, readonly=True)
+        try:
+            return {(level, idx): ledger.node(level, idx) for level, idx, _ in nodes}
+        finally:
+            ledger.close()
+
+    ranges = {}
+    for level, idx, _ in nodes:
+        low, high = ranges.get(level, (idx, idx))
+        ranges[level] = (min(low, idx), max(high, idx))
+    stored = dict.fromkeys(((level, idx) for level, idx, _ in nodes), None)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        for level, (low, high) in ranges.items():
+            for idx, node in conn.execute(
+                "SELECT idx, hash FROM merkle_nodes WHERE level = ? AND idx BETWEEN ? AND ?",
+                (level, low, high)
+            ):
+                if (level, idx) in stored:
+                    stored[(level, idx)] = node
+    finally:
+        conn.close()
+    return stored
+
+
+def _leaf_ids(source, start: int, stop: int):
+    """Ids of the records at leaves [start, stop), at most MAX_REPORTED of them."""
+    stop = min(stop, start + MAX_REPORTED)
+    kind, path = source
+    if kind == "ledger":
+        return list(range(start + 1, stop + 1))   # id = position + 1
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return [row[0] for row in conn.execute(
+            "SELECT id FROM records WHERE leaf_index >= ? AND leaf_index < ? ORDER BY id",
+            (start, stop)
+        )]
+    finally:
+        conn.close()
+
+
+def _bad_node_ids(source, segment: Segment, nodes, ids):
+    """
+    Record ids under the stored nodes that are missing or differ from the
+    replayed `nodes` (those completed by this segment's leaves). Only the
+    lowest such nodes count: a parent differs whenever one of its children does.
+    """
+    stored = _stored_nodes(source, nodes)
+    differing = {(level, idx) for level, idx, node in nodes if stored[(level, idx)] != node}
+    bad = set()
+    for level, idx in differing:
+        if level and ((level - 1, 2 * idx) in differing or (level - 1, 2 * idx + 1) in differing):
+            continue
+        first, stop = idx << level, (idx + 1) << level
+        if first < segment.start:
+            bad.update(_leaf_ids(source, first, segment.start))
+        bad.update(ids[max(first, segment.start) - segment.start:stop - segment.start])
+    return sorted(bad)
+
+
+def _expected_root(record, frontier, size: int, legacy_leaves: int) -> str:
+    if size <= legacy_leaves:
+        # Written before the vault-wide tree: the root of [file_hash, prev_hash]
+        return SecurityVaultManager.build_merkle_root([record["file_hash"], record["prev_hash"]])
+    return SecurityVaultManager.merkle_root_from_frontier(frontier, size)
+
+
+def audit_segment(source, segment: Segment, marks=frozenset(), legacy_leaves: int = 0) -> dict:
+    """
+    Worker side of a deep audit. Replays the segment's leaves on top of its
+    start frontier and recomputes every stored merkle_root, checks the links
+    inside the segment and computes each record's digest. The results are
+    stitched by deep_audit: the end frontier must equal the next segment's
+    start frontier and the first prev_hash the previous segment's last hash.
+    `marks` are record ids whose position in the digest list is reported
+    (checkpoints to compare the rolling digest with). The first
+    `legacy_leaves` leaves of the vault keep their pre-tree merkle_root.
+    The stored nodes the leaves complete are compared with the replayed
+    ones (bad_nodes). A start frontier with missing nodes cannot be
+    replayed: the result only has incomplete=True.
+    """
+    if None in segment.frontier.values():
+        return {"incomplete": True}
+
+    frontier = dict(segment.frontier)
+    size = segment.start
+    digests = []
+    marked = {}
+    broken_links = []
+    bad_roots = []
+    first = None
+    prev_hash = None
+    last = None
+    nodes = []
+    ids = []
+
+    for record in _read_segment(source, segment):
+        if first is None:
+            first = record
+        elif record["prev_hash"] != prev_hash:
+            broken_links.append(record["id"])
+
+        nodes.extend(SecurityVaultManager.merkle_append(frontier, size, record["file_hash"]))
+        ids.append(record["id"])
+        size += 1
+        if (record["leaf_index"] != size - 1
+                or record["merkle_root"] != _expected_root(record, frontier, size, legacy_leaves)):
+            bad_roots.append(record["id"])
+
+        if record["id"] in marks:
+            marked[len(digests)] = record["id"]
+        digests.append(ChainValidator.record_digest(record))
+        prev_hash = record["file_hash"]
+        last = record
+
+    return {
+        "incomplete": False,
+        "count": len(digests),
+        "first_id": first["id"] if first else None,
+        "first_prev_hash": first["prev_hash"] if first else None,
+        "last_record": {"id": last["id"], "file_hash": last["file_hash"]} if last else None,
+        "broken_links": broken_links,
+        "bad_roots": bad_roots,
+        "bad_nodes": _bad_node_ids(source, segment, nodes, ids) if nodes else [],
+        "frontier": frontier,
+        "digests": "".join(digests),
+        "marked": marked
+    }
+
+
+def _run_segments(source, segments, marks, workers: int, legacy_leaves: int):
+    """Yields audit_segment results in segment order, with at most 2 x workers segments in flight."""
+    if workers <= 0 or len(segments) <= 1:
+        for segment in segments:
+            yield audit_segment(source, segment, _marks_in(marks, segment), legacy_leaves)
+        return
+
+    workers = min(workers, len(segments))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        remaining = iter(segments)
+        in_flight = deque()
+
+        def submit():
+            segment = next(remaining, None)
+            if segment is not None:
+                in_flight.append(pool.submit(audit_segment, source, segment,
+                                              _marks_in(marks, segment), legacy_leaves))
+
+        for _ in range(2 * workers):
+            submit()
+        while in_flight:
+            result = in_flight.popleft().result()
+            submit()
+            yield result
+
+
+def _marks_in(marks, segment: Segment):
+    return frozenset(i for i in marks if segment.after_id < i <= segment.last_id)
+
+
+def deep_audit(source, segments, final_frontier, expected_digests=None, workers: int = None,
+               legacy_leaves: int = 0) -> dict:
+    """
+    Recomputes the chain from its leaves, segment by segment in parallel.
+
+    `source` is ("sqlite", db_path) or ("ledger", ledger_path); `segments`
+    cover the vault in order (see Segment); `final_frontier` is the stored
+    frontier of the whole tree. Besides the links and the rolling digest of
+    ChainValidator.audit (compared with `expected_digests`), every stored
+    merkle_root is recomputed and the stored Merkle frontiers at the
+    segment boundaries and at the end are confirmed, as is every stored
+    node (missing or differing nodes report the records under them). The first
+    `legacy_leaves` roots predate the vault-wide tree and are checked with
+    the per-record formula of older versions. Returns the same keys
+    as ChainValidator.audit plus merkle_valid.
+    """
+    workers = AUDIT_WORKERS if workers is None else workers
+    digest = ChainValidator.GENESIS_DIGEST
+    expected_digests = expected_digests or {}
+    broken = []
+    bad_roots = []
+    merkle_valid = True
+    previous = None
+    count = 0
+
+    results = _run_segments(source, segments, expected_digests.keys(), workers, legacy_leaves)
+    for segment, result in zip(segments, results):
+        if result["incomplete"]:
+            # Nodes of the stored start frontier are missing (reported by the segment
+            # that completed them): replay from the frontier the previous segment computed
+            merkle_valid = False
+            segment = segment._replace(frontier=previous["frontier"] if previous else {})
+            result = audit_segment(source, segment, _marks_in(expected_digests.keys(), segment), legacy_leaves)
+        if result["count"] == 0:
+            continue
+        if previous is not None:
+            if result["first_prev_hash"] != previous["last_record"]["file_hash"]:
+                broken.append(result["first_id"])
+            if segment.frontier != previous["frontier"]:
+                # The stored tree state this segment started from is not the one its leaves produce
+                merkle_valid = False
+                bad_roots.append(result["first_id"])
+        broken.extend(result["broken_links"])
+        bad_roots.extend(result["bad_roots"])
+        bad_roots.extend(result["bad_nodes"])
+
+        # The rolling digest is sequential, but only one hash per record is left to do here
+        digests = result["digests"]
+        marked = result["marked"]
+        for i in range(result["count"]):
+            digest = Hasher.get_hash(digest + digests[i * _DIGEST_LEN:(i + 1) * _DIGEST_LEN])
+            if i in marked and expected_digests[marked[i]] != digest:
+                broken.append(marked[i])
+
+        count += result["count"]
+        previous = result
+
+    if bad_roots:
+        merkle_valid = False
+    if (previous["frontier"] if previous else {}) != final_frontier:
+        merkle_valid = False
+
+    broken = sorted(set(broken) | set(bad_roots))
+    return {
+        "is_valid": not broken and merkle_valid,
+        "broken_indices": broken[:MAX_REPORTED],
+        "broken_count": len(broken),
+        "merkle_valid": merkle_valid,
+        "digest": digest,
+        "last_record": previous["last_record"] if previous else None,
+        "count": count
+    }
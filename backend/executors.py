@@ -0,0 +1,125 @@
+import asyncio
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.logger import forward_worker_logs
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an executor already has `max_pending` tasks queued or running."""
+
+
+class BoundedExecutor:
+    """
+    Executor wrapper with a hard cap on queued + running tasks.
+
+    The underlying executor is created lazily by `factory`, so importing the
+    app does not start worker processes. run() never waits for a free slot:
+    when the cap is reached it raises ExecutorSaturated straight away and the
+    API answers 429 instead of letting the backlog (and latency) grow.
+    """
+
+    def __init__(self, factory, max_pending: int, name: str, workers: int = 1):
+        self.name = name
+        self.max_pending = max_pending
+        # Size of the pool `factory` builds (e.g. to split work into one chunk per worker)
+        self.workers = workers
+        self._factory = factory
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats = {"submitted": 0, "rejected": 0, "failed": 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    def _reserve(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise ExecutorSaturated(f"{self.name} executor is saturated.")
+            self._pending += 1
+            self.stats["submitted"] += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args):
+        """Runs fn(*args) on the executor and awaits the result."""
+        self._reserve()
+        try:
+            executor = self._get_executor()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM kill): start a fresh pool for the next call
+                self.stats["failed"] += 1
+                self._discard(executor)
+                raise
+        finally:
+            self._release()
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"pending": self._pending, "max_pending": self.max_pending, **self.stats}
+
+
+# --- Shared executors used by the API ---
+
+CPU_COUNT = os.cpu_count() or 1
+CRYPTO_WORKERS = int(os.getenv("VAULT_CRYPTO_WORKERS", str(CPU_COUNT)))
+CRYPTO_MAX_PENDING = int(os.getenv("VAULT_CRYPTO_MAX_PENDING", str(64 * max(CRYPTO_WORKERS, 1))))
+DB_WORKERS = int(os.getenv("VAULT_DB_WORKERS", "8"))
+DB_MAX_PENDING = int(os.getenv("VAULT_DB_MAX_PENDING", "256"))
+
+
+def _crypto_factory():
+    if CRYPTO_WORKERS <= 0:
+        # In-process verification; useful on single-core hosts and in tests
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="vault-crypto")
+    # spawn, not fork: the parent already runs the writer and pool threads
+    initializer, initargs = forward_worker_logs()
+    return ProcessPoolExecutor(
+        max_workers=CRYPTO_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs
+    )
+
+
+def _db_factory():
+    return ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="vault-db")
+
+
+crypto_executor = BoundedExecutor(_crypto_factory, CRYPTO_MAX_PENDING, "crypto", max(CRYPTO_WORKERS, 1))
+db_executor = BoundedExecutor(_db_factory, DB_MAX_PENDING, "db", DB_WORKERS)
+atexit.register(db_executor.shutdown)
+atexit.register(crypto_executor.shutdown)
+
+
+def get_executor_stats() -> dict:
+    return {"crypto": crypto_executor.snapshot(), "db": db_executor.snapshot()}
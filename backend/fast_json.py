@@ -0,0 +1,38 @@
+import json
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:   # optional: the standard library encoder is used instead
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON; orjson when it is installed (several times faster on large lists)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_str(obj) -> str:
+    return dumps(obj).decode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered by dumps() from plain dicts and lists. Returning it
+    from an endpoint skips FastAPI's response-model validation and
+    jsonable_encoder pass, which dominate large responses.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
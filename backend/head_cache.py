@@ -0,0 +1,49 @@
+import threading
+from typing import Dict, NamedTuple, Optional
+
+
+class ChainHead(NamedTuple):
+    """State of the chain after a commit: what the next append builds on."""
+    generation: int             # merkle_state.generation this head belongs to
+    size: int                   # leaves in the vault tree
+    frontier: Dict[int, str]    # Merkle frontier (never mutated; copy before appending)
+    root: str                   # vault-wide Merkle root ("" while empty)
+    last_record: Optional[dict] # last records row (None while empty)
+
+
+class ChainHeadCache:
+    """
+    In-process copy of the chain head, tagged with the database's generation
+    counter (merkle_state.generation, bumped in the same transaction as every
+    append by any process). A lookup is a hit only if the generation read
+    from the database still matches, so heads moved by other worker
+    processes are never served. The chain writer replaces the head after
+    each commit; readers fill it on a miss.
+    """
+
+    def __init__(self):
+        self._head = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, generation: int) -> Optional[ChainHead]:
+        with self._lock:
+            head = self._head
+            if head is not None and head.generation == generation:
+                self.stats["hits"] += 1
+                return head
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, head: ChainHead):
+        # A reader may put back an older head after a newer commit: that only costs a miss
+        with self._lock:
+            self._head = head
+
+    def invalidate(self):
+        with self._lock:
+            self._head = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"generation": self._head.generation if self._head else -1, **self.stats}
@@ -0,0 +1,307 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from backend.records import Record
+
+try:
+    import fcntl
+except ImportError:   # Windows: no advisory lock, a second writer is not detected
+    fcntl = None
+
+MAGIC = b"DSVLEDG1"
+VERSION = 1
+
+# records.bin header: magic, version, record size, committed record count
+HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+
+# One fixed-width entry per record: file_hash, prev_hash, merkle_root (raw SHA-256),
+# offset of file_name + timestamp in meta.bin, their byte lengths, key id (0 = none)
+RECORD = struct.Struct("<32s32s32sQIII")
+NODE_SIZE = 32
+
+# Data files grow in steps of at least this size (preallocated, mapped once per step)
+GROW_BYTES = 1024 * 1024
+
+GENESIS = "GENESIS"
+_ZERO = bytes(32)
+
+
+class UnsupportedHash(ValueError):
+    """Raised when a hash cannot be stored as a raw 32-byte SHA-256 digest."""
+
+
+def raw_hash(value: str) -> bytes:
+    """Raw digest of a lowercase 64-character hex SHA-256 (the only form the ledger stores)."""
+    if isinstance(value, str) and len(value) == 64 and value == value.lower():
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            raw = None
+        if raw is not None and len(raw) == 32:
+            return raw
+    raise UnsupportedHash(f"Not a lowercase hex SHA-256 digest: {value!r}")
+
+
+def node_position(level: int, index: int) -> int:
+    """
+    Slot of a complete Merkle node in nodes.bin. Nodes are stored in the order
+    merkle_append creates them (a leaf, then the parents it completes), which
+    is the post-order of a Merkle mountain range: fixed for every node, so the
+    file is append-only.
+    """
+    first_leaf = index << level
+    return 2 * first_leaf - bin(first_leaf).count("1") + (2 << level) - 2
+
+
+def node_count(size: int) -> int:
+    """Complete nodes (leaves included) of a tree with `size` leaves."""
+    return 2 * size - bin(size).count("1")
+
+
+class _MappedFile:
+    """A preallocated data file: appended with pwrite, read through a read-only mmap."""
+
+    def __init__(self, path: Path, lock: threading.Lock, readonly: bool = False):
+        self.fd = os.open(path, os.O_RDONLY if readonly else os.O_RDWR | os.O_CREAT, 0o644)
+        self._lock = lock
+        self._map = None
+        if not readonly and os.fstat(self.fd).st_size == 0:
+            os.ftruncate(self.fd, GROW_BYTES)
+
+    def view(self, end: int) -> mmap.mmap:
+        """Mapping covering at least `end` bytes (remapped only after the file grew)."""
+        current = self._map
+        if current is not None and len(current) >= end:
+            return current
+        with self._lock:
+            if self._map is None or len(self._map) < end:
+                # Readers may still use the old mapping; it is released by refcount
+                self._map = mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    def write(self, offset: int, data: bytes):
+        end = offset + len(data)
+        size = os.fstat(self.fd).st_size
+        if end > size:
+            os.ftruncate(self.fd, max(end, size * 2, GROW_BYTES))
+        os.pwrite(self.fd, data, offset)
+
+    def sync(self):
+        os.fsync(self.fd)
+
+    def truncate(self, size: int):
+        self._map = None
+        os.ftruncate(self.fd, size)
+
+    def close(self):
+        self._map = None
+        os.close(self.fd)
+
+
+class Ledger:
+    """
+    Append-only binary chain store (the VAULT_STORAGE=ledger backend).
+
+    A directory with three files:
+      records.bin  header + fixed-width RECORD entries (record id = position + 1)
+      nodes.bin    complete Merkle nodes, 32 raw bytes each, see node_position
+      meta.bin     file names and timestamps, addressed from the records
+
+    Hashes are stored as raw bytes (half the size of hex text) and read through
+    mmap, so audits and proofs are sequential scans of the mapping without row
+    decoding. The committed record count in the header is the commit point:
+    data is written first, then the count, so a torn append is ignored on the
+    next open. One process owns the ledger (exclusive lock); append() must only
+    be called by one thread (the chain writer), reads are safe from any thread.
+    readonly=True opens the files of a ledger owned by another process (e.g.
+    audit workers) without the lock and without the hash index.
+    """
+
+    def __init__(self, path, sync: bool = True, readonly: bool = False):
+        self.path = Path(path)
+        self.sync = sync
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        if not readonly:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+        self._records = _MappedFile(self.path / "records.bin", self._lock, readonly)
+        if fcntl is not None and not readonly:
+            try:
+                fcntl.flock(self._records.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._records.close()
+                raise RuntimeError(f"Ledger {self.path} is already opened by another process.")
+        self._nodes = _MappedFile(self.path / "nodes.bin", self._lock, readonly)
+        self._meta = _MappedFile(self.path / "meta.bin", self._lock, readonly)
+
+        magic, version, record_size, count = HEADER.unpack_from(self._records.view(HEADER_SIZE), 0)
+        if magic == bytes(8) and not readonly:
+            count = 0
+            self._write_header(0)
+        elif magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            for f in (self._meta, self._nodes, self._records):
+                f.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} vault ledger.")
+
+        self._count = count
+        self._meta_end = 0
+        if count:
+            _, _, _, offset, name_len, ts_len, _ = RECORD.unpack_from(
+                self._records.view(self._record_offset(count)), self._record_offset(count - 1)
+            )
+            self._meta_end = offset + name_len + ts_len
+
+        # file_hash -> first record position (exact lookups for /verify)
+        self._index = {}
+        if not readonly:
+            for position, file_hash in enumerate(self._scan_column(0, count)):
+                self._index.setdefault(file_hash, position)
+
+    @staticmethod
+    def _record_offset(position: int) -> int:
+        return HEADER_SIZE + position * RECORD.size
+
+    def _write_header(self, count: int):
+        self._records.write(0, HEADER.pack(MAGIC, VERSION, RECORD.size, count))
+
+    def _scan_column(self, start: int, stop: int):
+        """Raw file hashes of records [start, stop), straight from the mapping."""
+        view = memoryview(self._records.view(self._record_offset(stop)))
+        for entry in RECORD.iter_unpack(view[self._record_offset(start):self._record_offset(stop)]):
+            yield entry[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, rows, nodes):
+        """
+        Appends (file_name, file_hash, prev_hash, timestamp, key_id, merkle_root)
+        rows and the Merkle nodes they complete (merkle_append output, in order).
+        Everything is validated before the first byte is written.
+        Returns the new records.
+        """
+        count = self._count
+        first_node = node_count(count)
+        if len(nodes) != node_count(count + len(rows)) - first_node:
+            raise ValueError("Merkle nodes do not match the appended records.")
+
+        node_data = bytearray()
+        for i, (level, index, node) in enumerate(nodes):
+            if node_position(level, index) != first_node + i:
+                raise ValueError(f"Merkle node ({level}, {index}) is out of order.")
+            node_data += raw_hash(node)
+
+        meta_data = bytearray()
+        record_data = bytearray()
+        meta_end = self._meta_end
+        for file_name, file_hash, prev_hash, timestamp, key_id, merkle_root in rows:
+            name = file_name.encode("utf-8")
+            ts = timestamp.encode("utf-8")
+            record_data += RECORD.pack(
+                raw_hash(file_hash),
+                _ZERO if prev_hash == GENESIS else raw_hash(prev_hash),
+                raw_hash(merkle_root),
+                meta_end + len(meta_data), len(name), len(ts), key_id or 0
+            )
+            meta_data += name + ts
+
+        self._meta.write(meta_end, meta_data)
+        self._nodes.write(first_node * NODE_SIZE, node_data)
+        self._records.write(self._record_offset(count), record_data)
+        if self.sync:
+            self._meta.sync()
+            self._nodes.sync()
+            self._records.sync()
+
+        # Commit point: the new count makes the entries visible
+        new_count = count + len(rows)
+        self._write_header(new_count)
+        if self.sync:
+            self._records.sync()
+
+        for position, row in enumerate(rows, start=count):
+            self._index.setdefault(raw_hash(row[1]), position)
+        self._meta_end = meta_end + len(meta_data)
+        self._count = new_count
+        return list(self.records(count, new_count))
+
+    def _decode(self, position: int, entry, meta) -> Record:
+        file_hash, prev_hash, merkle_root, offset, name_len, ts_len, key_id = entry
+        # Same fields, in the same order, as a records row of the SQLite backend
+        return Record((
+            position + 1,
+            meta[offset:offset + name_len].decode("utf-8"),
+            file_hash.hex(),
+            GENESIS if prev_hash == _ZERO else prev_hash.hex(),
+            meta[offset + name_len:offset + name_len + ts_len].decode("utf-8"),
+            None,
+            merkle_root.hex(),
+            position,
+            file_hash,
+            key_id or None
+        ))
+
+    def records(self, start: int = 0, stop: int = None):
+        """Yields records at positions [start, stop) in order (stop defaults to the current end)."""
+        count = self._count
+        stop = count if stop is None else min(stop, count)
+        start = max(start, 0)
+        if start >= stop:
+            return
+        view = memoryview(self._records.view(self._record_offset(stop)))
+        entries = RECORD.iter_unpack(view[self._record_offset(start):self._record_offset(stop)])
+        meta = self._meta.view(self._meta_end)
+        for position, entry in enumerate(entries, start=start):
+            yield self._decode(position, entry, meta)
+
+    def record(self, position: int):
+        """Record at a position (id - 1), or None."""
+        if not 0 <= position < self._count:
+            return None
+        return next(self.records(position, position + 1))
+
+    def find(self, file_hash: str):
+        """Position of the first record with this file hash, or None."""
+        try:
+            return self._index.get(raw_hash(file_hash))
+        except UnsupportedHash:
+            return None
+
+    def node(self, level: int, index: int) -> str:
+        """A complete Merkle node as hex (get_node callback for merkle_proof_path)."""
+        offset = node_position(level, index) * NODE_SIZE
+        return self._nodes.view(offset + NODE_SIZE)[offset:offset + NODE_SIZE].hex()
+
+    def frontier(self, size: int = None) -> dict:
+        """Merkle frontier of the tree with `size` leaves (defaults to the whole ledger)."""
+        size = self._count if size is None else size
+        return {
+            level: self.node(level, (size >> level) - 1)
+            for level in range(size.bit_length())
+            if (size >> level) & 1
+        }
+
+    def stats(self) -> dict:
+        return {
+            "records": self._count,
+            "record_bytes": self._record_offset(self._count),
+            "node_bytes": node_count(self._count) * NODE_SIZE,
+            "meta_bytes": self._meta_end
+        }
+
+    def close(self):
+        """Trims the preallocated tails and releases the files (and the lock)."""
+        if self._records is None:
+            return
+        if not self.readonly:
+            self._meta.truncate(self._meta_end)
+            self._nodes.truncate(node_count(self._count) * NODE_SIZE)
+            self._records.truncate(self._record_offset(self._count))
+        for f in (self._meta, self._nodes, self._records):
+            f.close()
+        self._meta = self._nodes = self._records = None
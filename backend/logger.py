@@ -1,9 +1,291 @@
+import atexit
+import json
 import logging
+import multiprocessing
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+
+try:
+    import fcntl
+except ImportError:   # Windows: every process rotates its own handler
+    fcntl = None
+
+LOG_PATH = os.getenv("VAULT_LOG_PATH", "audit.log")
+LOG_LEVEL = os.getenv("VAULT_LOG_LEVEL", "INFO")
+LOG_ROTATION = os.getenv("VAULT_LOG_ROTATION", "size")                     # "size" or "time"
+LOG_MAX_BYTES = int(os.getenv("VAULT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_WHEN = os.getenv("VAULT_LOG_WHEN", "midnight")                         # TimedRotatingFileHandler `when`
+LOG_BACKUPS = int(os.getenv("VAULT_LOG_BACKUPS", "5"))
+LOG_QUEUE_SIZE = int(os.getenv("VAULT_LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("VAULT_LOG_BATCH_SIZE", "256"))
+LOG_QUEUE_TIMEOUT = float(os.getenv("VAULT_LOG_QUEUE_TIMEOUT", "0.05"))   # seconds an INFO record may wait
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue. Below WARNING a record waits at most
+    `timeout` seconds for room, then it is dropped and counted. WARNING and
+    above are never dropped: they wait for the listener, or are written
+    synchronously through it once it has stopped.
+    """
+
+    def __init__(self, log_queue, listener=None, timeout: float = 0.0):
+        super().__init__(log_queue)
+        self.listener = listener
+        self.timeout = timeout
+        self.dropped = 0
+
+    def enqueue(self, record):
+        if (record.levelno or 0) < logging.WARNING:
+            try:
+                self.queue.put(record, timeout=self.timeout) if self.timeout > 0 else self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+            return
+
+        while True:
+            try:
+                self.queue.put(record, timeout=0.5)
+                return
+            except queue.Full:
+                if self.listener is not None and not self.listener.running:
+                    self.listener.handle(record)
+                    return
+
+
+class _BatchFlushMixin:
+    """
+    File handler whose stream is flushed once per batch instead of after every record.
+
+    Several processes (e.g. API workers) may log to the same file: only the
+    one holding an exclusive lock on `<file>.lock` rotates it. The others
+    append without rotating and reopen the file once it has been rotated;
+    if the owner exits, the next process to flush takes over.
+    """
+
+    def _init_shared(self):
+        self._lock_fd = None
+        self._take_rotation()
+
+    def _take_rotation(self) -> bool:
+        if fcntl is None or self._lock_fd is not None:
+            return True
+        fd = os.open(self.baseFilename + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def shouldRollover(self, record) -> bool:
+        return (self._lock_fd is not None or fcntl is None) and super().shouldRollover(record)
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        logging.StreamHandler.flush(self)
+        if not self._take_rotation():
+            self._reopen_if_rotated()
+
+    def _reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+            self.acquire()
+            try:
+                self.stream.close()
+                self.stream = self._open()
+            finally:
+                self.release()
+
+    def close(self):
+        super().close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+class BatchRotatingFileHandler(_BatchFlushMixin, RotatingFileHandler):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_shared()
+
+
+class BatchTimedRotatingFileHandler(_BatchFlushMixin, TimedRotatingFileHandler):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_shared()
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    QueueListener that drains up to `batch_size` queued records at a time and
+    flushes the handlers once per batch. When idle every record is written
+    right away; under load many records share one write syscall.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size: int = 256):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        # True between start() and the end of stop() (the queue is being drained)
+        self.running = False
+
+    def start(self):
+        self.running = True
+        super().start()
+
+    def stop(self):
+        super().stop()
+        self.running = False
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, "task_done")
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    q.task_done()
+
+            for handler in self.handlers:
+                getattr(handler, "flush_batch", handler.flush)()
+            if stop:
+                return
+
+
+def create_file_handler(path: str, rotation: str = "size", max_bytes: int = LOG_MAX_BYTES,
+                        when: str = LOG_WHEN, backups: int = LOG_BACKUPS) -> logging.Handler:
+    """Size- or time-rotated JSON-lines file handler with batched flushes."""
+    if rotation == "time":
+        handler = BatchTimedRotatingFileHandler(path, when=when, backupCount=backups, encoding="utf-8", utc=True)
+    elif rotation == "size":
+        handler = BatchRotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    else:
+        raise ValueError(f"Unknown log rotation: {rotation}")
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def setup_queue_logging(target: logging.Logger, *handlers, queue_size: int = LOG_QUEUE_SIZE,
+                        batch_size: int = LOG_BATCH_SIZE, timeout: float = LOG_QUEUE_TIMEOUT):
+    """
+    Routes `target` through a bounded in-memory queue to `handlers`, which
+    run on the listener's background thread. Returns (queue_handler, listener).
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+    listener = BatchingQueueListener(log_queue, *handlers, batch_size=batch_size)
+    queue_handler = DroppingQueueHandler(log_queue, listener, timeout)
+    target.addHandler(queue_handler)
+    target.propagate = False
+
+    listener.start()
+    return queue_handler, listener
 
-logging.basicConfig(
-    filename="audit.log",
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s"
-)
 
 logger = logging.getLogger("vault_logger")
+logger.setLevel(LOG_LEVEL)
+
+# One listener per log file in this process (see setup_logging)
+_listeners = {}
+_setup_lock = threading.Lock()
+_queue_handler = None
+
+
+def setup_logging(path: str = LOG_PATH, rotation: str = LOG_ROTATION):
+    """
+    Attaches the audit log file to `vault_logger`. Called by the API process;
+    worker processes only import this module and send their records to it
+    (see forward_worker_logs). Idempotent per file.
+    """
+    global _queue_handler
+    key = os.path.abspath(path)
+    with _setup_lock:
+        if key in _listeners:
+            return
+        _queue_handler, listener = setup_queue_logging(logger, create_file_handler(path, rotation=rotation))
+        _listeners[key] = listener
+        atexit.register(listener.stop)
+
+
+def _init_worker_logging(log_queue, level):
+    """ProcessPoolExecutor initializer: worker records go to the parent's queue, never to the file."""
+    logger.setLevel(level)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+
+
+_worker_queue = None
+
+
+def forward_worker_logs():
+    """
+    (initializer, initargs) for worker process pools: records logged by the
+    workers (e.g. signature failures in the crypto workers) are sent back
+    and written by this process's listener.
+    """
+    global _worker_queue
+    with _setup_lock:
+        if _worker_queue is None:
+            _worker_queue = multiprocessing.get_context("spawn").Queue()
+            threading.Thread(target=_forward, args=(_worker_queue,), name="vault-log-forwarder", daemon=True).start()
+    return _init_worker_logging, (_worker_queue, logger.level)
+
+
+def _forward(log_queue):
+    while True:
+        try:
+            record = log_queue.get()
+        except (EOFError, OSError):
+            return
+        logging.getLogger(record.name).handle(record)
+
+
+def get_log_stats() -> dict:
+    if _queue_handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
@@ -1,13 +1,39 @@
+import asyncio
+import atexit
+import base64
+import binascii
+import os
 from datetime import timezone, datetime
-from fastapi import FastAPI, HTTPException
+from typing import Optional
+from urllib.parse import unquote
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from backend.database import init_db
-from backend.database import get_records, verify_chain
-from backend.logger import logger
-from backend.schemas import AuditResponse, RecordOut, RegisterRequest, VerifyRequest, VerifyResponse, PrepareRegisterRequest
-from backend.database import insert_record, get_last_record, get_record_by_hash
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from backend.database import init_db, submit_records, WRITER_TIMEOUT
+from backend.database import get_pool_stats, get_writer_stats, get_bloom_stats, get_storage_stats
+from backend.database import get_head_cache_stats, TreeStateError
+from backend import fast_json
+from backend.fast_json import FastJSONResponse
+from backend.executors import ExecutorSaturated, crypto_executor, db_executor, get_executor_stats
+from backend.metrics import CONTENT_TYPE, REGISTRY, STAGE_LATENCY, MetricsMiddleware
+from backend.ledger import UnsupportedHash
+from backend.writer import WriterSaturated
+from backend.database import iter_records, get_records_page, get_record_before, audit_chain
+from backend.logger import logger, get_log_stats, setup_logging
+from backend.schemas import AuditResponse, RecordOut, RegisterRequest, VerifyRequest, VerifyResponse, PrepareRegisterRequest, ProofResponse
+from backend.schemas import VerifyBatchRequest, TreeHeadOut, ConsistencyResponse, UploadResponse
+from backend.schemas import ChunkOut, ManifestResponse, ChunkProofResponse
+from backend.schemas import PrepareBatchRequest, BatchRegisterRequest, BatchRegisterResponse, BatchRecordOut
+from backend.database import get_record_by_hash, get_merkle_proof, get_records_by_hashes, get_merkle_proofs
+from backend.database import get_consistency_proof, get_tree_head, save_chunk_manifest, get_chunk_manifest
+from backend.tree_heads import publisher
 from CryptoModule.verify_util import create_canonical_message, verify_signature, check_replay_protection
-from CryptoModule.security_engine import SecurityVaultManager
+from CryptoModule.verify_util import compute_batch_root, create_batch_canonical_message, verify_batch_signature
+from CryptoModule.verify_util import get_key_cache_stats
+from CryptoModule.chain_validator import ChainValidator
+from CryptoModule.hash_util import StreamHash
+from CryptoModule.chunking import DEFAULT_CHUNK_SIZE, ChunkStream
 
 app = FastAPI(
     title="Deterministic Security Vault API",
@@ -26,12 +52,83 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+# Audit log file (one listener in this process; worker processes forward to it)
+setup_logging()
 
 # Database initialization
 init_db()
 
+# Signed tree heads are published in the background (every VAULT_STH_INTERVAL seconds)
+publisher.start()
+atexit.register(publisher.stop)
+
+# Component statistics exported as gauges on every /metrics scrape
+REGISTRY.add_collector("vault_db_pool", "SQLite connection pool", get_pool_stats)
+REGISTRY.add_collector("vault_writer", "Chain writer", get_writer_stats)
+REGISTRY.add_collector("vault_bloom", "Negative lookup filter", get_bloom_stats)
+REGISTRY.add_collector("vault_head_cache", "Chain head cache", get_head_cache_stats)
+REGISTRY.add_collector("vault_log", "Audit log queue", get_log_stats)
+REGISTRY.add_collector("vault_ledger", "Binary ledger storage", get_storage_stats)
+REGISTRY.add_collector(
+    "vault_key_cache", "Public key cache of the API process (workers keep their own)", get_key_cache_stats
+)
+REGISTRY.add_collector(
+    "vault_executor", "Bounded executors",
+    lambda: {f"{name}_{key}": value for name, stats in get_executor_stats().items() for key, value in stats.items()}
+)
+
+# NDJSON lines sent per chunk by the streaming audit
+AUDIT_STREAM_CHUNK = 256
+
+# Upper bound for /upload?chunk_size: a streamed chunk is buffered (up to 4x this size for cdc)
+MAX_UPLOAD_CHUNK_SIZE = int(os.getenv("VAULT_MAX_UPLOAD_CHUNK_SIZE", str(16 * 1024 * 1024)))
+
+# Upper bound for /register/batch (one transaction, one response)
+MAX_BATCH_SIZE = int(os.getenv("VAULT_MAX_BATCH_SIZE", "50000"))
+
+# Upper bound for /verify/batch and hashes resolved per database round trip
+MAX_VERIFY_BATCH = int(os.getenv("VAULT_MAX_VERIFY_BATCH", "100000"))
+VERIFY_BATCH_CHUNK = 1000
+
+
+@app.exception_handler(ExecutorSaturated)
+@app.exception_handler(WriterSaturated)
+async def saturated_handler(request, exc):
+    # Backpressure: refuse new work instead of queueing it without bound
+    logger.warning(f"Rejecting {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Server is busy, retry later."},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(UnsupportedHash)
+async def unsupported_hash_handler(request, exc):
+    # The binary ledger only stores raw SHA-256 digests
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(TreeStateError)
+async def tree_state_handler(request, exc):
+    # Proofs need stored nodes; a damaged tree is reported, not answered with a traceback
+    logger.error(f"Merkle tree state is damaged ({request.url.path}): {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Merkle tree state is incomplete; run /audit?deep=true to locate the damage."}
+    )
+
+
+async def _write(entries, user_key: str, timestamp: str, with_proofs: bool = False) -> dict:
+    """Queues entries for the chain writer and waits for the commit without holding a thread."""
+    future = submit_records(entries, user_key, timestamp, with_proofs)
+    return await asyncio.wait_for(asyncio.wrap_future(future), WRITER_TIMEOUT)
+
+
 @app.post("/register/prepare")
-def prepare_register(payload: PrepareRegisterRequest):
+async def prepare_register(payload: PrepareRegisterRequest):
     # Prepare aşamasında timestamp üretiyoruz ama prev_hash imzaya girmiyor artık.
     timestamp = datetime.now(timezone.utc).isoformat()
 
@@ -55,7 +152,7 @@ def prepare_register(payload: PrepareRegisterRequest):
     summary="Register a New File",
     description="Calculates the hash of the uploaded file, verifies the digital signature, updates the Merkle Tree, and stores the record immutably."
 )
-def register_record(payload: RegisterRequest):
+async def register_record(payload: RegisterRequest):
 
     # Signature zorunlu
     if not payload.public_key or not payload.signature:
@@ -71,7 +168,9 @@ def register_record(payload: RegisterRequest):
         )
 
     # Replay protection
-    if not check_replay_protection(payload.timestamp):
+    with STAGE_LATENCY.time(stage="replay_check"):
+        replay_ok = check_replay_protection(payload.timestamp)
+    if not replay_ok:
         raise HTTPException(
             status_code=401,
             detail="Replay attack detected (timestamp expired)."
@@ -85,56 +184,232 @@ def register_record(payload: RegisterRequest):
         timestamp=payload.timestamp
     )
     
+    return await _register_signed(payload.file_name, payload.file_hash, payload.public_key,
+                                  payload.signature, payload.timestamp, message)
+
+
+async def _register_signed(file_name: str, file_hash: str, public_key: str, signature: str,
+                           timestamp: str, message: str) -> RecordOut:
+    """Verifies the client's signature over `message` and chains the record (replay check done by the caller)."""
     logger.info("Verifying RSA signature for incoming record")
     
-    # Signature verification
-    if not verify_signature(
-        payload.public_key,
-        message,
-        payload.signature
-    ):
+    # Signature verification (CPU-bound RSA-PSS, runs on the crypto worker pool)
+    with STAGE_LATENCY.time(stage="signature_verify"):
+        signature_ok = await crypto_executor.run(
+            verify_signature,
+            public_key,
+            message,
+            signature
+        )
+    if not signature_ok:
         raise HTTPException(
             status_code=401,
             detail="Invalid signature."
         )
 
-    # Previous hash (hash-chain) - ZİNCİR İÇİN HALA GEREKLİ
-    last_record = get_last_record()
-    prev_hash = last_record["file_hash"] if last_record else "GENESIS"
+    # DB insert - ZİNCİR BURADA KURULUYOR
+    # prev_hash and the vault-wide Merkle root are set by the single chain writer,
+    # which returns exactly the row it inserted (no race with other requests).
+    # Head lookup, Merkle update and INSERT happen in the writer (stages of its group)
+    with STAGE_LATENCY.time(stage="chain_write"):
+        result = await _write(
+            [(file_name, file_hash)],
+            user_key=public_key,
+            timestamp=timestamp
+        )
+    r = result["records"][0]
+
+    logger.info(f"New record registered: {file_name}")
+
+    return RecordOut(**r.public())
 
-    # Merkle root
-    vault = SecurityVaultManager()
-    merkle_root = vault.build_merkle_root(
-        [payload.file_hash, prev_hash]
+
+@app.post(
+    "/upload",
+    response_model=UploadResponse,
+    tags=["Register"],
+    summary="Hash (and Register) an Uploaded File",
+    description=(
+        "Streams the raw request body (application/octet-stream, chunked transfer encoding "
+        "allowed) into an incremental SHA-256; the file is never held in memory or written "
+        "to disk. Returns the digest and, when X-File-Name is given, the canonical message "
+        "to sign for /register. With X-Public-Key (base64 of the PEM), X-Signature and "
+        "X-Timestamp the file is registered in the same request. With `chunking` a per-file "
+        "Merkle tree of chunk hashes is built as well and stored with the registration "
+        "(see /manifest)."
     )
+)
+async def upload_file(
+    request: Request,
+    chunking: Optional[str] = Query(None, pattern="^(fixed|cdc)$", description="Also build a chunk manifest: fixed-size or content-defined chunks."),
+    chunk_size: int = Query(min(DEFAULT_CHUNK_SIZE, MAX_UPLOAD_CHUNK_SIZE), ge=64 * 1024, le=MAX_UPLOAD_CHUNK_SIZE, description="Chunk size (average size for cdc).")
+):
+    headers = request.headers
+    # The digest covers the body as sent: a multipart or form envelope would be hashed along with the file
+    content_type = headers.get("content-type", "application/octet-stream").split(";")[0].strip().lower()
+    if content_type != "application/octet-stream":
+        raise HTTPException(
+            status_code=415,
+            detail="Send the raw file bytes as application/octet-stream (multipart uploads are not supported)."
+        )
 
-    # DB insert - ZİNCİR BURADA KURULUYOR (prev_hash ekleniyor)
-    insert_record(
-        file_name=payload.file_name,
-        file_hash=payload.file_hash,
-        prev_hash=prev_hash,
-        user_key=payload.public_key,
-        merkle_root=merkle_root,
-        timestamp=payload.timestamp
+    file_name = unquote(headers["x-file-name"]) if headers.get("x-file-name") else None
+    public_key = headers.get("x-public-key")
+    signature = headers.get("x-signature")
+    timestamp = headers.get("x-timestamp")
+
+    register = bool(public_key or signature)
+    if register:
+        if not (public_key and signature and timestamp and file_name):
+            raise HTTPException(
+                status_code=400,
+                detail="X-File-Name, X-Public-Key, X-Signature ve X-Timestamp birlikte zorunludur."
+            )
+        try:
+            public_key = base64.b64decode(public_key, validate=True).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="X-Public-Key must be the base64 encoded PEM.")
+        # Checked before the body is read: an expired request does not get to upload gigabytes
+        with STAGE_LATENCY.time(stage="replay_check"):
+            replay_ok = check_replay_protection(timestamp)
+        if not replay_ok:
+            raise HTTPException(
+                status_code=401,
+                detail="Replay attack detected (timestamp expired)."
+            )
+
+    # The body is hashed chunk by chunk as it arrives (hashlib releases the GIL on large chunks)
+    stream = StreamHash()
+    chunker = ChunkStream(chunking, chunk_size) if chunking else None
+    with STAGE_LATENCY.time(stage="upload_hash"):
+        async for chunk in request.stream():
+            stream.update(chunk)
+            if chunker is None:
+                continue
+            if chunking == "cdc":
+                # Boundary search is a byte-wise Python loop: keep it off the event loop
+                await asyncio.to_thread(chunker.update, chunk)
+            else:
+                chunker.update(chunk)
+    file_hash = stream.hexdigest()
+    manifest = chunker.finish() if chunker else None
+    logger.info(f"Hashed uploaded body: {stream.size} bytes")
+
+    timestamp = timestamp or datetime.now(timezone.utc).isoformat()
+    message = create_canonical_message(
+        file_name=file_name,
+        file_hash=file_hash,
+        timestamp=timestamp
+    ) if file_name else None
+
+    record = None
+    if register:
+        # The signature must cover the digest of the bytes actually received
+        record = await _register_signed(file_name, file_hash, public_key, signature, timestamp, message)
+        if manifest is not None:
+            await db_executor.run(save_chunk_manifest, file_hash, manifest)
+
+    return UploadResponse(
+        file_hash=file_hash,
+        size=stream.size,
+        file_name=file_name,
+        timestamp=timestamp,
+        canonical_message=message,
+        record=record,
+        chunk_root=manifest.root if manifest else None,
+        chunk_count=len(manifest.chunks) if manifest else None
     )
 
-    logger.info(f"New record registered: {payload.file_name}")
 
-    r = get_last_record()
-    return RecordOut(
-        id=r["id"],
-        file_name=r["file_name"],
-        file_hash=r["file_hash"],
-        prev_hash=r["prev_hash"],
-        timestamp=r["timestamp"]
+@app.post(
+    "/register/batch/prepare",
+    tags=["Register"],
+    summary="Prepare a Batch Registration",
+    description="Returns the batch Merkle root and the canonical message the client must sign for /register/batch."
+)
+async def prepare_register_batch(payload: PrepareBatchRequest):
+    timestamp = datetime.now(timezone.utc).isoformat()
+    batch_root = await crypto_executor.run(
+        compute_batch_root,
+        [(item.file_name, item.file_hash) for item in payload.items],
+        timestamp
+    )
+
+    return {
+        "canonical_message": create_batch_canonical_message(batch_root, len(payload.items), timestamp),
+        "batch_root": batch_root,
+        "timestamp": timestamp
+    }
+
+
+@app.post(
+    "/register/batch",
+    response_model=BatchRegisterResponse,
+    tags=["Register"],
+    summary="Register Many Files",
+    description="Verifies ONE signature over the Merkle root of the batch, chains all files in a single transaction and returns an inclusion proof for every file."
+)
+async def register_batch(payload: BatchRegisterRequest):
+    if len(payload.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_BATCH_SIZE} files)."
+        )
+
+    if not check_replay_protection(payload.timestamp):
+        raise HTTPException(
+            status_code=401,
+            detail="Replay attack detected (timestamp expired)."
+        )
+
+    items = [(item.file_name, item.file_hash) for item in payload.items]
+
+    logger.info(f"Verifying RSA signature for batch of {len(items)} records")
+
+    # Batch root and signature are computed together in one worker task
+    batch_root, valid = await crypto_executor.run(
+        verify_batch_signature, items, payload.timestamp, payload.public_key, payload.signature
+    )
+    if not valid:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid signature."
+        )
+
+    result = await _write(items, payload.public_key, payload.timestamp, with_proofs=True)
+
+    logger.info(f"Batch registered: {len(items)} records, vault size {result['tree_size']}")
+
+    return BatchRegisterResponse(
+        batch_root=batch_root,
+        tree_size=result["tree_size"],
+        merkle_root=result["merkle_root"],
+        records=[
+            BatchRecordOut(
+                record=RecordOut(**r.public()),
+                leaf_index=r["leaf_index"],
+                proof=proof
+            )
+            for r, proof in zip(result["records"], result["proofs"])
+        ]
     )
 
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus Metrics",
+    description="Request counters, latency histograms, registration stage timers and pool/cache/writer statistics in the Prometheus text format."
+)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/ping")
-def ping():
+async def ping():
     return {"message": "pong"}
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 @app.get(
@@ -142,31 +417,99 @@ def health():
     response_model=AuditResponse, 
     tags=["Audit"],
     summary="Validate Chain Integrity",
-    description="Performs a complete audit of the hash chain to detect any tampering or broken links in the database."
+    description="Audits the hash chain to detect any tampering or broken links in the database. Only records added since the last successful audit are validated unless full=true; deep=true also recomputes every Merkle root."
 )
-def audit():
-    records = get_records()
-    chain_valid, broken = verify_chain()
-
+async def audit(
+    after_id: int = Query(0, ge=0, description="Keyset cursor: only records with a greater id are returned."),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size. Omit to return every record after the cursor."),
+    stream: bool = Query(False, description="Stream NDJSON lines (one per record, then a summary) instead of one JSON document."),
+    full: bool = Query(False, description="Re-verify the whole chain instead of resuming from the last audit checkpoint."),
+    deep: bool = Query(False, description="Full audit that also recomputes every stored Merkle root, in parallel segments."),
+    include_records: bool = Query(True, description="Set to false to get only the chain verdict.")
+):
     logger.info("Audit endpoint called")
 
-    if not chain_valid:
+    if stream:
+        return StreamingResponse(_stream_audit(after_id), media_type="application/x-ndjson")
+
+    if limit is not None:
+        return await db_executor.run(_audit_page, after_id, limit)
+    return await db_executor.run(_audit_chain, after_id, full, include_records, deep)
+
+
+# The audit bodies below follow AuditResponse (the documented model) but are built
+# as plain dicts and serialized by FastJSONResponse: validating and encoding one
+# RecordOut per record cost far more than reading the records.
+
+def _audit_page(after_id: int, limit: int) -> FastJSONResponse:
+    # A page checks only its own links (including the one to the previous page)
+    rows = get_records_page(after_id, limit)
+    previous = get_record_before(rows[0].id) if rows else None
+    broken = [r.id for r, linked in ChainValidator.iter_links(rows, previous) if not linked]
+
+    if broken:
         logger.warning(f"Hash chain broken at records: {broken}")
 
-    return AuditResponse(
-        chain_valid=chain_valid,
-        broken_record_ids=broken,
-        records=[
-            RecordOut(
-                id=r["id"],
-                file_name=r["file_name"],
-                file_hash=r["file_hash"],
-                prev_hash=r["prev_hash"],
-                timestamp=r["timestamp"]
-            )
-            for r in records
-        ]
-    )
+    return FastJSONResponse({
+        "chain_valid": not broken,
+        "broken_record_ids": broken,
+        "records": [r.public() for r in rows],
+        "next_after_id": rows[-1].id if len(rows) == limit else None,
+        "audited_records": None,
+        "merkle_valid": None
+    })
+
+
+def _audit_chain(after_id: int, full: bool, include_records: bool, deep: bool = False) -> FastJSONResponse:
+    # Whole-chain verdict: incremental from the last checkpoint unless full=true
+    result = audit_chain(full, deep)
+
+    if not result["chain_valid"]:
+        logger.warning(f"Hash chain broken at records: {result['broken_record_ids']}")
+
+    records = []
+    if include_records:
+        records = [r.public() for r in iter_records(after_id)]
+
+    return FastJSONResponse({
+        "chain_valid": result["chain_valid"],
+        "broken_record_ids": result["broken_record_ids"],
+        "records": records,
+        "next_after_id": None,
+        "audited_records": result["audited_records"],
+        "merkle_valid": result.get("merkle_valid")
+    })
+
+
+def _stream_audit(after_id: int):
+    """
+    NDJSON body for /audit?stream=true. Rows come from a single cursor and are
+    validated on the fly; the last line carries the verdict for the whole range.
+    """
+    previous = get_record_before(after_id + 1) if after_id else None
+    broken = []
+    count = 0
+    lines = []
+
+    for r, linked in ChainValidator.iter_links(iter_records(after_id), previous):
+        if not linked:
+            broken.append(r.id)
+        count += 1
+        lines.append(fast_json.dumps_str({"type": "record", "linked": linked, **r.public()}))
+        if len(lines) >= AUDIT_STREAM_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if broken:
+        logger.warning(f"Hash chain broken at records: {broken}")
+
+    lines.append(fast_json.dumps_str({
+        "type": "summary",
+        "chain_valid": not broken,
+        "broken_record_ids": broken,
+        "count": count
+    }))
+    yield "\n".join(lines) + "\n"
 
 @app.post(
     "/verify",
@@ -175,24 +518,297 @@ def audit():
     summary="Verify File Existence",
     description="Checks if a specific file hash exists in the immutable vault."
 )
-def verify_record(payload: VerifyRequest):
-    record = get_record_by_hash(payload.file_hash)
+async def verify_record(payload: VerifyRequest):
+    record = await db_executor.run(get_record_by_hash, payload.file_hash)
     
     if record:
         return VerifyResponse(
             verified=True,
             message="File found in the vault.",
-            record=RecordOut(
-                id=record["id"],
-                file_name=record["file_name"],
-                file_hash=record["file_hash"],
-                prev_hash=record["prev_hash"],
-                timestamp=record["timestamp"]
-            )
+            record=RecordOut(**record.public())
         )
     else:
         return VerifyResponse(
             verified=False,
             message="File NOT found in the vault.",
             record=None
-        )
\ No newline at end of file
+        )
+
+@app.post(
+    "/verify/batch",
+    tags=["Audit"],
+    summary="Verify Many Files",
+    description=(
+        "Checks many file hashes in one request. The body is a JSON list of hashes, "
+        "{\"file_hashes\": [...], \"include_proofs\": bool}, or NDJSON (one hash or "
+        "{\"file_hash\": ...} per line). Results stream back as NDJSON in input order, "
+        "followed by a summary line; all proofs share the root in the summary."
+    )
+)
+async def verify_batch(
+    request: Request,
+    include_proofs: bool = Query(False, description="Attach an inclusion proof to every verified hash.")
+):
+    if "ndjson" in request.headers.get("content-type", ""):
+        file_hashes = await _read_ndjson_hashes(request)
+    else:
+        try:
+            body = fast_json.loads(await request.body())
+            if isinstance(body, list):
+                body = {"file_hashes": body}
+            parsed = VerifyBatchRequest.model_validate(body)
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid request body: {e}")
+        file_hashes = parsed.file_hashes
+        include_proofs = include_proofs or parsed.include_proofs
+
+    if not file_hashes:
+        raise HTTPException(status_code=422, detail="No file hashes given.")
+    if len(file_hashes) > MAX_VERIFY_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_VERIFY_BATCH} hashes)."
+        )
+
+    logger.info(f"Batch verification of {len(file_hashes)} hashes")
+
+    # The first chunk is resolved before answering, so a saturated server still gets a clean 429
+    first = await _resolve_hashes(file_hashes[:VERIFY_BATCH_CHUNK], include_proofs, None)
+    return StreamingResponse(
+        _stream_verify_batch(file_hashes, include_proofs, first),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _read_ndjson_hashes(request: Request) -> list:
+    """Parses an NDJSON body incrementally; each line is a hash string or {"file_hash": ...}."""
+    file_hashes = []
+    buffered = b""
+
+    def parse(line: bytes):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            item = fast_json.loads(line)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid NDJSON line {len(file_hashes) + 1}.")
+        if isinstance(item, dict):
+            item = item.get("file_hash")
+        if not isinstance(item, str):
+            raise HTTPException(status_code=422, detail=f"Line {len(file_hashes) + 1} has no file hash.")
+        file_hashes.append(item)
+        if len(file_hashes) > MAX_VERIFY_BATCH:
+            raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_VERIFY_BATCH} hashes).")
+
+    async for chunk in request.stream():
+        lines = (buffered + chunk).split(b"\n")
+        buffered = lines.pop()
+        for line in lines:
+            parse(line)
+    parse(buffered)
+    return file_hashes
+
+
+async def _resolve_hashes(chunk, include_proofs: bool, tree_size):
+    """Looks up one chunk of hashes (and their proofs against the pinned tree)."""
+    found = await db_executor.run(get_records_by_hashes, chunk)
+    tree = (None, None, {})
+    if include_proofs:
+        leaves = [r["leaf_index"] for r in found.values() if r["leaf_index"] is not None]
+        tree = await db_executor.run(get_merkle_proofs, leaves, tree_size)
+    return found, tree
+
+
+async def _stream_verify_batch(file_hashes, include_proofs: bool, first):
+    """NDJSON body for /verify/batch: one result line per input hash, then a summary."""
+    verified = 0
+    tree_size = merkle_root = None
+
+    for start in range(0, len(file_hashes), VERIFY_BATCH_CHUNK):
+        chunk = file_hashes[start:start + VERIFY_BATCH_CHUNK]
+        try:
+            found, (size, root, proofs) = first if start == 0 else await _resolve_hashes(chunk, include_proofs, tree_size)
+        except ExecutorSaturated as e:
+            # Headers are already sent: report the failure in-band and stop
+            yield fast_json.dumps_str({"type": "error", "detail": str(e), "processed": start}) + "\n"
+            return
+        if include_proofs and tree_size is None:
+            tree_size, merkle_root = size, root
+
+        lines = []
+        for file_hash in chunk:
+            r = found.get(file_hash)
+            line = {
+                "type": "result",
+                "file_hash": file_hash,
+                "verified": r is not None,
+                "record": r.public() if r is not None else None
+            }
+            if r is not None:
+                verified += 1
+                if include_proofs:
+                    line["leaf_index"] = r["leaf_index"]
+                    line["proof"] = proofs.get(r["leaf_index"])
+            lines.append(fast_json.dumps_str(line))
+        yield "\n".join(lines) + "\n"
+
+    summary = {"type": "summary", "count": len(file_hashes), "verified": verified}
+    if include_proofs:
+        summary.update(tree_size=tree_size, merkle_root=merkle_root)
+    yield fast_json.dumps_str(summary) + "\n"
+
+
+@app.get(
+    "/proof/{file_hash}",
+    response_model=ProofResponse,
+    tags=["Audit"],
+    summary="Get Merkle Inclusion Proof",
+    description="Returns the sibling path proving that a file hash is included under the current vault-wide Merkle root."
+)
+async def merkle_proof(file_hash: str):
+    record = await db_executor.run(get_record_by_hash, file_hash)
+
+    if not record or record["leaf_index"] is None:
+        raise HTTPException(
+            status_code=404,
+            detail="File NOT found in the vault."
+        )
+
+    tree_size, merkle_root, proof = await db_executor.run(get_merkle_proof, record["leaf_index"])
+
+    return ProofResponse(
+        file_hash=record["file_hash"],
+        leaf_index=record["leaf_index"],
+        tree_size=tree_size,
+        merkle_root=merkle_root,
+        proof=proof
+    )
+
+
+@app.get(
+    "/tree-head",
+    response_model=TreeHeadOut,
+    tags=["Audit"],
+    summary="Signed Tree Head",
+    description="Returns the latest server-signed (tree_size, merkle_root, timestamp), or the head published for tree_size. Heads are published periodically when the vault grew."
+)
+async def tree_head(tree_size: Optional[int] = Query(None, ge=1, description="A specific published head instead of the latest.")):
+    if tree_size is None:
+        head = await db_executor.run(publisher.latest)
+    else:
+        head = await db_executor.run(get_tree_head, tree_size)
+
+    if head is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No tree head published for this size."
+        )
+    return TreeHeadOut(
+        tree_size=head["tree_size"],
+        merkle_root=head["merkle_root"],
+        timestamp=head["timestamp"],
+        signature=head["signature"]
+    )
+
+
+@app.get(
+    "/signing-key",
+    tags=["Audit"],
+    summary="Tree Head Signing Key",
+    description="The server's public key (PEM) for verifying tree head signatures."
+)
+async def signing_key():
+    return {"public_key": await db_executor.run(publisher.signer.public_key_pem)}
+
+
+@app.get(
+    "/consistency",
+    response_model=ConsistencyResponse,
+    tags=["Audit"],
+    summary="Consistency Proof",
+    description="Proves in O(log n) hashes that the vault tree of size `from` is a prefix of the tree of size `to` (default: current size)."
+)
+async def consistency(
+    from_size: int = Query(..., alias="from", ge=1, description="Size of the older tree."),
+    to_size: Optional[int] = Query(None, alias="to", ge=1, description="Size of the newer tree (default: current).")
+):
+    try:
+        from_root, size, root, proof = await db_executor.run(get_consistency_proof, from_size, to_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ConsistencyResponse(
+        from_size=from_size,
+        to_size=size,
+        from_root=from_root,
+        to_root=root,
+        proof=proof
+    )
+
+
+async def _load_manifest(file_hash: str):
+    manifest = await db_executor.run(get_chunk_manifest, file_hash)
+    if manifest is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No chunk manifest stored for this file."
+        )
+    return manifest
+
+
+@app.get(
+    "/manifest/{file_hash}",
+    response_model=ManifestResponse,
+    tags=["Audit"],
+    summary="Chunk Manifest",
+    description=(
+        "Chunk hashes and chunk Merkle root of a file registered through a chunked /upload. "
+        "With start/end only the chunks overlapping that byte range are listed, so a client "
+        "can re-verify a range of a large file without reading the rest."
+    )
+)
+async def chunk_manifest(
+    file_hash: str,
+    start: int = Query(0, ge=0, description="First byte of the range."),
+    end: Optional[int] = Query(None, ge=0, description="End of the range (exclusive, default: end of file).")
+):
+    manifest = await _load_manifest(file_hash)
+    end = manifest.size if end is None else min(end, manifest.size)
+    chunks = [
+        ChunkOut(index=i, offset=manifest.chunks[i].offset, length=manifest.chunks[i].length, hash=manifest.chunks[i].hash)
+        for i in manifest.chunks_in_range(start, end)
+    ]
+    return ManifestResponse(
+        file_hash=file_hash,
+        size=manifest.size,
+        mode=manifest.mode,
+        chunk_size=manifest.chunk_size,
+        chunk_root=manifest.root,
+        chunk_count=len(manifest.chunks),
+        chunks=chunks
+    )
+
+
+@app.get(
+    "/manifest/{file_hash}/chunks/{index}/proof",
+    response_model=ChunkProofResponse,
+    tags=["Audit"],
+    summary="Chunk Proof",
+    description="Inclusion proof of one chunk under the file's chunk root (partial verification of a single chunk)."
+)
+async def chunk_proof(file_hash: str, index: int):
+    manifest = await _load_manifest(file_hash)
+    if not 0 <= index < len(manifest.chunks):
+        raise HTTPException(
+            status_code=404,
+            detail="Chunk index out of range."
+        )
+    chunk = manifest.chunks[index]
+    proof = await db_executor.run(manifest.proof, index)
+    return ChunkProofResponse(
+        file_hash=file_hash,
+        chunk=ChunkOut(index=index, offset=chunk.offset, length=chunk.length, hash=chunk.hash),
+        chunk_root=manifest.root,
+        proof=proof
+    )
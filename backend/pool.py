@@ -0,0 +1,112 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe bounded pool of database connections.
+
+    Connections are created lazily by `factory` up to `max_size` and handed
+    out LIFO, so the most recently used connection (with the warmest page and
+    statement caches) is reused first. reset() drops every connection, e.g.
+    after the database file has been replaced.
+    """
+
+    def __init__(self, factory, max_size: int = 8, timeout: float = 30.0):
+        self._factory = factory
+        self._max_size = max_size
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        self._idle = []
+        self._in_use = set()
+        self._stale = set()
+        self._open = 0
+        self.stats = {"created": 0, "reused": 0, "waits": 0, "timeouts": 0}
+
+    def acquire(self):
+        deadline = time.monotonic() + self._timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._in_use.add(conn)
+                    self.stats["reused"] += 1
+                    return conn
+                if self._open < self._max_size:
+                    self._open += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                self.stats["waits"] += 1
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    self.stats["timeouts"] += 1
+                    raise PoolTimeout("No database connection available.")
+
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._in_use.add(conn)
+            self.stats["created"] += 1
+        return conn
+
+    def release(self, conn):
+        broken = False
+        try:
+            # Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+        except Exception:
+            broken = True
+
+        with self._cond:
+            self._in_use.discard(conn)
+            discard = broken or conn in self._stale
+            self._stale.discard(conn)
+            if discard:
+                self._open -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+        if discard:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def reset(self):
+        """Closes idle connections; connections in use are closed when released."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._stale |= self._in_use
+            self._cond.notify_all()
+
+        for conn in idle:
+            conn.close()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "max_size": self._max_size,
+                **self.stats
+            }
@@ -0,0 +1,79 @@
+from typing import Iterable
+
+# Columns of the records table, in the order every record query selects them
+RECORD_FIELDS = (
+    "id", "file_name", "file_hash", "prev_hash", "timestamp", "user_key",
+    "merkle_root", "leaf_index", "file_hash_bin", "key_id"
+)
+RECORD_COLUMNS = ", ".join(RECORD_FIELDS)
+
+# Fields the API exposes (user_key and the lookup columns never leave the server)
+PUBLIC_FIELDS = ("id", "file_name", "file_hash", "prev_hash", "timestamp", "merkle_root")
+
+
+class Record:
+    """
+    One vault record, built straight from a result row by record_factory.
+
+    A __slots__ object instead of a dict or sqlite3.Row: fields are read as
+    attributes (record.file_hash), and record["file_hash"] resolves to the
+    same slot without a Python-level call, so code written for rows and
+    dicts keeps working. Records are addressed by field name only.
+    """
+
+    __slots__ = RECORD_FIELDS
+
+    __getitem__ = object.__getattribute__
+
+    def __init__(self, values: Iterable):
+        (self.id, self.file_name, self.file_hash, self.prev_hash, self.timestamp, self.user_key,
+         self.merkle_root, self.leaf_index, self.file_hash_bin, self.key_id) = values
+
+    def __contains__(self, key) -> bool:
+        return key in RECORD_FIELDS
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in RECORD_FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Record(id={self.id!r}, file_name={self.file_name!r}, file_hash={self.file_hash!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in RECORD_FIELDS)
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    @staticmethod
+    def keys():
+        return RECORD_FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in RECORD_FIELDS else default
+
+    def public(self) -> dict:
+        """The fields of the API's RecordOut, ready for JSON serialization."""
+        return {
+            "id": self.id,
+            "file_name": self.file_name,
+            "file_hash": self.file_hash,
+            "prev_hash": self.prev_hash,
+            "timestamp": self.timestamp,
+            "merkle_root": self.merkle_root,
+        }
+
+
+def record_factory(cursor, row) -> Record:
+    """sqlite3 row_factory for queries selecting RECORD_COLUMNS."""
+    return Record(row)
+
+
+def record_cursor(conn):
+    """A cursor on `conn` whose rows are Records (other cursors keep sqlite3.Row)."""
+    cur = conn.cursor()
+    cur.row_factory = record_factory
+    return cur
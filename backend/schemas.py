@@ -8,12 +8,16 @@ class RecordOut(BaseModel):
     file_hash: str
     prev_hash: str
     timestamp: str
+    merkle_root: Optional[str] = None   # Vault-wide Merkle root after this record
 
 
 class AuditResponse(BaseModel):
     chain_valid: bool
     broken_record_ids: List[int] = Field(default_factory=list)
     records: List[RecordOut] = Field(default_factory=list)
+    next_after_id: Optional[int] = None    # Cursor for the next page (None = last page)
+    audited_records: Optional[int] = None  # Records validated by this call (incremental audit)
+    merkle_valid: Optional[bool] = None    # Stored Merkle roots and tree state recomputed (deep audit only)
 
 
 class RegisterRequest(BaseModel):
@@ -33,6 +37,102 @@ class VerifyResponse(BaseModel):
     message: str
     record: Optional[RecordOut] = None
 
+
+class VerifyBatchRequest(BaseModel):
+    file_hashes: List[str] = Field(min_length=1)
+    include_proofs: bool = False
+
+class ProofNode(BaseModel):
+    position: str          # "left" or "right" (side of the sibling)
+    hash: str
+
+
+class ProofResponse(BaseModel):
+    file_hash: str
+    leaf_index: int
+    tree_size: int
+    merkle_root: str
+    proof: List[ProofNode] = Field(default_factory=list)
+
 class PrepareRegisterRequest(BaseModel):
     file_name: str
     file_hash: str
+
+
+class BatchItem(BaseModel):
+    file_name: str
+    file_hash: str
+
+
+class PrepareBatchRequest(BaseModel):
+    items: List[BatchItem] = Field(min_length=1)
+
+
+class BatchRegisterRequest(BaseModel):
+    items: List[BatchItem] = Field(min_length=1)
+    public_key: str        # PEM formatted public key
+    signature: str         # Base64 RSA signature over the batch canonical message
+    timestamp: str         # ISO8601 timestamp (from /register/batch/prepare)
+
+
+class BatchRecordOut(BaseModel):
+    record: RecordOut
+    leaf_index: int
+    proof: List[ProofNode] = Field(default_factory=list)
+
+
+class BatchRegisterResponse(BaseModel):
+    batch_root: str        # Root of the signed batch tree
+    tree_size: int         # Vault size after the batch
+    merkle_root: str       # Vault-wide root the proofs lead to
+    records: List[BatchRecordOut] = Field(default_factory=list)
+
+
+class UploadResponse(BaseModel):
+    file_hash: str                              # SHA-256 of the streamed body, computed by the server
+    size: int                                   # Body size in bytes
+    file_name: Optional[str] = None
+    timestamp: Optional[str] = None             # Timestamp to sign (as from /register/prepare)
+    canonical_message: Optional[str] = None     # Message to sign for /register (needs a file name)
+    record: Optional[RecordOut] = None          # Set when the upload was also registered
+    chunk_root: Optional[str] = None            # Merkle root over the chunk hashes (chunked uploads)
+    chunk_count: Optional[int] = None
+
+
+class ChunkOut(BaseModel):
+    index: int
+    offset: int
+    length: int
+    hash: str
+
+
+class ManifestResponse(BaseModel):
+    file_hash: str
+    size: int
+    mode: str              # "fixed" or "cdc" (content-defined)
+    chunk_size: int        # Fixed chunk size, or the average size for "cdc"
+    chunk_root: str
+    chunk_count: int
+    chunks: List[ChunkOut] = Field(default_factory=list)   # Chunks overlapping the requested range
+
+
+class ChunkProofResponse(BaseModel):
+    file_hash: str
+    chunk: ChunkOut
+    chunk_root: str
+    proof: List[ProofNode] = Field(default_factory=list)
+
+
+class TreeHeadOut(BaseModel):
+    tree_size: int
+    merkle_root: str
+    timestamp: str         # ISO8601, set by the server when the head was published
+    signature: str         # Base64 RSA-PSS signature over tree_size|merkle_root|timestamp|STH
+
+
+class ConsistencyResponse(BaseModel):
+    from_size: int
+    to_size: int
+    from_root: str
+    to_root: str
+    proof: List[str] = Field(default_factory=list)   # See SecurityVaultManager.merkle_consistency_proof
@@ -0,0 +1,126 @@
+import base64
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+from backend import database
+from backend.logger import logger
+from CryptoModule.verify_util import create_tree_head_message
+
+# Server signing key: a PEM file path or the PEM itself. The default file is
+# created on first use and must never be committed.
+SIGNING_KEY = os.getenv("VAULT_SIGNING_KEY", str(Path(__file__).resolve().parent / "signing_key.pem"))
+# Seconds between published tree heads (only published when the tree grew)
+STH_INTERVAL = float(os.getenv("VAULT_STH_INTERVAL", "300"))
+
+
+class TreeHeadSigner:
+    """
+    RSA-PSS (SHA-256) signer for tree heads, the same scheme clients use for
+    registrations. The key is loaded (or generated) on first use.
+    """
+
+    def __init__(self, key: str):
+        self._source = key
+        self._key = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._key is not None:
+                return self._key
+            if self._source.lstrip().startswith("-----BEGIN"):
+                pem = self._source.encode("utf-8")
+            else:
+                path = Path(self._source)
+                if not path.exists():
+                    self._generate(path)
+                pem = path.read_bytes()
+            self._key = serialization.load_pem_private_key(pem, password=None)
+            return self._key
+
+    @staticmethod
+    def _generate(path: Path):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a private temp file and renamed: never readable by others, never half written
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".signing_key")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(tmp, path)
+        logger.info(f"Generated tree head signing key at {path}")
+
+    def public_key_pem(self) -> str:
+        return self._load().public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+
+    def sign(self, message: str) -> str:
+        signature = self._load().sign(
+            message.encode("utf-8"),
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+            hashes.SHA256()
+        )
+        return base64.b64encode(signature).decode("utf-8")
+
+
+class TreeHeadPublisher:
+    """
+    Signs and stores the vault's (size, root, timestamp) every `interval`
+    seconds if the tree grew since the last head. Monitors fetch heads and
+    check that each one extends the previous via GET /consistency.
+    """
+
+    def __init__(self, signer: TreeHeadSigner, interval: float = STH_INTERVAL):
+        self.signer = signer
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        """Publishes a head for the current tree (if new) and returns the latest head, or None."""
+        with self._lock:
+            latest = database.get_tree_head()
+            size, root = database.get_merkle_root()
+            if size == 0 or (latest is not None and latest["tree_size"] >= size):
+                return latest
+            timestamp = datetime.now(timezone.utc).isoformat()
+            signature = self.signer.sign(create_tree_head_message(size, root, timestamp))
+            database.save_tree_head(size, root, timestamp, signature)
+            logger.info(f"Published tree head: size {size}")
+            return database.get_tree_head(size)
+
+    def latest(self):
+        """The latest published head; the first one is published on demand."""
+        head = database.get_tree_head()
+        return head if head is not None else self.publish()
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="vault-tree-heads", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                logger.warning(f"Tree head publication failed: {e}")
+
+
+publisher = TreeHeadPublisher(TreeHeadSigner(SIGNING_KEY))
@@ -0,0 +1,120 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class WriterSaturated(Exception):
+    """Raised when too many registrations are already waiting for the writer."""
+
+
+class WriteJob:
+    """One registration request: one or more (file_name, file_hash) entries."""
+
+    __slots__ = ("entries", "user_key", "timestamp", "with_proofs", "future")
+
+    def __init__(self, entries, user_key, timestamp, with_proofs=False):
+        self.entries = entries
+        self.user_key = user_key
+        self.timestamp = timestamp
+        self.with_proofs = with_proofs
+        self.future = Future()
+
+
+class ChainWriter:
+    """
+    Single-writer append pipeline.
+
+    Every registration is queued and applied by ONE background thread, so the
+    chain head is only ever read and moved by the writer. Jobs that pile up
+    while a transaction is running are committed together in the next one
+    (group commit: one fsync for many registrations). `commit_group(jobs)`
+    does the database work and returns one result per job. It must only
+    raise when nothing was committed: a failed group is retried job by job,
+    so a group that raises after its commit would be appended twice. With
+    `max_pending` set, submit() refuses new jobs once that many are queued.
+    """
+
+    _STOP = object()
+
+    def __init__(self, commit_group, max_group: int = 256, max_pending: int = None):
+        self._commit_group = commit_group
+        self._max_group = max_group
+        self._max_pending = max_pending
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"jobs": 0, "groups": 0, "failed_groups": 0, "rejected": 0}
+
+    def submit(self, entries, user_key, timestamp, with_proofs=False) -> Future:
+        if self._max_pending is not None and self._queue.qsize() >= self._max_pending:
+            self.stats["rejected"] += 1
+            raise WriterSaturated("Too many registrations waiting for the chain writer.")
+        job = WriteJob(list(entries), user_key, timestamp, with_proofs)
+        self._ensure_started()
+        self._queue.put(job)
+        return job.future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="vault-chain-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is self._STOP:
+                return
+
+            group = [job]
+            stop = False
+            while len(group) < self._max_group:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is self._STOP:
+                    stop = True
+                    break
+                group.append(job)
+
+            # Jobs cancelled while queued (e.g. the request timed out) are dropped
+            group = [job for job in group if job.future.set_running_or_notify_cancel()]
+            if group:
+                self._apply(group)
+            if stop:
+                return
+
+    def _apply(self, group):
+        self.stats["groups"] += 1
+        self.stats["jobs"] += len(group)
+        try:
+            results = self._commit_group(group)
+        except Exception as exc:
+            self.stats["failed_groups"] += 1
+            if len(group) == 1:
+                group[0].future.set_exception(exc)
+                return
+            # Do not let one bad job fail the others: retry them one by one
+            for job in group:
+                self._apply_single(job)
+            return
+
+        for job, result in zip(group, results):
+            job.future.set_result(result)
+
+    def _apply_single(self, job):
+        try:
+            job.future.set_result(self._commit_group([job])[0])
+        except Exception as exc:
+            job.future.set_exception(exc)
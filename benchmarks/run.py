@@ -0,0 +1,289 @@
+"""
+Benchmark runner for the vault's hot paths.
+
+    python -m benchmarks.run                           # default sizes (10^3, 10^4)
+    python -m benchmarks.run --sizes 1e3,1e5,1e7 -o bench.json
+    python -m benchmarks.run --only merkle,verify --compare old.json
+    python -m benchmarks.run --storage ledger --only chain,proof
+
+Every benchmark runs against a synthetic vault of the given size in a
+temporary directory. Results carry latency percentiles, throughput and the
+tracemalloc peak of one extra (traced) run; the JSON output can be compared
+with --compare to flag regressions between commits.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# Rows per writer job while filling a synthetic vault
+FILL_BATCH = 10000
+
+
+def measure(fn, repeat: int, warmup: int = 1, memory: bool = True) -> dict:
+    """Times `repeat` calls of fn(); the memory peak comes from one extra traced call."""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+    result = {
+        "repeat": repeat,
+        "mean_s": statistics.fmean(samples),
+        "min_s": samples[0],
+        "p50_s": pct(50),
+        "p90_s": pct(90),
+        "p99_s": pct(99),
+        "max_s": samples[-1],
+        "ops_per_s": repeat / sum(samples) if sum(samples) else None
+    }
+
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def repeats_for(size: int, base: int) -> int:
+    """Fewer repetitions for the big vaults so a run stays within minutes."""
+    return max(3, base // max(1, size // 1000))
+
+
+class Vault:
+    """A synthetic vault of `size` records in its own database file."""
+
+    def __init__(self, directory: str, size: int, storage: str = "sqlite"):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from backend import database
+
+        self.size = size
+        self.database = database
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.public_key_pem = self.private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+        self.hashes = [hashlib.sha256(f"file-{i}".encode()).hexdigest() for i in range(size)]
+
+        database.DB_PATH = os.path.join(directory, f"vault_{storage}_{size}.db")
+        database.STORAGE = storage
+        database.init_db()
+        timestamp = datetime.now(timezone.utc).isoformat()
+        for start in range(0, size, FILL_BATCH):
+            entries = [(f"file-{i}", self.hashes[i]) for i in range(start, min(start + FILL_BATCH, size))]
+            database.submit_records(entries, self.public_key_pem, timestamp).result()
+
+    def sign(self, message: str) -> str:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
+        signature = self.private_key.sign(
+            message.encode("utf-8"),
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+            hashes.SHA256()
+        )
+        return base64.b64encode(signature).decode("utf-8")
+
+
+# --- Benchmarks: each takes (vault, args) and yields (name, result) ---
+
+def bench_merkle(vault, args):
+    from CryptoModule.security_engine import SecurityVaultManager
+
+    yield "build_merkle_root", measure(
+        lambda: SecurityVaultManager.build_merkle_root(vault.hashes), repeats_for(vault.size, 50)
+    )
+    if vault.size <= 100000:
+        # The list-based proof rebuilds the whole tree: O(n) per proof
+        target = vault.hashes[vault.size // 2]
+        yield "get_merkle_proof_list", measure(
+            lambda: SecurityVaultManager.get_merkle_proof(vault.hashes, target), repeats_for(vault.size, 50)
+        )
+
+
+def bench_proof(vault, args):
+    leaves = iter(range(10 ** 9))
+    yield "db_get_merkle_proof", measure(
+        lambda: vault.database.get_merkle_proof(next(leaves) % vault.size), args.repeat
+    )
+
+
+def bench_chain(vault, args):
+    yield "verify_chain_full", measure(
+        lambda: vault.database.verify_chain(full=True), repeats_for(vault.size, 20), memory=vault.size <= 100000
+    )
+    yield "verify_chain_deep", measure(
+        lambda: vault.database.verify_chain(deep=True), repeats_for(vault.size, 10), memory=False
+    )
+    # Nothing new since the last checkpoint: the incremental audit is O(1)
+    yield "verify_chain_incremental", measure(lambda: vault.database.verify_chain(), args.repeat)
+
+
+def bench_signature(vault, args):
+    from CryptoModule.verify_util import verify_signature
+
+    message = f"file.txt|{vault.hashes[0]}|2024-01-01T00:00:00+00:00"
+    signature = vault.sign(message)
+    yield "verify_signature", measure(
+        lambda: verify_signature(vault.public_key_pem, message, signature), args.repeat
+    )
+
+
+def bench_api(vault, args):
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    client = TestClient(app)
+    counter = iter(range(10 ** 9))
+
+    def register():
+        i = next(counter)
+        file_name, file_hash = f"bench-{i}", hashlib.sha256(f"bench-{vault.size}-{i}".encode()).hexdigest()
+        timestamp = datetime.now(timezone.utc).isoformat()
+        res = client.post("/register", json={
+            "file_name": file_name,
+            "file_hash": file_hash,
+            "public_key": vault.public_key_pem,
+            "signature": vault.sign(f"{file_name}|{file_hash}|{timestamp}"),
+            "timestamp": timestamp
+        })
+        res.raise_for_status()
+
+    hits = iter(range(10 ** 9))
+    yield "api_register", measure(register, args.repeat, memory=False)
+    yield "api_verify_hit", measure(
+        lambda: client.post("/verify", json={"file_hash": vault.hashes[next(hits) % vault.size]}).raise_for_status(),
+        args.repeat, memory=False
+    )
+    yield "api_verify_miss", measure(
+        lambda: client.post("/verify", json={"file_hash": "0" * 64}).raise_for_status(),
+        args.repeat, memory=False
+    )
+
+
+BENCHMARKS = {
+    "merkle": bench_merkle,
+    "proof": bench_proof,
+    "chain": bench_chain,
+    "signature": bench_signature,
+    "api": bench_api,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path: str, threshold: float) -> bool:
+    """Prints p50 changes against an earlier run; returns False if anything regressed beyond threshold."""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+
+    ok = True
+    for r in results:
+        old = baseline.get((r["name"], r["size"]))
+        if old is None:
+            continue
+        change = r["p50_s"] / old["p50_s"] - 1 if old["p50_s"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{r['name']:<28} n={r['size']:<9} p50 {old['p50_s'] * 1e3:9.3f} -> {r['p50_s'] * 1e3:9.3f} ms ({change:+.1%}){flag}")
+    return ok
+
+
+def parse_sizes(text: str):
+    return [int(float(s)) for s in text.split(",") if s.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the vault's hot paths.")
+    parser.add_argument("--sizes", default="1e3,1e4", help="Comma separated vault sizes, e.g. 1e3,1e5,1e7.")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Subset of: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--storage", choices=("sqlite", "ledger"), default="sqlite", help="Chain storage backend.")
+    parser.add_argument("--repeat", type=int, default=200, help="Samples for the per-request benchmarks.")
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="Earlier JSON output to compare p50 latencies with.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative p50 slowdown counted as a regression.")
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="vault-bench-") as directory:
+        # Must be set before backend.database is imported
+        os.environ.setdefault("VAULT_DB_PATH", os.path.join(directory, "vault.db"))
+        for size in parse_sizes(args.sizes):
+            start = time.perf_counter()
+            vault = Vault(directory, size, args.storage)
+            print(f"# vault of {size} records filled in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+            for name in selected:
+                for bench_name, result in BENCHMARKS[name](vault, args):
+                    result = {"name": bench_name, "size": size, **result}
+                    results.append(result)
+                    print(
+                        f"{bench_name:<28} n={size:<9} p50 {result['p50_s'] * 1e3:9.3f} ms  "
+                        f"p99 {result['p99_s'] * 1e3:9.3f} ms  {result['ops_per_s'] or 0:10.1f} ops/s",
+                        file=sys.stderr
+                    )
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": parse_sizes(args.sizes),
+            "storage": args.storage
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        return 0 if compare(results, args.compare, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
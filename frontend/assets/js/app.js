@@ -269,7 +269,13 @@ function renderLiveHashChain(records) {
 // ==========================================
 // SHA-256 Hashing (Browser Native - SubtleCrypto)
 // ==========================================
+// Larger files are streamed to the server and hashed there (no full copy in browser memory)
+const SERVER_HASH_THRESHOLD = 256 * 1024 * 1024;
+
 async function calculateFileHash(file) {
+    if (file.size >= SERVER_HASH_THRESHOLD) {
+        return await hashFileOnServer(file);
+    }
     logToConsole(`Hashing file: ${file.name}...`, "system");
     const arrayBuffer = await file.arrayBuffer();
     const hashBuffer = await crypto.subtle.digest('SHA-256', arrayBuffer);
@@ -278,6 +284,20 @@ async function calculateFileHash(file) {
     return hashHex;
 }
 
+async function hashFileOnServer(file) {
+    logToConsole(`Streaming ${file.name} to the vault for hashing...`, "system");
+    const response = await fetch(`${API_BASE_URL}/upload`, {
+        method: "POST",
+        headers: { "Content-Type": "application/octet-stream" },
+        body: file
+    });
+    if (!response.ok) {
+        throw new Error("Server-side hashing failed");
+    }
+    const result = await response.json();
+    return result.file_hash;
+}
+
 // ==========================================
 // UPLOAD PAGE LOGIC (MANUAL FLOW)
 // ==========================================
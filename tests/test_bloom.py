@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from backend.bloom import BloomFilter, RecordFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives_and_bounded_fp_rate(self):
+        """Eklenen her anahtar bulunmalı; yanlış pozitif oranı hedefe yakın kalmalı."""
+        bloom = BloomFilter(capacity=5000, fp_rate=0.01)
+        keys = [f"kayit-{i}".encode() for i in range(5000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+
+        false_positives = sum(f"yok-{i}".encode() in bloom for i in range(20000))
+        self.assertLess(false_positives / 20000, 0.02)
+        self.assertAlmostEqual(bloom.estimated_fp_rate(), 0.01, delta=0.005)
+
+    def test_duplicate_adds_are_not_counted(self):
+        bloom = BloomFilter(capacity=10, fp_rate=0.01)
+        self.assertTrue(bloom.add(b"a"))
+        self.assertFalse(bloom.add(b"a"))
+        self.assertEqual(bloom.count, 1)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            BloomFilter(capacity=10, fp_rate=1.5)
+
+
+
+class TestRecordFilterSync(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "vault.db")
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("CREATE TABLE records (id INTEGER PRIMARY KEY, file_hash TEXT)")
+            conn.execute("INSERT INTO records (file_hash) VALUES ('var')")
+        self.version_checks = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+
+        def trace(statement):
+            if "data_version" in statement:
+                self.version_checks += 1
+        conn.set_trace_callback(trace)
+        return conn
+
+    def make_filter(self, sync_interval=0.0):
+        record_filter = RecordFilter(self.connect, 100, 0.01, sync_interval)
+        record_filter.rebuild()
+        self.addCleanup(record_filter.close)
+        self.version_checks = 0
+        return record_filter
+
+    def insert_elsewhere(self, file_hash):
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("INSERT INTO records (file_hash) VALUES (?)", (file_hash,))
+
+    def test_only_misses_check_for_other_commits(self):
+        """Bulunan hash için PRAGMA sorgusu çalışmamalı; başka bağlantının eklediği hash kaçırılmamalı."""
+        record_filter = self.make_filter()
+        for _ in range(5):
+            self.assertTrue(record_filter.might_contain("var"))
+        self.assertEqual(self.version_checks, 0)
+
+        self.assertFalse(record_filter.might_contain("yok"))
+        self.assertEqual(self.version_checks, 1)
+
+        self.insert_elsewhere("yeni")
+        self.assertTrue(record_filter.might_contain("yeni"))
+
+    def test_sync_interval_limits_checks(self):
+        record_filter = self.make_filter(sync_interval=60)
+        for i in range(5):
+            self.assertFalse(record_filter.might_contain(f"yok-{i}"))
+        self.assertEqual(self.version_checks, 0)
+        self.assertEqual(record_filter.counters["negatives"], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import unittest
+from unittest import mock
+
+from backend import database
+from backend.writer import ChainWriter, WriteJob, WriterSaturated
+from tests.vault_case import TempVaultTestCase
+
+
+class TestChainWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.groups = []
+        self.first_started = threading.Event()
+        self.release_first = threading.Event()
+
+    def commit_group(self, jobs):
+        """Sahte veritabanı: ilk grup serbest bırakılana kadar bekler."""
+        if not self.groups and not self.first_started.is_set():
+            self.first_started.set()
+            self.release_first.wait(2)
+        self.groups.append([job.entries[0][1] for job in jobs])
+        if any(job.entries[0][1] == "bad" for job in jobs):
+            raise ValueError("bad entry")
+        return [{"records": job.entries} for job in jobs]
+
+    def test_pending_jobs_are_group_committed(self):
+        """Yazıcı meşgulken biriken kayıtlar TEK işlemde (group commit) yazılmalı."""
+        writer = ChainWriter(self.commit_group)
+        first = writer.submit([("a", "h0")], "key", "ts")
+        self.assertTrue(self.first_started.wait(2))
+        waiting = [writer.submit([("a", f"h{i}")], "key", "ts") for i in range(1, 6)]
+        self.release_first.set()
+
+        self.assertEqual(first.result(2)["records"], [("a", "h0")])
+        for i, future in enumerate(waiting, start=1):
+            self.assertEqual(future.result(2)["records"], [("a", f"h{i}")])
+
+        self.assertEqual(self.groups, [["h0"], ["h1", "h2", "h3", "h4", "h5"]])
+        writer.stop()
+
+    def test_failing_job_does_not_fail_its_group(self):
+        writer = ChainWriter(self.commit_group)
+        first = writer.submit([("a", "h0")], "key", "ts")
+        self.assertTrue(self.first_started.wait(2))
+        good = writer.submit([("a", "h1")], "key", "ts")
+        bad = writer.submit([("a", "bad")], "key", "ts")
+        self.release_first.set()
+
+        first.result(2)
+        self.assertEqual(good.result(2)["records"], [("a", "h1")])
+        with self.assertRaises(ValueError):
+            bad.result(2)
+        writer.stop()
+
+    def test_backpressure_and_cancelled_jobs(self):
+        """Kuyruk doluyken yeni iş reddedilmeli; iptal edilen iş hiç yazılmamalı."""
+        writer = ChainWriter(self.commit_group, max_pending=2)
+        first = writer.submit([("a", "h0")], "key", "ts")
+        self.assertTrue(self.first_started.wait(2))
+        cancelled = writer.submit([("a", "h1")], "key", "ts")
+        kept = writer.submit([("a", "h2")], "key", "ts")
+        with self.assertRaises(WriterSaturated):
+            writer.submit([("a", "h3")], "key", "ts")
+
+        self.assertTrue(cancelled.cancel())
+        self.release_first.set()
+
+        first.result(2)
+        kept.result(2)
+        self.assertEqual(self.groups, [["h0"], ["h2"]])
+        self.assertEqual(writer.stats["rejected"], 1)
+        writer.stop()
+
+
+
+class TestGroupCommitFailures(TempVaultTestCase):
+    """Gerçek veritabanıyla: commit'ten SONRA oluşan hata grubu yeniden yazdırmamalı."""
+
+    def test_failure_after_commit_is_not_replayed(self):
+        hashes = [hashlib.sha256(f"f{i}".encode()).hexdigest() for i in range(2)]
+        jobs = [WriteJob([(f"f{i}", h)], "KEY", "ts", with_proofs=True) for i, h in enumerate(hashes)]
+        for job in jobs:
+            job.future.set_running_or_notify_cancel()
+
+        with mock.patch.object(database, "_after_commit", side_effect=RuntimeError("after commit")):
+            database._writer._apply(jobs)
+
+        results = [job.future.result(2) for job in jobs]
+        self.assertEqual([r["records"][0]["file_hash"] for r in results], hashes)
+        self.assertEqual([r["file_hash"] for r in database.get_records()], hashes)
+        self.assertIsNotNone(results[1]["proofs"][0])
+        # Önbellek düşürüldü: sonraki kayıt zinciri veritabanından okuyup doğru devam etmeli
+        database.insert_record("f2", hashlib.sha256(b"f2").hexdigest(), "KEY", "ts")
+        self.assertEqual(database.get_merkle_root()[0], 3)
+        self.assertTrue(database.verify_chain(full=True)[0])
+
+    def test_failure_before_commit_is_retried_per_job(self):
+        good = hashlib.sha256(b"good").hexdigest()
+        jobs = [WriteJob([("good", good)], "KEY", "ts"), WriteJob([("bad", None)], "KEY", "ts")]
+        for job in jobs:
+            job.future.set_running_or_notify_cancel()
+
+        with mock.patch.object(database, "hash_key", side_effect=lambda h: h.encode()):
+            database._writer._apply(jobs)
+
+        self.assertEqual(jobs[0].future.result(2)["records"][0]["file_hash"], good)
+        self.assertIsNotNone(jobs[1].future.exception(2))
+        self.assertEqual([r["file_hash"] for r in database.get_records()], [good])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import random
+import tempfile
+import unittest
+
+from CryptoModule.chunking import (
+    MODES, ChunkManifest, ChunkStream, build_manifest, verify_chunk_data, verify_chunks
+)
+from CryptoModule.security_engine import SecurityVaultManager
+
+CHUNK = 64 * 1024
+
+
+class TestChunking(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "buyuk.bin")
+        # Tekrarlanabilir içerik: sınırlar her çalıştırmada aynı olmalı
+        self.data = random.Random(7).randbytes(1_500_000)
+        self.write(self.data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_manifest_covers_the_file(self):
+        """Parçalar dosyayı boşluksuz kapsamalı; kök parça hashlerinin Merkle kökü olmalı."""
+        for mode in MODES:
+            manifest = build_manifest(self.path, mode, CHUNK)
+            self.assertEqual(manifest.size, len(self.data))
+            offset = 0
+            for chunk in manifest.chunks:
+                self.assertEqual(chunk.offset, offset)
+                offset += chunk.length
+            self.assertEqual(offset, len(self.data))
+            self.assertEqual(manifest.root, SecurityVaultManager.build_merkle_root([c.hash for c in manifest.chunks]))
+            if mode == "fixed":
+                self.assertTrue(all(c.length == CHUNK for c in manifest.chunks[:-1]))
+            # Tek iş parçacığı ile de aynı sonuç
+            self.assertEqual(build_manifest(self.path, mode, CHUNK, max_workers=0), manifest)
+
+    def test_stream_matches_file_manifest(self):
+        """Akış halinde (farklı parça boyutlarıyla) gelen veri, dosyadan kurulan manifestin aynısını vermeli."""
+        for mode in MODES:
+            expected = build_manifest(self.path, mode, CHUNK)
+            for step in (1000, 65536, 400000):
+                stream = ChunkStream(mode, CHUNK)
+                for i in range(0, len(self.data), step):
+                    stream.update(self.data[i:i + step])
+                self.assertEqual(stream.finish(), expected, (mode, step))
+
+    def test_corruption_is_localised(self):
+        """Tek bir bayt değişince yalnızca onu içeren parça bozuk raporlanmalı."""
+        for mode in MODES:
+            self.write(self.data)
+            manifest = build_manifest(self.path, mode, CHUNK)
+            self.assertTrue(verify_chunks(self.path, manifest).ok)
+
+            corrupted = bytearray(self.data)
+            corrupted[900_000] ^= 0xFF
+            self.write(corrupted)
+            expected = list(manifest.chunks_in_range(900_000, 900_001))
+            self.assertEqual(len(expected), 1)
+
+            check = verify_chunks(self.path, manifest)
+            self.assertFalse(check.ok)
+            self.assertEqual(check.bad_chunks, expected)
+
+            # Aralıklı doğrulama: yalnızca aralıktaki parçalar yeniden okunur
+            check = verify_chunks(self.path, manifest, 0, 300_000)
+            self.assertTrue(check.ok)
+            self.assertEqual(check.checked, len(manifest.chunks_in_range(0, 300_000)))
+
+            # Kesilmiş dosya: eksik baytları içeren parçalar bozuk sayılmalı
+            self.write(self.data[:1_000_000])
+            check = verify_chunks(self.path, manifest)
+            self.assertFalse(check.size_ok)
+            self.assertEqual(check.bad_chunks, list(manifest.chunks_in_range(999_999, len(self.data))))
+
+    def test_content_defined_chunks_survive_insertion(self):
+        """İçerik tanımlı parçalamada araya eklenen baytlar yalnızca komşu parçaları değiştirmeli."""
+        before = build_manifest(self.path, "cdc", CHUNK)
+        self.write(self.data[:500_000] + b"eklenen veri" + self.data[500_000:])
+        after = build_manifest(self.path, "cdc", CHUNK)
+        shared = {c.hash for c in before.chunks} & {c.hash for c in after.chunks}
+        self.assertGreaterEqual(len(shared), len(before.chunks) - 2)
+
+    def test_single_chunk_proof(self):
+        """Tek parça, parça kanıtıyla kök üzerinden doğrulanabilmeli."""
+        manifest = build_manifest(self.path, "fixed", CHUNK)
+        for index, chunk in enumerate(manifest.chunks):
+            data = self.data[chunk.offset:chunk.offset + chunk.length]
+            proof = manifest.proof(index)
+            self.assertTrue(verify_chunk_data(data, proof, manifest.root))
+            self.assertFalse(verify_chunk_data(data[:-1], proof, manifest.root))
+
+    def test_pack_round_trip(self):
+        for mode in MODES:
+            manifest = build_manifest(self.path, mode, CHUNK)
+            hashes, lengths = manifest.pack()
+            self.assertEqual(len(hashes), 32 * len(manifest.chunks))
+            self.assertEqual(ChunkManifest.unpack(mode, CHUNK, manifest.root, hashes, lengths), manifest)
+
+    def test_empty_file(self):
+        self.write(b"")
+        for mode in MODES:
+            manifest = build_manifest(self.path, mode, CHUNK)
+            self.assertEqual((manifest.size, manifest.chunks, manifest.root), (0, (), ""))
+            self.assertEqual(ChunkStream(mode, CHUNK).finish(), manifest)
+            self.assertTrue(verify_chunks(self.path, manifest).ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
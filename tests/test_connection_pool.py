@@ -0,0 +1,81 @@
+import threading
+import unittest
+
+from backend.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """sqlite3.Connection yerine geçen minimal nesne."""
+
+    def __init__(self):
+        self.in_transaction = False
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+
+        def factory():
+            conn = FakeConnection()
+            self.created.append(conn)
+            return conn
+
+        self.pool = ConnectionPool(factory, max_size=2, timeout=0.2)
+
+    def test_connections_are_reused(self):
+        """Aynı bağlantı tekrar tekrar kullanılmalı (her istekte yeni connect yok)."""
+        for _ in range(5):
+            with self.pool.connection():
+                pass
+
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(self.pool.snapshot()["reused"], 4)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        with self.pool.connection() as conn:
+            conn.in_transaction = True
+
+        self.assertEqual(conn.rollbacks, 1)
+
+    def test_pool_is_bounded(self):
+        """Havuz dolduğunda bekler, süre dolunca PoolTimeout fırlatır."""
+        a = self.pool.acquire()
+        b = self.pool.acquire()
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.acquire()
+
+        # Başka bir thread bağlantı bırakınca bekleyen taraf devam edebilmeli
+        threading.Timer(0.05, self.pool.release, args=(a,)).start()
+        c = self.pool.acquire()
+        self.assertIs(c, a)
+
+        self.pool.release(b)
+        self.pool.release(c)
+
+    def test_reset_closes_idle_and_in_use_connections(self):
+        busy = self.pool.acquire()
+        with self.pool.connection() as idle:
+            pass
+
+        self.pool.reset()
+        self.assertTrue(idle.closed)
+        self.assertFalse(busy.closed)
+
+        self.pool.release(busy)
+        self.assertTrue(busy.closed)
+        self.assertEqual(self.pool.snapshot()["open"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.executors import BoundedExecutor, ExecutorSaturated
+
+
+class TestBoundedExecutor(unittest.TestCase):
+
+    def test_rejects_when_saturated(self):
+        """max_pending dolunca yeni iş beklemeden reddedilmeli (429 için)."""
+        gate = threading.Event()
+        executor = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=1), max_pending=2, name="test")
+
+        async def scenario():
+            running = [asyncio.ensure_future(executor.run(gate.wait, 2)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with self.assertRaises(ExecutorSaturated):
+                await executor.run(gate.wait, 2)
+            gate.set()
+            await asyncio.gather(*running)
+            # Kapasite geri gelmeli
+            return await executor.run(sum, [1, 2, 3])
+
+        self.assertEqual(asyncio.run(scenario()), 6)
+        stats = executor.snapshot()
+        self.assertEqual((stats["pending"], stats["submitted"], stats["rejected"]), (0, 3, 1))
+        executor.shutdown()
+
+    def test_saturated_api_returns_429(self):
+        """Kripto havuzu doluyken /register 429 ve Retry-After döndürmeli."""
+        saturated = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=1), max_pending=0, name="crypto")
+        original = main.crypto_executor
+        main.crypto_executor = saturated
+        try:
+            res = TestClient(main.app).post("/register", json={
+                "file_name": "a.txt",
+                "file_hash": "hash_a",
+                "public_key": "key",
+                "signature": "sig",
+                "timestamp": main.datetime.now(main.timezone.utc).isoformat()
+            })
+        finally:
+            main.crypto_executor = original
+
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(res.headers["retry-after"], "1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from CryptoModule import hash_cache
+from CryptoModule.hash_cache import HashCache
+from CryptoModule.hash_util import Hasher
+
+
+class TestHashCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.root)
+        self.cache = HashCache(os.path.join(self.tmp.name, "cache.db"), max_entries=100)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def write(self, name, data, age=60):
+        """Dosyayı yazar ve mtime'ı geçmişe çeker (yeni dosyalar önbelleğe alınmaz)."""
+        path = os.path.join(self.root, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        past = time.time() - age
+        os.utime(path, (past, past))
+        return path
+
+    def test_unchanged_files_are_not_rehashed(self):
+        """İkinci taramada değişmeyen dosyalar okunmadan önbellekten gelmeli."""
+        paths = [self.write(f"f{i}.bin", os.urandom(100 + i)) for i in range(5)]
+        first = {r.path: r.digest for r in Hasher.hash_tree(self.root, cache=self.cache)}
+
+        with mock.patch("CryptoModule.hash_util.open", side_effect=AssertionError("okundu")):
+            second = {r.path: r.digest for r in Hasher.hash_tree(self.root, cache=self.cache)}
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.cache.stats["hits"], 5)
+        self.assertEqual(len(self.cache), 5)
+
+        # Değişen dosya (boyut/mtime farklı) yeniden hashlenmeli
+        self.write("f0.bin", b"yeni icerik", age=30)
+        self.assertEqual(Hasher.get_file_hash(paths[0], cache=self.cache),
+                         hashlib.sha256(b"yeni icerik").hexdigest())
+
+    def test_paranoid_mode_ignores_cache(self):
+        path = self.write("a.bin", b"asil")
+        Hasher.get_file_hash(path, cache=self.cache)
+
+        # Önbellekteki değer bozulsa bile paranoid mod dosyayı yeniden okur
+        self.cache.flush()
+        self.cache._conn.execute("UPDATE file_hashes SET digest = 'bozuk'")
+        self.cache._conn.commit()
+        self.assertEqual(Hasher.get_file_hash(path, cache=self.cache), "bozuk")
+        self.assertEqual(Hasher.get_file_hash(path, cache=self.cache, paranoid=True),
+                         hashlib.sha256(b"asil").hexdigest())
+        self.assertEqual(Hasher.get_file_hash(path, cache=self.cache),
+                         hashlib.sha256(b"asil").hexdigest())
+
+    def test_recently_modified_files_are_not_cached(self):
+        path = self.write("taze.bin", b"yeni", age=0)
+        Hasher.get_file_hash(path, cache=self.cache)
+        self.assertEqual(self.cache.stats["skipped"], 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        """max_entries aşılınca en uzun süre kullanılmayan kayıtlar silinmeli."""
+        with mock.patch.object(hash_cache, "FLUSH_EVERY", 1):
+            self.cache.max_entries = 10
+            for i in range(15):
+                Hasher.get_file_hash(self.write(f"e{i}.bin", bytes([i])), cache=self.cache)
+
+        self.assertLessEqual(len(self.cache), 10)
+        self.assertGreater(self.cache.stats["evictions"], 0)
+
+        # Yaşa göre temizlik: gelecekteki bir sınır tüm kayıtları siler
+        remaining = len(self.cache)
+        self.assertEqual(self.cache.evict_older_than(-5), remaining)
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
 import os
 import hashlib
+import tempfile
+from unittest import mock
+from CryptoModule import hash_util
 from CryptoModule.hash_util import Hasher
 
 class TestHasher(unittest.TestCase):
@@ -35,6 +38,45 @@ class TestHasher(unittest.TestCase):
             # Test bitince dosyayı temizle
             if os.path.exists(filename):
                 os.remove(filename)
+    def test_missing_file_raises(self):
+        """Olmayan dosya için hata metni döndürmek yerine exception fırlatılmalı."""
+        with self.assertRaises(FileNotFoundError):
+            Hasher.get_file_hash("olmayan_dosya.bin")
+
+    def test_stream_hash_matches_hashlib(self):
+        """Parça parça gelen veri, tek seferde hashlenmiş veriyle aynı özeti ve boyutu vermeli."""
+        data = os.urandom(300000)
+        chunks = (data[i:i + 7001] for i in range(0, len(data), 7001))
+        stream = Hasher.hash_stream(chunks)
+        self.assertEqual(stream.hexdigest(), hashlib.sha256(data).hexdigest())
+        self.assertEqual(stream.size, len(data))
+        self.assertEqual(Hasher.hash_stream([]).hexdigest(), hashlib.sha256(b"").hexdigest())
+
+    def test_hash_tree_matches_hashlib(self):
+        """Paralel dizin hashleme, tek tek hashlib sonucu ile aynı olmalı (mmap yolu dahil)."""
+        with tempfile.TemporaryDirectory() as root:
+            expected = {}
+            os.makedirs(os.path.join(root, "alt", "derin"))
+            for i, rel in enumerate(["a.txt", "bos.txt", "alt/b.bin", "alt/derin/c.bin"]):
+                data = os.urandom(i * 5000)
+                path = os.path.join(root, rel)
+                with open(path, "wb") as f:
+                    f.write(data)
+                expected[path] = hashlib.sha256(data).hexdigest()
+            missing = os.path.join(root, "yok.txt")
+
+            # Küçük tampon ve eşik: readinto döngüsü ve mmap yolu birlikte denenir
+            with mock.patch.object(hash_util, "CHUNK_SIZE", 1024), \
+                    mock.patch.object(hash_util, "MMAP_THRESHOLD", 8000):
+                results = list(Hasher.hash_tree(root, max_workers=3))
+                ordered = list(Hasher.hash_many(sorted(expected) + [missing], max_workers=2, ordered=True))
+
+            self.assertEqual({r.path: r.digest for r in results}, expected)
+            self.assertEqual([r.path for r in ordered], sorted(expected) + [missing])
+            self.assertEqual([r.digest for r in ordered[:-1]], [expected[p] for p in sorted(expected)])
+            self.assertIsNone(ordered[-1].digest)
+            self.assertIsInstance(ordered[-1].error, FileNotFoundError)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
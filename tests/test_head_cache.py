@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import unittest
+
+from backend import database
+from CryptoModule.security_engine import SecurityVaultManager
+from tests.vault_case import TempVaultTestCase, sha
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestChainHeadCache(TempVaultTestCase):
+
+    def append(self, hashes):
+        return database.insert_records_batch([(f"f-{h[:6]}", h) for h in hashes], "KEY", "ts")
+
+    def test_registrations_reuse_the_cached_head(self):
+        """Ardışık kayıtlarda zincir başı yeniden okunmamalı (önbellek isabeti)."""
+        hashes = [sha(i) for i in range(6)]
+        self.append(hashes[:2])
+        before = database.get_head_cache_stats()
+        for h in hashes[2:]:
+            self.append([h])
+        after = database.get_head_cache_stats()
+        self.assertEqual(after["misses"], before["misses"])
+        self.assertEqual(after["hits"] - before["hits"], 4)
+
+        self.assertEqual(database.get_merkle_root(), (6, SecurityVaultManager.build_merkle_root(hashes)))
+        last = database.get_last_record()
+        self.assertEqual((last["id"], last["file_hash"]), (6, hashes[-1]))
+        self.assertTrue(database.verify_chain(full=True, deep=True)[0])
+
+    def test_appends_by_another_process_invalidate_the_head(self):
+        """Başka bir süreç zinciri uzatınca önbellek kullanılmamalı; yeni kayıt onun başına bağlanmalı."""
+        hashes = [sha(i) for i in range(7)]
+        self.append(hashes[:3])
+        database.get_merkle_root()   # önbellek dolu
+
+        script = textwrap.dedent(f"""
+            from backend import database
+            database.insert_records_batch([("dis", h) for h in {hashes[3:5]!r}], "OTHER", "ts")
+        """)
+        env = dict(os.environ, VAULT_DB_PATH=database.DB_PATH, VAULT_BLOOM_ENABLED="0",
+                   VAULT_LOG_PATH=os.path.join(self.tmp.name, "audit.log"))
+        subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True, timeout=60)
+
+        misses = database.get_head_cache_stats()["misses"]
+        self.assertEqual(database.get_merkle_root(), (5, SecurityVaultManager.build_merkle_root(hashes[:5])))
+        self.assertEqual(database.get_head_cache_stats()["misses"], misses + 1)
+
+        result = self.append(hashes[5:])
+        self.assertEqual(result["records"][0]["prev_hash"], hashes[4])
+        self.assertEqual(result["records"][0]["leaf_index"], 5)
+        self.assertEqual(result["merkle_root"], SecurityVaultManager.build_merkle_root(hashes))
+        self.assertTrue(database.verify_chain(full=True, deep=True)[0])
+
+    def test_failed_group_leaves_the_head_unchanged(self):
+        """Geri alınan bir grup, önbellekteki başı değiştirmemeli."""
+        self.append([sha(0)])
+        with self.assertRaises(Exception):
+            # Anahtar tablosuna None yazılamaz: işlem geri alınır
+            database.insert_records_batch([("x", sha(1))], None, "ts")
+        result = self.append([sha(2)])
+        self.assertEqual(result["records"][0]["prev_hash"], sha(0))
+        self.assertEqual(result["records"][0]["leaf_index"], 1)
+
+
+    def test_row_inserted_outside_the_writer(self):
+        """Nesli artırmadan SQL ile eklenen satır kaydı kilitlememeli; yeni kayıt ona bağlanmalı."""
+        self.append([sha(0), sha(1)])
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute(
+            "INSERT INTO records (file_name, file_hash, prev_hash, timestamp) VALUES (?, ?, ?, ?)",
+            ("elle", sha(2), sha(1), "ts")
+        )
+        conn.commit()
+        conn.close()
+
+        for i in (3, 4):
+            record = database.insert_record(f"f{i}", sha(i), "KEY", "ts")
+            self.assertEqual((record["id"], record["prev_hash"]), (i + 1, sha(i - 1)))
+        self.assertEqual([r["id"] for r in database.get_records()], [1, 2, 3, 4, 5])
+        self.assertTrue(database.verify_chain(full=True)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,7 @@ from fastapi.testclient import TestClient
 
 # Proje Modülleri
 from backend.main import app
-from backend.database import init_db, DB_PATH, get_records
+from backend.database import init_db, DB_PATH, get_records, get_merkle_root
 from CryptoModule.security_engine import SecurityVaultManager
 from CryptoModule.chain_validator import ChainValidator
 
@@ -155,6 +155,632 @@ class TestSystemIntegration(unittest.TestCase):
         self.assertNotEqual(root1, root2, "Merkle Root değişmeli")
         self.assertEqual(prev_hash2, "hash_A", "Zincir doğru bağlanmalı")
 
+    def test_global_merkle_root_covers_whole_vault(self):
+        """Her kayıtta saklanan merkle_root, o ana kadarki TÜM kasanın kökü olmalı."""
+        for i in range(5):
+            self.register_file_helper(f"f{i}", f"hash_{i}")
+
+        conn = sqlite3.connect(DB_PATH)
+        rows = conn.execute("SELECT file_hash, merkle_root FROM records ORDER BY id").fetchall()
+        conn.close()
+
+        hashes = []
+        for file_hash, merkle_root in rows:
+            hashes.append(file_hash)
+            self.assertEqual(merkle_root, SecurityVaultManager.build_merkle_root(hashes))
+
+        size, root = get_merkle_root()
+        self.assertEqual(size, 5)
+        self.assertEqual(root, rows[-1][1])
+
+    def test_proof_endpoint(self):
+        """/proof/{hash} tarafından dönen kanıt güncel kasa köküne ulaşmalı."""
+        hashes = [f"hash_{i}" for i in range(7)]
+        for i, h in enumerate(hashes):
+            self.register_file_helper(f"f{i}", h)
+
+        root = SecurityVaultManager.build_merkle_root(hashes)
+        for i, h in enumerate(hashes):
+            res = self.client.get(f"/proof/{h}")
+            self.assertEqual(res.status_code, 200)
+            body = res.json()
+            self.assertEqual(body["leaf_index"], i)
+            self.assertEqual(body["tree_size"], len(hashes))
+            self.assertEqual(body["merkle_root"], root)
+            self.assertTrue(SecurityVaultManager.verify_merkle_proof(h, body["proof"], root))
+
+        self.assertEqual(self.client.get("/proof/unknown_hash").status_code, 404)
+
+    def test_verify_batch(self):
+        """/verify/batch: JSON liste ve NDJSON girdi, sıralı sonuçlar ve ortak köke giden kanıtlar."""
+        hashes = [hashlib.sha256(f"dosya{i}".encode()).hexdigest() for i in range(5)] + ["hash_metin"]
+        for i, h in enumerate(hashes):
+            self.register_file_helper(f"f{i}", h)
+        root = SecurityVaultManager.build_merkle_root(hashes)
+
+        asked = [hashes[3], "olmayan", hashes[0], hashes[5], hashes[0].upper()]
+        res = self.client.post("/verify/batch", params={"include_proofs": "true"}, json=asked)
+        self.assertEqual(res.status_code, 200)
+        lines = [json.loads(line) for line in res.text.splitlines()]
+
+        results, summary = lines[:-1], lines[-1]
+        self.assertEqual([r["file_hash"] for r in results], asked)
+        self.assertEqual([r["verified"] for r in results], [True, False, True, True, False])
+        self.assertEqual(summary, {"type": "summary", "count": 5, "verified": 3,
+                                   "tree_size": 6, "merkle_root": root})
+        for r in results:
+            if r["verified"]:
+                self.assertEqual(r["record"]["file_hash"], r["file_hash"])
+                self.assertTrue(SecurityVaultManager.verify_merkle_proof(r["file_hash"], r["proof"], root))
+
+        # NDJSON: satır başına hash ya da {"file_hash": ...}
+        body = "\n".join([json.dumps(hashes[1]), json.dumps({"file_hash": "yok"}), ""])
+        res = self.client.post("/verify/batch", content=body, headers={"Content-Type": "application/x-ndjson"})
+        lines = [json.loads(line) for line in res.text.splitlines()]
+        self.assertEqual([(l["file_hash"], l["verified"]) for l in lines[:-1]], [(hashes[1], True), ("yok", False)])
+        self.assertNotIn("proof", lines[0])
+
+        self.assertEqual(self.client.post("/verify/batch", json=[]).status_code, 422)
+
+    def test_metrics_endpoint(self):
+        """/metrics uç nokta sayaçlarını, kayıt aşama sürelerini ve havuz istatistiklerini vermeli."""
+        self.register_file_helper("m.txt", "hash_m")
+        self.client.get("/proof/hash_m")
+
+        res = self.client.get("/metrics")
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.headers["content-type"].startswith("text/plain"))
+        body = res.text
+
+        self.assertRegex(body, r'vault_http_requests_total\{method="POST",endpoint="/register",status="200"\} \d+')
+        # Somut yol değil, route şablonu etiketlenir
+        self.assertIn('endpoint="/proof/{file_hash}"', body)
+        for stage in ("replay_check", "signature_verify", "chain_write", "head_lookup",
+                      "merkle_build", "db_insert", "db_commit"):
+            self.assertIn(f'vault_stage_duration_seconds_count{{stage="{stage}"}}', body)
+        self.assertIn("vault_db_pool_open", body)
+        self.assertIn("vault_writer_groups", body)
+        self.assertIn("vault_bloom_estimated_fp_rate", body)
+        self.assertIn("vault_executor_crypto_pending", body)
+
+    def test_bloom_filter_short_circuits_misses(self):
+        """Kasada olmayan hash DB'ye gitmeden reddedilmeli; başka süreçten gelen kayıt da görülmeli."""
+        from backend.database import get_bloom_stats
+
+        self.register_file_helper("a.txt", "hash_a")
+        before = get_bloom_stats()["negatives"]
+
+        res = self.client.post("/verify", json={"file_hash": "hic_kaydedilmedi"})
+        self.assertFalse(res.json()["verified"])
+        self.assertEqual(get_bloom_stats()["negatives"], before + 1)
+        self.assertTrue(self.client.post("/verify", json={"file_hash": "hash_a"}).json()["verified"])
+
+        # Başka bir süreç (ayrı bağlantı) kayıt eklerse filtre data_version ile yakalamalı
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute(
+            "INSERT INTO records (file_name, file_hash, prev_hash, timestamp, file_hash_bin) VALUES (?, ?, ?, ?, ?)",
+            ("dis.txt", "hash_dis", "hash_a", "2024-01-01T00:00:00+00:00", b"hash_dis")
+        )
+        conn.commit()
+        conn.close()
+        self.assertTrue(self.client.post("/verify", json={"file_hash": "hash_dis"}).json()["verified"])
+
+        stats = get_bloom_stats()
+        self.assertEqual(stats["target_fp_rate"], 0.01)
+        self.assertGreaterEqual(stats["items"], 2)
+
+    def test_proofs_against_an_earlier_tree(self):
+        """tree_size ile sabitlenen eski ağaç için kök ve kanıtlar o anki ağaçla aynı olmalı."""
+        from backend.database import get_merkle_proofs
+
+        hashes = [f"hash_{i}" for i in range(7)]
+        for i, h in enumerate(hashes):
+            self.register_file_helper(f"f{i}", h)
+
+        for size in range(1, 8):
+            tree_size, root, proofs = get_merkle_proofs(range(7), tree_size=size)
+            self.assertEqual(tree_size, size)
+            self.assertEqual(root, SecurityVaultManager.build_merkle_root(hashes[:size]))
+            self.assertEqual(sorted(proofs), list(range(size)))
+            for leaf, proof in proofs.items():
+                self.assertTrue(SecurityVaultManager.verify_merkle_proof(hashes[leaf], proof, root))
+
+    def test_consistency_endpoint_and_signed_tree_heads(self):
+        """/consistency kanıtı doğrulanmalı; /tree-head imzası /signing-key ile doğrulanmalı."""
+        import tempfile
+        from backend import tree_heads
+        from CryptoModule.verify_util import create_tree_head_message, verify_signature
+
+        hashes = [f"hash_{i}" for i in range(11)]
+        for i, h in enumerate(hashes[:5]):
+            self.register_file_helper(f"f{i}", h)
+
+        tmp = tempfile.TemporaryDirectory()
+        saved = tree_heads.publisher.signer
+        tree_heads.publisher.signer = tree_heads.TreeHeadSigner(os.path.join(tmp.name, "key.pem"))
+        try:
+            first = self.client.get("/tree-head").json()
+            self.assertEqual(first["tree_size"], 5)
+            for i, h in enumerate(hashes[5:], 5):
+                self.register_file_helper(f"f{i}", h)
+            # Ağaç büyüdü: bir sonraki yayın yeni bir imzalı baş üretir, eski baş saklı kalır
+            tree_heads.publisher.publish()
+
+            latest = self.client.get("/tree-head").json()
+            self.assertEqual(latest["tree_size"], 11)
+            self.assertEqual(latest["merkle_root"], SecurityVaultManager.build_merkle_root(hashes))
+            self.assertEqual(self.client.get("/tree-head", params={"tree_size": 5}).json(), first)
+            self.assertEqual(self.client.get("/tree-head", params={"tree_size": 6}).status_code, 404)
+
+            public_key = self.client.get("/signing-key").json()["public_key"]
+            for head in (first, latest):
+                message = create_tree_head_message(head["tree_size"], head["merkle_root"], head["timestamp"])
+                self.assertTrue(verify_signature(public_key, message, head["signature"]))
+            forged = create_tree_head_message(11, first["merkle_root"], latest["timestamp"])
+            self.assertFalse(verify_signature(public_key, forged, latest["signature"]))
+        finally:
+            tree_heads.publisher.signer = saved
+            tmp.cleanup()
+
+        # Monitör: yeni baş eskisini kapsıyor mu?
+        response = self.client.get("/consistency", params={"from": first["tree_size"], "to": latest["tree_size"]})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["from_root"], first["merkle_root"])
+        self.assertEqual(body["to_root"], latest["merkle_root"])
+        self.assertTrue(SecurityVaultManager.verify_consistency(5, first["merkle_root"], 11, latest["merkle_root"], body["proof"]))
+
+        # `to` verilmezse güncel ağaç kullanılır
+        for m in range(1, 12):
+            body = self.client.get("/consistency", params={"from": m}).json()
+            self.assertEqual(body["to_size"], 11)
+            self.assertTrue(SecurityVaultManager.verify_consistency(
+                m, SecurityVaultManager.build_merkle_root(hashes[:m]), 11, body["to_root"], body["proof"]
+            ))
+
+        self.assertEqual(self.client.get("/consistency", params={"from": 12}).status_code, 400)
+        self.assertEqual(self.client.get("/consistency", params={"from": 6, "to": 5}).status_code, 400)
+        self.assertEqual(self.client.get("/consistency", params={"from": 0}).status_code, 422)
+
+    def test_streaming_upload(self):
+        """/upload gövdeyi sunucuda hashlemeli; imza başlıklarıyla aynı istekte kayıt yapılabilmeli."""
+        data = os.urandom(200000)
+        expected = hashlib.sha256(data).hexdigest()
+        chunks = (data[i:i + 65536] for i in range(0, len(data), 65536))
+
+        # Yalnızca hash: chunked gövde, dosya adı yok -> imzalanacak mesaj da yok
+        body = self.client.post("/upload", content=chunks).json()
+        self.assertEqual(body["file_hash"], expected)
+        self.assertEqual(body["size"], len(data))
+        self.assertIsNone(body["canonical_message"])
+        self.assertIsNone(body["record"])
+
+        # Dosya adı verilince dönen mesaj imzalanıp /register ile kaydedilebilir
+        body = self.client.post("/upload", content=data, headers={"X-File-Name": "rapor%20%C3%B6zet.pdf"}).json()
+        self.assertEqual(body["file_name"], "rapor özet.pdf")
+        self.assertEqual(body["canonical_message"], f"rapor özet.pdf|{expected}|{body['timestamp']}")
+
+        # Tek istekte hash + kayıt
+        ts = datetime.now(timezone.utc).isoformat()
+        headers = {
+            "X-File-Name": "buyuk.iso",
+            "X-Public-Key": base64.b64encode(self.public_key_pem.encode()).decode(),
+            "X-Signature": self.sign_data_canonical("buyuk.iso", expected, ts),
+            "X-Timestamp": ts
+        }
+        response = self.client.post("/upload", content=data, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        record = response.json()["record"]
+        self.assertEqual(record["file_hash"], expected)
+        self.assertTrue(self.client.post("/verify", json={"file_hash": expected}).json()["verified"])
+
+        # İmza, gerçekten alınan baytların özetini kapsamalı
+        response = self.client.post("/upload", content=data[:-1], headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+        # Eksik imza başlıkları
+        response = self.client.post("/upload", content=data, headers={"X-Signature": headers["X-Signature"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(get_records()), 1)
+
+    def test_upload_rejects_multipart_bodies(self):
+        """Multipart gövdede zarf da hashlenirdi; /upload yalnızca application/octet-stream kabul etmeli."""
+        data = os.urandom(1000)
+        response = self.client.post("/upload", files={"file": ("a.bin", data, "application/octet-stream")})
+        self.assertEqual(response.status_code, 415)
+
+        response = self.client.post("/upload", content=data, headers={"Content-Type": "text/plain"})
+        self.assertEqual(response.status_code, 415)
+
+        # Parametreli octet-stream kabul edilir ve özet dosyanın kendisine ait olur
+        response = self.client.post(
+            "/upload", content=data, headers={"Content-Type": "Application/Octet-Stream; charset=binary"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["file_hash"], hashlib.sha256(data).hexdigest())
+
+    def test_chunked_upload_manifest(self):
+        """Parçalı /upload manifesti kaydetmeli; /manifest aralık ve parça kanıtı sunmalı."""
+        from CryptoModule.chunking import build_manifest, verify_chunk_data
+
+        data = os.urandom(300000)
+        file_hash = hashlib.sha256(data).hexdigest()
+        ts = datetime.now(timezone.utc).isoformat()
+        headers = {
+            "X-File-Name": "imaj.bin",
+            "X-Public-Key": base64.b64encode(self.public_key_pem.encode()).decode(),
+            "X-Signature": self.sign_data_canonical("imaj.bin", file_hash, ts),
+            "X-Timestamp": ts
+        }
+        body = self.client.post("/upload", params={"chunking": "fixed", "chunk_size": 65536},
+                                content=data, headers=headers).json()
+        self.assertEqual(body["file_hash"], file_hash)
+        self.assertEqual(body["chunk_count"], 5)
+
+        manifest = self.client.get(f"/manifest/{file_hash}").json()
+        self.assertEqual(manifest["chunk_root"], body["chunk_root"])
+        self.assertEqual(manifest["size"], len(data))
+        self.assertEqual([c["hash"] for c in manifest["chunks"]],
+                         [hashlib.sha256(data[i:i + 65536]).hexdigest() for i in range(0, len(data), 65536)])
+
+        # Aralık: yalnızca 100000-140000 baytlarını kapsayan parçalar
+        ranged = self.client.get(f"/manifest/{file_hash}", params={"start": 100000, "end": 140000}).json()
+        self.assertEqual([c["index"] for c in ranged["chunks"]], [1, 2])
+
+        proof = self.client.get(f"/manifest/{file_hash}/chunks/3/proof").json()
+        chunk = proof["chunk"]
+        self.assertTrue(verify_chunk_data(data[chunk["offset"]:chunk["offset"] + chunk["length"]],
+                                          proof["proof"], manifest["chunk_root"]))
+        self.assertEqual(self.client.get(f"/manifest/{file_hash}/chunks/5/proof").status_code, 404)
+
+        # İstemci yerel dosyadan aynı manifesti kurabilmeli
+        path = os.path.join(os.path.dirname(DB_PATH), "chunk_test.bin")
+        try:
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(build_manifest(path, "fixed", 65536).root, manifest["chunk_root"])
+        finally:
+            os.remove(path)
+
+        # Kaydedilmeyen yüklemelerin manifesti saklanmaz
+        other = self.client.post("/upload", params={"chunking": "cdc", "chunk_size": 65536}, content=data[::-1]).json()
+        self.assertIsNotNone(other["chunk_root"])
+        self.assertEqual(self.client.get(f"/manifest/{other['file_hash']}").status_code, 404)
+        self.assertEqual(self.client.post("/upload", params={"chunking": "rabin"}, content=b"x").status_code, 422)
+
+        # cdc parçaları ortalamanın 4 katına kadar bellekte tutulur: büyük chunk_size reddedilmeli
+        from backend.main import MAX_UPLOAD_CHUNK_SIZE
+        response = self.client.post("/upload", params={"chunking": "cdc", "chunk_size": MAX_UPLOAD_CHUNK_SIZE + 1},
+                                    content=b"x")
+        self.assertEqual(response.status_code, 422)
+
+    def test_audit_pagination_and_stream(self):
+        """Sayfalı /audit ve NDJSON stream modu zinciri doğru doğrulamalı."""
+        for i in range(5):
+            self.register_file_helper(f"f{i}", f"hash_{i}")
+
+        # Sayfalama: 2'şer kayıt, cursor ile ilerle
+        ids = []
+        after_id = 0
+        while True:
+            page = self.client.get("/audit", params={"after_id": after_id, "limit": 2}).json()
+            self.assertTrue(page["chain_valid"])
+            ids.extend(r["id"] for r in page["records"])
+            if page["next_after_id"] is None:
+                break
+            after_id = page["next_after_id"]
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+
+        # SALDIRI: 3. kaydın hash'i değişirse 4. kayıt kopuk görünmeli
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("UPDATE records SET file_hash = 'HACKED' WHERE id = 3")
+        conn.commit()
+        conn.close()
+
+        # Sayfa sınırındaki kopukluk da yakalanmalı (önceki sayfanın son kaydı)
+        page = self.client.get("/audit", params={"after_id": 3, "limit": 2}).json()
+        self.assertFalse(page["chain_valid"])
+        self.assertEqual(page["broken_record_ids"], [4])
+
+        res = self.client.get("/audit", params={"stream": "true"})
+        self.assertEqual(res.status_code, 200)
+        lines = [json.loads(line) for line in res.text.splitlines()]
+        self.assertEqual(len(lines), 6)
+        summary = lines[-1]
+        self.assertEqual(summary["type"], "summary")
+        self.assertFalse(summary["chain_valid"])
+        self.assertEqual(summary["broken_record_ids"], [4])
+        self.assertEqual(summary["count"], 5)
+
+    def test_incremental_audit_with_checkpoints(self):
+        """/audit sadece son checkpoint'ten sonra eklenen kayıtları doğrulamalı."""
+        for i in range(3):
+            self.register_file_helper(f"f{i}", f"hash_{i}")
+
+        first = self.client.get("/audit", params={"include_records": "false"}).json()
+        self.assertTrue(first["chain_valid"])
+        self.assertEqual(first["audited_records"], 3)
+
+        self.register_file_helper("f3", "hash_3")
+        second = self.client.get("/audit", params={"include_records": "false"}).json()
+        self.assertTrue(second["chain_valid"])
+        self.assertEqual(second["audited_records"], 1)
+
+        # SALDIRI: checkpoint gerisindeki kaydın adı değişti, bağlantılar sağlam
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("UPDATE records SET file_name = 'evil.txt' WHERE id = 2")
+        conn.commit()
+        conn.close()
+
+        # Artımlı denetim yeni kayıt olmadığı için hiçbir şey doğrulamaz...
+        third = self.client.get("/audit", params={"include_records": "false"}).json()
+        self.assertTrue(third["chain_valid"])
+        self.assertEqual(third["audited_records"], 0)
+
+        # ...ama full=true kayan özeti checkpoint'lerle karşılaştırıp yakalar
+        full = self.client.get("/audit", params={"include_records": "false", "full": "true"}).json()
+        self.assertFalse(full["chain_valid"])
+        self.assertEqual(full["audited_records"], 4)
+        self.assertEqual(full["broken_record_ids"], [3, 4])
+
+    def test_deep_audit_recomputes_merkle_roots(self):
+        """Kayıt + sonraki prev_hash birlikte değiştirilirse bağlar sağlam kalır; deep denetim kökleri yeniden hesaplayıp yakalamalı."""
+        from backend import database, deep_audit
+
+        saved = (database.SEGMENT_SIZE, deep_audit.AUDIT_WORKERS)
+        self.addCleanup(setattr, database, "SEGMENT_SIZE", saved[0])
+        self.addCleanup(setattr, deep_audit, "AUDIT_WORKERS", saved[1])
+        database.SEGMENT_SIZE = 3
+
+        hashes = [hashlib.sha256(f"deep-{i}".encode()).hexdigest() for i in range(7)]
+        for i, h in enumerate(hashes):
+            self.register_file_helper(f"d{i}.txt", h)
+
+        # 3 segment, 2 işçi süreç: sınırlarda birleştirme (stitching) doğru olmalı
+        deep_audit.AUDIT_WORKERS = 2
+        res = self.client.get("/audit", params={"deep": "true", "include_records": "false"}).json()
+        self.assertTrue(res["chain_valid"])
+        self.assertTrue(res["merkle_valid"])
+        self.assertEqual(res["audited_records"], 7)
+
+        # SALDIRI: checkpoint'ler silinir, 4. kayıt ve 5. kaydın prev_hash'i birlikte değiştirilir
+        forged = hashlib.sha256(b"forged").hexdigest()
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("DELETE FROM audit_checkpoints")
+        conn.execute("UPDATE records SET file_hash = ? WHERE id = 4", (forged,))
+        conn.execute("UPDATE records SET prev_hash = ? WHERE id = 5", (forged,))
+        conn.commit()
+        conn.close()
+
+        deep_audit.AUDIT_WORKERS = 0
+        full = self.client.get("/audit", params={"full": "true", "include_records": "false"}).json()
+        self.assertTrue(full["chain_valid"], "Bağ kontrolü bu değişikliği göremez.")
+
+        deep = self.client.get("/audit", params={"deep": "true", "include_records": "false"}).json()
+        self.assertFalse(deep["chain_valid"])
+        self.assertFalse(deep["merkle_valid"])
+        # 4. kayıt kendi segmentinde (4-6) kökünü tutturamaz; sonraki segment sınırı da tutmaz
+        self.assertEqual(deep["broken_record_ids"], [4, 5, 6, 7])
+
+    def test_deep_audit_reports_damaged_merkle_nodes(self):
+        """Eksik ya da bozuk merkle_nodes satırı 500 değil: merkle_valid false ve etkilenen kayıtlar."""
+        from backend import database, deep_audit
+
+        saved = (database.SEGMENT_SIZE, deep_audit.AUDIT_WORKERS)
+        self.addCleanup(setattr, database, "SEGMENT_SIZE", saved[0])
+        self.addCleanup(setattr, deep_audit, "AUDIT_WORKERS", saved[1])
+        database.SEGMENT_SIZE = 3
+        deep_audit.AUDIT_WORKERS = 2
+
+        hashes = [hashlib.sha256(f"node-{i}".encode()).hexdigest() for i in range(7)]
+        for i, h in enumerate(hashes):
+            self.register_file_helper(f"n{i}.txt", h)
+
+        # SALDIRI 1: 2. kaydın yaprak düğümü değişir; üstündeki düğümler ayrıca raporlanmamalı
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("UPDATE merkle_nodes SET hash = ? WHERE level = 0 AND idx = 1", ("0" * 64,))
+        conn.commit()
+        deep = self.client.get("/audit", params={"deep": "true", "include_records": "false"}).json()
+        self.assertFalse(deep["merkle_valid"])
+        self.assertEqual(deep["broken_record_ids"], [2])
+
+        # SALDIRI 2: ilk 4 yaprağın düğümü (seviye 2, idx 0) silinir; 3. segmentin başlangıcında da eksik
+        conn.execute("UPDATE merkle_nodes SET hash = ? WHERE level = 0 AND idx = 1", (hashes[1],))
+        conn.execute("DELETE FROM merkle_nodes WHERE level = 2 AND idx = 0")
+        conn.commit()
+        conn.close()
+
+        deep = self.client.get("/audit", params={"deep": "true", "include_records": "false"}).json()
+        self.assertFalse(deep["chain_valid"])
+        self.assertFalse(deep["merkle_valid"])
+        self.assertEqual(deep["broken_record_ids"], [1, 2, 3, 4])
+        self.assertEqual(deep["audited_records"], 7)
+
+        # Kanıtı bu düğüme ihtiyaç duyan kayıt temiz bir hata almalı
+        res = self.client.get(f"/proof/{hashes[4]}")
+        self.assertEqual(res.status_code, 503)
+        self.assertIn("audit", res.json()["detail"])
+        self.assertEqual(self.client.get(f"/proof/{hashes[0]}").status_code, 200)
+
+    def test_legacy_vault_migration_and_hash_index(self):
+        """Eski şemalı vault.db açılınca binary hash kolonu, index ve Merkle ağacı oluşmalı."""
+        if os.path.exists(DB_PATH):
+            os.remove(DB_PATH)
+
+        digest = hashlib.sha256(b"legacy").hexdigest()
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute(
+            "CREATE TABLE records (id INTEGER PRIMARY KEY AUTOINCREMENT, file_name TEXT, file_hash TEXT, "
+            "prev_hash TEXT, timestamp TEXT, user_key TEXT, merkle_root TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO records (file_name, file_hash, prev_hash, timestamp, user_key) VALUES (?, ?, ?, ?, ?)",
+            ("old.txt", digest, "GENESIS", "2024-01-01T00:00:00+00:00", self.public_key_pem)
+        )
+        conn.commit()
+        conn.close()
+
+        init_db()
+
+        conn = sqlite3.connect(DB_PATH)
+        stored, user_key, key_id = conn.execute(
+            "SELECT file_hash_bin, user_key, key_id FROM records WHERE id = 1"
+        ).fetchone()
+        key_pem = conn.execute("SELECT pem FROM keys WHERE id = ?", (key_id,)).fetchone()[0]
+        plan = " ".join(
+            str(row) for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM records WHERE file_hash_bin = ? AND file_hash = ?",
+                (stored, digest)
+            )
+        )
+        conn.close()
+
+        self.assertEqual(stored, bytes.fromhex(digest))   # 32 byte, 64 karakter değil
+        self.assertIn("idx_records_file_hash_bin", plan)
+        # PEM metni kayıttan anahtar tablosuna taşınmış olmalı
+        self.assertIsNone(user_key)
+        self.assertEqual(key_pem, self.public_key_pem)
+
+        res = self.client.post("/verify", json={"file_hash": digest})
+        self.assertTrue(res.json()["verified"])
+        self.assertEqual(get_merkle_root(), (1, digest))
+
+        # Büyük/küçük harf farkı aynı anahtara düşer ama eşleşme birebir kalmalı
+        res = self.client.post("/verify", json={"file_hash": digest.upper()})
+        self.assertFalse(res.json()["verified"])
+
+    def test_deep_audit_accepts_legacy_merkle_roots(self):
+        """Eski sürümün kayıt başına merkle_root değerleri deep denetimde bozuk sayılmamalı."""
+        if os.path.exists(DB_PATH):
+            os.remove(DB_PATH)
+
+        # Eski şema: merkle_root = build_merkle_root([file_hash, prev_hash])
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute(
+            "CREATE TABLE records (id INTEGER PRIMARY KEY AUTOINCREMENT, file_name TEXT, file_hash TEXT, "
+            "prev_hash TEXT, timestamp TEXT, user_key TEXT, merkle_root TEXT)"
+        )
+        prev_hash = "GENESIS"
+        for i in range(4):
+            digest = hashlib.sha256(f"legacy-{i}".encode()).hexdigest()
+            conn.execute(
+                "INSERT INTO records (file_name, file_hash, prev_hash, timestamp, user_key, merkle_root) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (f"old{i}.txt", digest, prev_hash, "2024-01-01T00:00:00+00:00", self.public_key_pem,
+                 SecurityVaultManager.build_merkle_root([digest, prev_hash]))
+            )
+            prev_hash = digest
+        conn.commit()
+        conn.close()
+
+        init_db()
+        for i in range(2):
+            self.register_file_helper(f"new{i}.txt", hashlib.sha256(f"new-{i}".encode()).hexdigest())
+
+        deep = self.client.get("/audit", params={"deep": "true", "include_records": "false"}).json()
+        self.assertTrue(deep["chain_valid"])
+        self.assertTrue(deep["merkle_valid"])
+        self.assertEqual(deep["audited_records"], 6)
+
+        # Eski kayıtların kökleri de denetlenmeye devam etmeli
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("DELETE FROM audit_checkpoints")
+        conn.execute("UPDATE records SET merkle_root = ? WHERE id = 2", ("0" * 64,))
+        conn.commit()
+        conn.close()
+
+        deep = self.client.get("/audit", params={"deep": "true", "include_records": "false"}).json()
+        self.assertFalse(deep["merkle_valid"])
+        self.assertEqual(deep["broken_record_ids"], [2])
+
+    def test_batch_registration(self):
+        """Tek imza ile toplu kayıt: zincir, kasa kökü ve kanıtlar doğru olmalı."""
+        self.register_file_helper("first.txt", "hash_first")
+
+        items = [{"file_name": f"b{i}.txt", "file_hash": f"hash_b{i}"} for i in range(6)]
+        prep = self.client.post("/register/batch/prepare", json={"items": items}).json()
+
+        # İstemci batch kökünü kendisi hesaplayıp imzalar
+        ts = prep["timestamp"]
+        leaves = [hashlib.sha256(f"{i['file_name']}|{i['file_hash']}|{ts}".encode()).hexdigest() for i in items]
+        batch_root = SecurityVaultManager.build_merkle_root(leaves)
+        self.assertEqual(prep["batch_root"], batch_root)
+        message = f"{batch_root}|{len(items)}|{ts}|BATCH"
+        self.assertEqual(prep["canonical_message"], message)
+
+        signature = self.private_key.sign(
+            message.encode('utf-8'),
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+            hashes.SHA256()
+        )
+        payload = {
+            "items": items,
+            "public_key": self.public_key_pem,
+            "signature": base64.b64encode(signature).decode('utf-8'),
+            "timestamp": ts
+        }
+
+        # Batch'in içeriği değişirse imza tutmamalı
+        tampered = dict(payload, items=items[:-1])
+        self.assertEqual(self.client.post("/register/batch", json=tampered).status_code, 401)
+
+        res = self.client.post("/register/batch", json=payload)
+        self.assertEqual(res.status_code, 200)
+        body = res.json()
+
+        all_hashes = ["hash_first"] + [i["file_hash"] for i in items]
+        self.assertEqual(body["tree_size"], 7)
+        self.assertEqual(body["merkle_root"], SecurityVaultManager.build_merkle_root(all_hashes))
+
+        prev = "hash_first"
+        for entry in body["records"]:
+            record = entry["record"]
+            self.assertEqual(record["prev_hash"], prev)
+            self.assertTrue(SecurityVaultManager.verify_merkle_proof(
+                record["file_hash"], entry["proof"], body["merkle_root"]
+            ))
+            prev = record["file_hash"]
+
+        self.assertTrue(ChainValidator.validate_chain(get_records())["is_valid"])
+
+    def test_concurrent_registrations_keep_a_linear_chain(self):
+        """Eşzamanlı kayıtlar aynı prev_hash'i alamamalı; her yanıt kendi kaydını döndürmeli."""
+        import threading
+
+        results = {}
+
+        def worker(i):
+            res = self.register_file_helper(f"c{i}.txt", f"hash_c{i}")
+            results[i] = res.json()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for i, body in results.items():
+            self.assertEqual(body["file_hash"], f"hash_c{i}")
+
+        records = get_records()
+        self.assertEqual(len(records), 12)
+        self.assertEqual(len({r["prev_hash"] for r in records}), 12)
+        self.assertTrue(ChainValidator.validate_chain(records)["is_valid"])
+
+    def test_public_keys_are_stored_once(self):
+        """Aynı istemci anahtarı her kayıtta tekrar saklanmamalı; kayıt key_id ile bağlanmalı."""
+        for i in range(3):
+            self.register_file_helper(f"k{i}.txt", f"hash_k{i}")
+
+        conn = sqlite3.connect(DB_PATH)
+        keys = conn.execute("SELECT id, pem FROM keys").fetchall()
+        rows = conn.execute("SELECT key_id, user_key FROM records").fetchall()
+        conn.close()
+
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(keys[0][1], self.public_key_pem)
+        self.assertEqual(rows, [(keys[0][0], None)] * 3)
+
     def tearDown(self):
         if os.path.exists(DB_PATH):
             try:
@@ -0,0 +1,63 @@
+import unittest
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from CryptoModule.verify_util import PublicKeyCache, public_key_fingerprint
+
+
+def make_pem():
+    key = ec.generate_private_key(ec.SECP256R1()).public_key()
+    return key.public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode('utf-8')
+
+
+class TestPublicKeyCache(unittest.TestCase):
+
+    def test_hit_after_first_parse(self):
+        """Aynı PEM ikinci kez parse edilmemeli (boşluk farkı aynı anahtar)."""
+        cache = PublicKeyCache(max_size=4)
+        pem = make_pem()
+        first = cache.get(pem)
+        second = cache.get("\n" + pem + "  ")
+
+        self.assertIs(first, second)
+        self.assertEqual(public_key_fingerprint(pem), public_key_fingerprint(pem + "\n"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        """Kapasite aşılınca en uzun süre kullanılmayan anahtar düşmeli."""
+        cache = PublicKeyCache(max_size=2)
+        a, b, c = make_pem(), make_pem(), make_pem()
+        cache.get(a)
+        cache.get(b)
+        cache.get(a)       # a en yeni oldu
+        cache.get(c)       # b düşer
+
+        stats = cache.stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        cache.get(a)
+        self.assertEqual(cache.hits, 2)
+        cache.get(b)
+        self.assertEqual(cache.misses, 4)
+
+    def test_ttl_expiry(self):
+        """Süresi dolan kayıt tekrar parse edilmeli."""
+        cache = PublicKeyCache(max_size=2, ttl=0)
+        pem = make_pem()
+        cache.get(pem)
+        cache.get(pem)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_invalid_pem_is_not_cached(self):
+        cache = PublicKeyCache(max_size=2)
+        with self.assertRaises(ValueError):
+            cache.get("not a key")
+        self.assertEqual(cache.stats()["size"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
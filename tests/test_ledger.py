@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from backend import database
+from backend.ledger import HEADER_SIZE, RECORD, Ledger, UnsupportedHash, node_count, node_position
+from CryptoModule.security_engine import SecurityVaultManager
+from tests.vault_case import TempVaultTestCase, sha
+
+
+class TestLedgerFile(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "vault.ledger")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def append(self, ledger, hashes):
+        frontier = ledger.frontier()
+        size = len(ledger)
+        last = ledger.record(size - 1)
+        prev_hash = last["file_hash"] if last else "GENESIS"
+        rows, nodes = [], []
+        for h in hashes:
+            nodes.extend(SecurityVaultManager.merkle_append(frontier, size, h))
+            size += 1
+            rows.append((f"name-{h[:6]}", h, prev_hash, "2024-01-01T00:00:00+00:00", 1,
+                         SecurityVaultManager.merkle_root_from_frontier(frontier, size)))
+            prev_hash = h
+        return ledger.append(rows, nodes)
+
+    def test_node_positions_follow_the_append_order(self):
+        """Düğüm konumları merkle_append'in ürettiği sırayla birebir örtüşmeli (dosya yalnızca büyür)."""
+        frontier = {}
+        position = 0
+        for size in range(100):
+            for level, index, _ in SecurityVaultManager.merkle_append(frontier, size, sha(size)):
+                self.assertEqual(node_position(level, index), position)
+                position += 1
+            self.assertEqual(node_count(size + 1), position)
+
+    def test_records_survive_reopen(self):
+        hashes = [sha(i) for i in range(37)]
+        ledger = Ledger(self.path, sync=False)
+        self.append(ledger, hashes[:20])
+        self.append(ledger, hashes[20:])
+        ledger.close()
+
+        ledger = Ledger(self.path, sync=False)
+        records = list(ledger.records())
+        self.assertEqual([r["file_hash"] for r in records], hashes)
+        self.assertEqual(records[0]["prev_hash"], "GENESIS")
+        self.assertEqual(records[5]["prev_hash"], hashes[4])
+        self.assertEqual(records[-1]["merkle_root"], SecurityVaultManager.build_merkle_root(hashes))
+        self.assertEqual(ledger.find(hashes[30]), 30)
+        self.assertIsNone(ledger.find("ab" * 32))
+        self.assertIsNone(ledger.find("not a hash"))
+        ledger.close()
+
+    def test_uncommitted_append_is_ignored(self):
+        """Sayaç (header) güncellenmeden yazılan veri, yeniden açılışta görünmemeli."""
+        ledger = Ledger(self.path, sync=False)
+        self.append(ledger, [sha(i) for i in range(3)])
+        ledger.close()
+
+        # Yarım kalmış ekleme: kayıt dosyasına veri yazıldı ama sayaç değişmedi
+        with open(os.path.join(self.path, "records.bin"), "ab") as f:
+            f.write(b"\x07" * RECORD.size)
+
+        ledger = Ledger(self.path, sync=False)
+        self.assertEqual(len(ledger), 3)
+        self.append(ledger, [sha(3)])
+        self.assertEqual([r["id"] for r in ledger.records()], [1, 2, 3, 4])
+        ledger.close()
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "records.bin")), HEADER_SIZE + 4 * RECORD.size)
+
+    def test_rejects_hashes_that_are_not_raw_digests(self):
+        ledger = Ledger(self.path, sync=False)
+        with self.assertRaises(UnsupportedHash):
+            self.append(ledger, ["hash_A"])
+        with self.assertRaises(UnsupportedHash):
+            self.append(ledger, [sha(1).upper()])
+        self.assertEqual(len(ledger), 0)
+        ledger.close()
+
+
+class TestLedgerStorage(TempVaultTestCase):
+    """backend.database, VAULT_STORAGE=ledger ile çalışırken."""
+
+    STORAGE = None
+
+    def test_existing_records_are_imported_and_extended(self):
+        """SQLite'taki kayıtlar ilk açılışta deftere taşınmalı; zincir ve kök aynı kalmalı."""
+        database.STORAGE = "sqlite"
+        database.init_db()
+        hashes = [sha(i) for i in range(10)]
+        database.insert_records_batch([(f"f{i}", h) for i, h in enumerate(hashes[:6])], "KEY", "ts")
+        sqlite_records = [dict(r) for r in database.get_records()]
+
+        database.STORAGE = "ledger"
+        database.init_db()
+        ledger_records = database.get_records()
+        for old, new in zip(sqlite_records, ledger_records):
+            for field in ("id", "file_name", "file_hash", "prev_hash", "timestamp", "merkle_root", "leaf_index"):
+                self.assertEqual(old[field], new[field])
+
+        result = database.insert_records_batch([(f"f{i}", h) for i, h in enumerate(hashes[6:], 6)], "KEY", "ts")
+        root = SecurityVaultManager.build_merkle_root(hashes)
+        self.assertEqual(database.get_merkle_root(), (10, root))
+        self.assertEqual(result["merkle_root"], root)
+        self.assertEqual(result["records"][0]["prev_hash"], hashes[5])
+
+        size, proof_root, proof = database.get_merkle_proof(3)
+        self.assertEqual(proof, SecurityVaultManager.get_merkle_proof(hashes, hashes[3]))
+        self.assertEqual(database.get_record_by_hash(hashes[8])["id"], 9)
+        self.assertEqual(set(database.get_records_by_hashes([hashes[1], "0" * 64])), {hashes[1]})
+
+        self.assertTrue(database.verify_chain(full=True)[0])
+        self.assertTrue(database.verify_chain(deep=True)[0])
+        # Kayıtlar SQLite tablosuna değil deftere yazıldı
+        with sqlite3.connect(database.DB_PATH) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM records").fetchone()[0], 6)
+
+    def test_incomplete_storage_cannot_be_created(self):
+        """Eksik metodu olan depolama arka ucu kullanılmadan, oluşturulurken hata vermeli."""
+        class PartialStorage(database.ChainStorage):
+            def commit_group(self, jobs):
+                return []
+
+        with self.assertRaises(TypeError):
+            PartialStorage()
+
+
+if __name__ == '__main__':
+    unittest.main()
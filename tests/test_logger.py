@@ -0,0 +1,145 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.logger import DroppingQueueHandler, create_file_handler, forward_worker_logs, setup_queue_logging
+
+
+def log_in_worker(message):
+    """Kripto işçisindeki gibi: alt süreçte 'vault_logger.crypto' üzerinden uyarı yazar."""
+    logging.getLogger("vault_logger.crypto").warning(message)
+    return os.getpid()
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestQueueLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "audit.log")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_logger(self, name, **handler_args):
+        target = logging.getLogger(name)
+        target.setLevel(logging.INFO)
+        handler = create_file_handler(self.path, **handler_args)
+        queue_handler, listener = setup_queue_logging(target, handler, batch_size=16)
+        self.addCleanup(target.removeHandler, queue_handler)
+        self.addCleanup(handler.close)
+        return target, listener
+
+    def test_json_lines_with_extra_fields(self):
+        """Kayıtlar arka planda JSON satırı olarak yazılmalı; alt logger'lar da aynı dosyaya düşmeli."""
+        target, listener = self.make_logger("test_vault_json")
+        target.info("Kayıt eklendi: %s", "a.txt", extra={"record_id": 7})
+        logging.getLogger("test_vault_json.crypto").warning("Signature verification failed")
+        listener.stop()
+
+        with open(self.path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+
+        self.assertEqual(lines[0]["message"], "Kayıt eklendi: a.txt")
+        self.assertEqual(lines[0]["level"], "INFO")
+        self.assertEqual(lines[0]["record_id"], 7)
+        self.assertTrue(lines[0]["ts"].endswith("+00:00"))
+        self.assertEqual(lines[1]["logger"], "test_vault_json.crypto")
+        self.assertEqual(lines[1]["level"], "WARNING")
+
+    def test_size_rotation(self):
+        target, listener = self.make_logger("test_vault_rotation", max_bytes=2000, backups=2)
+        for i in range(200):
+            target.info("satir %d", i)
+        listener.stop()
+
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Kuyruk doluysa istek beklememeli; kayıt düşürülüp sayılmalı."""
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        record = logging.makeLogRecord({"msg": "x"})
+        handler.emit(record)
+        handler.emit(record)
+        self.assertEqual(handler.dropped, 1)
+
+    def test_warnings_are_never_dropped(self):
+        """Kuyruk dolu ve dinleyici durmuşsa bile WARNING kaydı kaybolmamalı (doğrudan yazılmalı)."""
+        target, listener = self.make_logger("test_vault_full")
+        self.assertTrue(listener.running)
+        listener.stop()
+        self.assertFalse(listener.running)
+        queue_handler = target.handlers[-1]
+        while not queue_handler.queue.full():
+            queue_handler.queue.put_nowait(logging.makeLogRecord({"msg": "dolgu", "levelno": logging.INFO}))
+
+        target.info("düşürülebilir")
+        target.warning("imza doğrulanamadı")
+        listener.handlers[0].flush_batch()
+
+        with open(self.path, encoding="utf-8") as f:
+            messages = [json.loads(line)["message"] for line in f]
+        self.assertEqual(messages, ["imza doğrulanamadı"])
+        self.assertEqual(queue_handler.dropped, 1)
+
+    def test_worker_records_reach_the_parent(self):
+        """Spawn ile açılan işçi süreçlerin kayıtları ana süreçteki log'a iletilmeli."""
+        collect = _Collect()
+        parent_logger = logging.getLogger("vault_logger")
+        parent_logger.addHandler(collect)
+        self.addCleanup(parent_logger.removeHandler, collect)
+
+        initializer, initargs = forward_worker_logs()
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=initializer, initargs=initargs) as pool:
+            worker_pid = pool.submit(log_in_worker, "işçiden uyarı").result(30)
+
+        deadline = time.monotonic() + 5
+        while not collect.records and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([r.getMessage() for r in collect.records], ["işçiden uyarı"])
+        self.assertEqual(collect.records[0].name, "vault_logger.crypto")
+        self.assertEqual(collect.records[0].process, worker_pid)
+
+    def test_only_one_handler_rotates_a_shared_file(self):
+        """Aynı dosyaya yazan ikinci süreç/işleyici dosyayı döndürmemeli; döndürülünce yeni dosyaya geçmeli."""
+        owner = create_file_handler(self.path, max_bytes=500, backups=3)
+        follower = create_file_handler(self.path, max_bytes=500, backups=3)
+        self.addCleanup(owner.close)
+        self.addCleanup(follower.close)
+        record = logging.makeLogRecord({"msg": "x" * 100, "levelno": logging.INFO, "levelname": "INFO"})
+
+        for _ in range(20):
+            follower.handle(record)
+        follower.flush_batch()
+        self.assertFalse(os.path.exists(self.path + ".1"))
+
+        owner.handle(record)
+        owner.flush_batch()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+
+        follower.flush_batch()          # döndürüldüğünü fark edip yeni dosyayı açar
+        follower.handle(record)
+        follower.flush_batch()
+        # Yeni dosyada: döndürmeden sonra sahibin yazdığı kayıt + izleyicinin kaydı
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from backend.metrics import Registry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_prometheus_text_format(self):
+        """Sayaç, histogram ve toplayıcı çıktısı Prometheus metin formatında olmalı."""
+        registry = Registry()
+        requests = registry.counter("test_requests_total", "Requests.", ("endpoint",))
+        latency = registry.histogram("test_latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+        registry.add_collector("test_pool", "Pool", lambda: {"open": 2, "name": "atla", "busy": True})
+
+        requests.inc(endpoint="/verify")
+        requests.inc(2, endpoint="/verify")
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, endpoint='/a"b')
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE test_requests_total counter", lines)
+        self.assertIn('test_requests_total{endpoint="/verify"} 3', lines)
+        self.assertIn("# TYPE test_latency_seconds histogram", lines)
+        # Kovalar kümülatif; sınırdaki değer (0.1) kendi kovasına düşer
+        self.assertIn('test_latency_seconds_bucket{endpoint="/a\\"b",le="0.1"} 2', lines)
+        self.assertIn('test_latency_seconds_bucket{endpoint="/a\\"b",le="1"} 3', lines)
+        self.assertIn('test_latency_seconds_bucket{endpoint="/a\\"b",le="+Inf"} 4', lines)
+        self.assertIn('test_latency_seconds_count{endpoint="/a\\"b"} 4', lines)
+        self.assertIn('test_latency_seconds_sum{endpoint="/a\\"b"} 3.65', lines)
+        # Sayısal olmayan değerler atlanır
+        self.assertIn("test_pool_open 2", lines)
+        self.assertIn("test_pool_busy 1", lines)
+        self.assertFalse(any(line.startswith("test_pool_name") for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import pickle
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from backend import database, fast_json
+from backend.records import PUBLIC_FIELDS, RECORD_FIELDS, Record
+from tests.vault_case import TempVaultTestCase, sha
+
+
+class TestRecord(TempVaultTestCase):
+
+    def setUp(self):
+        super().setUp()
+        database.insert_records_batch([(f"f{i}", sha(i)) for i in range(3)], "KEY", "ts")
+
+    def test_rows_are_records(self):
+        """Sorgular Record döndürmeli; alan ve anahtar erişimi aynı değeri vermeli."""
+        records = database.get_records()
+        self.assertTrue(all(isinstance(r, Record) for r in records))
+        r = records[1]
+        self.assertEqual(r.file_hash, sha(1))
+        self.assertEqual(r["prev_hash"], sha(0))
+        self.assertEqual(r.get("leaf_index"), 1)
+        self.assertIsNone(r.get("yok"))
+        self.assertIn("merkle_root", r)
+        self.assertEqual(list(dict(r)), list(RECORD_FIELDS))
+        self.assertFalse(hasattr(r, "__dict__"))
+
+    def test_public_fields_and_pickling(self):
+        """public() yalnızca API alanlarını içermeli; Record süreçler arasında taşınabilmeli."""
+        r = database.get_record_by_hash(sha(2))
+        self.assertEqual(tuple(r.public()), PUBLIC_FIELDS)
+        self.assertNotIn("user_key", r.public())
+        self.assertEqual(pickle.loads(pickle.dumps(r)), r)
+
+    def test_audit_response_keeps_its_shape(self):
+        """/audit gövdesi AuditResponse alanlarıyla aynı kalmalı."""
+        from backend.main import app
+        body = TestClient(app).get("/audit?limit=2").json()
+        self.assertEqual(set(body), {"chain_valid", "broken_record_ids", "records",
+                                     "next_after_id", "audited_records", "merkle_valid"})
+        self.assertTrue(body["chain_valid"])
+        self.assertEqual(body["next_after_id"], 2)
+        self.assertEqual([set(r) for r in body["records"]], [set(PUBLIC_FIELDS)] * 2)
+
+
+class TestFastJSON(unittest.TestCase):
+
+    def test_fallback_matches_orjson(self):
+        """orjson kurulu değilse standart json aynı belgeyi üretmeli."""
+        doc = {"name": "dosya ğüş.txt", "ids": [1, 2, 3], "valid": True, "root": None}
+        fast = fast_json.dumps(doc)
+        with mock.patch.object(fast_json, "orjson", None):
+            plain = fast_json.dumps(doc)
+            self.assertEqual(fast_json.loads(plain), doc)
+        self.assertEqual(json.loads(fast), json.loads(plain))
+        self.assertEqual(fast_json.FastJSONResponse(doc).body, fast)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,20 @@
 import unittest
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from CryptoModule.security_engine import SecurityVaultManager
 
+
+def reference_merkle_root(hash_list):
+    """Eski özyinelemeli (hex string) kurucu: yeni kurucu aynı kökleri üretmeli."""
+    if not hash_list: return ""
+    if len(hash_list) == 1: return hash_list[0]
+    new_hashes = []
+    for i in range(0, len(hash_list), 2):
+        left = hash_list[i]
+        right = hash_list[i+1] if i+1 < len(hash_list) else left
+        new_hashes.append(hashlib.sha256((left + right).encode()).hexdigest())
+    return reference_merkle_root(new_hashes)
+
 class TestSecurityEngine(unittest.TestCase):
     
     def setUp(self):
@@ -60,6 +73,73 @@ class TestSecurityEngine(unittest.TestCase):
         is_bad_root = SecurityVaultManager.verify_merkle_proof(target_hash, proof, fake_root)
         self.assertFalse(is_bad_root, "Yanlış Root ile doğrulama başarısız olmalıydı.")
 
+    def test_merkle_accumulator_matches_full_build(self):
+        """
+        Frontier tabanlı (append-only) akümülatörün her adımda
+        build_merkle_root ile aynı kökü ürettiğini test eder.
+        """
+        frontier = {}
+        hashes = []
+        for i in range(1, 40):
+            leaf = self._get_hash(f"leaf{i}")
+            SecurityVaultManager.merkle_append(frontier, len(hashes), leaf)
+            hashes.append(leaf)
+
+            root = SecurityVaultManager.merkle_root_from_frontier(frontier, len(hashes))
+            self.assertEqual(root, SecurityVaultManager.build_merkle_root(hashes))
+
+            # Frontier en fazla log2(n) + 1 düğüm tutmalı
+            self.assertEqual(len(frontier), bin(len(hashes)).count("1"))
+
+    def test_consistency_proofs(self):
+        """Her (m, n) çifti için tutarlılık kanıtı doğrulanmalı; değiştirilmiş kanıt/kök reddedilmeli."""
+        leaves = [self._get_hash(f"leaf{i}") for i in range(40)]
+        nodes = {}
+        frontier = {}
+        for size, leaf in enumerate(leaves):
+            for level, index, node in SecurityVaultManager.merkle_append(frontier, size, leaf):
+                nodes[(level, index)] = node
+        get_node = lambda level, index: nodes[(level, index)]
+
+        for n in range(1, len(leaves) + 1):
+            root = SecurityVaultManager.build_merkle_root(leaves[:n])
+            new_frontier = {
+                level: nodes[(level, (n >> level) - 1)]
+                for level in range(n.bit_length()) if (n >> level) & 1
+            }
+            for m in range(1, n + 1):
+                old_root = SecurityVaultManager.build_merkle_root(leaves[:m])
+                proof = SecurityVaultManager.merkle_consistency_proof(m, n, new_frontier, get_node)
+                self.assertLessEqual(len(proof), 2 * n.bit_length())
+                self.assertTrue(SecurityVaultManager.verify_consistency(m, old_root, n, root, proof), (m, n))
+
+                if m == n:
+                    continue
+                # Kurcalama: yanlış eski kök, yanlış boyut veya değiştirilmiş kanıt kabul edilmemeli
+                self.assertFalse(SecurityVaultManager.verify_consistency(m, leaves[0] if m > 1 else leaves[1], n, root, proof))
+                if proof:
+                    tampered = proof[:-1] + [self._get_hash("fake")]
+                    self.assertFalse(SecurityVaultManager.verify_consistency(m, old_root, n, root, tampered))
+                    self.assertFalse(SecurityVaultManager.verify_consistency(m, old_root, n, root, proof + [root]))
+
+    def test_buffer_builder_matches_string_scheme(self):
+        """Ham 32 byte tamponlu kurucu, hex birleştirmeli eski şema ile birebir aynı kökü vermeli."""
+        hex_leaves = [self._get_hash(f"leaf{i}") for i in range(70)]
+        text_leaves = [f"hash_{i}" for i in range(70)]
+        mixed = hex_leaves[:5] + [hex_leaves[5].upper()] + hex_leaves[6:9]
+
+        for n in list(range(0, 20)) + [33, 64, 70]:
+            for leaves in (hex_leaves[:n], text_leaves[:n]):
+                self.assertEqual(SecurityVaultManager.build_merkle_root(leaves), reference_merkle_root(leaves))
+        self.assertEqual(SecurityVaultManager.build_merkle_root(mixed), reference_merkle_root(mixed))
+
+        # Büyük seviyeler parçalara bölünüp executor üzerinde hashlenebilir
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            for n in (2, 7, 41, 70):
+                root = SecurityVaultManager.build_merkle_root(hex_leaves[:n], executor=executor, min_parallel_pairs=2,
+                                                           workers=3)
+                self.assertEqual(root, reference_merkle_root(hex_leaves[:n]))
+
     def test_chain_operations(self):
         """
         Chain ekleme fonksiyonu (InMemory) çalışıyor mu?
@@ -0,0 +1,33 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from backend import database
+
+
+def sha(i) -> str:
+    return hashlib.sha256(f"file-{i}".encode()).hexdigest()
+
+
+class TempVaultTestCase(unittest.TestCase):
+    """
+    backend.database'i geçici bir dizindeki yeni vault.db'ye yönlendirir ve
+    test bitince eski yolu ve depolamayı geri yükler. STORAGE = None ise
+    kasa setUp'ta açılmaz (test kendisi seçip init_db çağırır).
+    """
+
+    STORAGE = "sqlite"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = (database.DB_PATH, database.STORAGE)
+        database.DB_PATH = os.path.join(self.tmp.name, "vault.db")
+        if self.STORAGE is not None:
+            database.STORAGE = self.STORAGE
+            database.init_db()
+
+    def tearDown(self):
+        database.DB_PATH, database.STORAGE = self.saved
+        database.init_db()
+        self.tmp.cleanup()